@@ -9,10 +9,11 @@ if sys.platform.startswith('win'):
 import os
 import logging
 from logging.handlers import RotatingFileHandler
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 from src.services.ai_providers import AIProviderFactory
 import asyncio
@@ -23,13 +24,16 @@ from src.services.html_generation.title_generator import TitleGenerator
 from src.services.html_generation.css_generator import CSSGenerator
 from src.services.html_generation.content_generator import ContentGenerator
 import uuid
+import shutil
 from src.services.hotspot_service import HotspotService
-import concurrent.futures
-# 导入同步截图函数
-from src.services.screenshot_sync import take_screenshot
-from typing import Optional, List
-from src.services.xhs_publisher import XHSPublisher
+from src.services.browser_pool import BrowserPool, IMAGE_FORMATS, batch_output_paths
+from src.services.render_cache import RenderCache
+from src.services.note_pipeline import NotePipeline
+from typing import Optional, List, Literal
+from src.services.xhs_publish_service import XHSPublishService
+from src.services.publish_queue import PublishQueue, JOB_STATUSES
 from src.services.cookie_service import CookieService
+from src.core.driver_pool import driver_pool
 
 # 加载环境变量
 load_dotenv()
@@ -64,7 +68,27 @@ logger.setLevel(logging.INFO)
 logger.addHandler(file_handler)
 logger.addHandler(console_handler)
 
-app = FastAPI()
+# 常驻浏览器池，由应用生命周期管理
+browser_pool = BrowserPool.from_env()
+# 热点服务在请求间共享，复用HTTP连接和榜单缓存
+hotspot_service = HotspotService()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await browser_pool.start()
+    except Exception as e:
+        # 启动失败不影响其他接口，首次截图时会再次尝试启动
+        logger.warning(f"浏览器池启动失败: {e}")
+    publish_queue.start()
+    yield
+    await browser_pool.close()
+    await hotspot_service.close()
+    await publish_queue.close()
+    # 发布器归还会话后关闭会话池中的浏览器
+    await asyncio.to_thread(driver_pool.close)
+
+app = FastAPI(lifespan=lifespan)
 
 # 配置CORS
 app.add_middleware(
@@ -85,9 +109,32 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(HTML_OUTPUT_DIR, exist_ok=True)
 os.makedirs(IMAGE_OUTPUT_DIR, exist_ok=True)
 
+# 渲染结果缓存，相同HTML和渲染参数直接复用已生成的图片
+render_cache = RenderCache.from_env(os.path.join(IMAGE_OUTPUT_DIR, 'render_cache'))
+
 # 实例化Cookie服务
 cookie_service = CookieService()
 
+# 未指定账号且没有活动账号时，使用默认cookies文件发布
+DEFAULT_PUBLISH_ACCOUNT = "default"
+
+def _create_account_publisher(account: str) -> XHSPublishService:
+    """为账号创建进程内发布服务，每个账号一个已登录的浏览器会话"""
+    if account == DEFAULT_PUBLISH_ACCOUNT:
+        return XHSPublishService()
+    return XHSPublishService(cookies_file=str(cookie_service.get_account_cookie_path(account)))
+
+# 持久化的发布任务队列，由应用生命周期启动和关闭
+publish_queue = PublishQueue.from_env(_create_account_publisher)
+
+def _resolve_publish_account(account: Optional[str]) -> str:
+    """确定发布使用的账号，未指定时使用当前活动账号"""
+    if account:
+        if not cookie_service.get_account_cookie_path(account).exists():
+            raise HTTPException(status_code=404, detail=f"账号不存在: {account}")
+        return account
+    return cookie_service.get_active_account() or DEFAULT_PUBLISH_ACCOUNT
+
 # 挂载静态文件目录
 app.mount("/static", StaticFiles(directory=OUTPUT_DIR), name="static")
 
@@ -108,6 +155,7 @@ class HTMLGenerateRequest(BaseModel):
     audience: str = Field(..., min_length=1, description="受众不能为空")
     model: Optional[str] = Field(None, description="AI模型名称，可选")
     service: Optional[str] = Field(None, description="AI服务提供商，可选")
+    use_cache: bool = Field(True, description="是否使用AI响应缓存")
 
 # New request models for split and build steps
 class ContentRequest(BaseModel):
@@ -117,10 +165,25 @@ class ContentRequest(BaseModel):
     audience: str = Field(..., min_length=1, description="受众不能为空")
     model: Optional[str] = Field(None, description="AI模型名称，可选")
     service: Optional[str] = Field(None, description="AI服务提供商，可选")
+    use_cache: bool = Field(True, description="是否使用AI响应缓存")
+
+class NotePipelineRequest(BaseModel):
+    theme: str = Field(..., min_length=1, description="主题不能为空")
+    style: str = Field(..., min_length=1, description="风格不能为空")
+    audience: str = Field(..., min_length=1, description="受众不能为空")
+    num_sections: int = Field(1, ge=1, description="分割的段落数量")
+    model: Optional[str] = Field(None, description="AI模型名称，可选")
+    service: Optional[str] = Field(None, description="AI服务提供商，可选")
+    render_images: bool = Field(True, description="是否将每段HTML渲染为图片")
+    width: int = 375
+    height: int = 667
+    full_page: bool = False
+    use_cache: bool = Field(True, description="是否使用AI响应缓存")
 
 class SectionsRequest(BaseModel):
     content: str = Field(..., min_length=1, description="内容不能为空")
     num_sections: int = Field(1, ge=1, description="分割的段落数量")
+    use_cache: bool = Field(True, description="是否使用AI响应缓存")
 
 class BuildRequest(BaseModel):
     title: str = Field(..., min_length=1, description="标题不能为空")
@@ -134,6 +197,16 @@ class SectionHTMLRequest(BaseModel):
     style: str = Field(..., min_length=1, description="风格不能为空")
     css_style: Optional[str] = Field(None, description="CSS样式，可选")
     is_question: bool = Field(False, description="是否为问题模式")
+    use_cache: bool = Field(True, description="是否使用AI响应缓存")
+
+class SectionsHTMLRequest(BaseModel):
+    title: str = Field(..., min_length=1, description="标题不能为空")
+    sections: list[str] = Field(..., min_length=1, description="分段内容描述列表")
+    style: str = Field(..., min_length=1, description="风格不能为空")
+    css_style: Optional[str] = Field(None, description="CSS样式，可选")
+    is_question: bool = Field(False, description="是否为问题模式")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="本次请求的最大并发数，可选")
+    use_cache: bool = Field(True, description="是否使用AI响应缓存")
 
 from typing import Optional
 class HtmlToImageRequest(BaseModel):
@@ -142,15 +215,44 @@ class HtmlToImageRequest(BaseModel):
     width: int = 375
     height: int = 667
     full_page: bool = False
-    wait_time: float = 1.0
+    wait_time: float = Field(1.0, description="fixed 模式为等待时间，其他模式为最长等待时间（秒）")
+    wait_mode: Literal["ready", "networkidle", "fixed"] = Field("ready", description="截图前的等待模式")
+    use_cache: bool = Field(True, description="是否使用渲染缓存")
+
+class HtmlToImageBatchRequest(BaseModel):
+    html_paths: list[str] = Field(..., min_length=1, description="HTML文件路径列表")
+    output_dir: Optional[str] = Field(None, description="输出目录，可选，默认保存到图片输出目录")
+    width: int = 375
+    height: int = 667
+    full_page: bool = False
+    wait_time: float = Field(1.0, description="fixed 模式为等待时间，其他模式为最长等待时间（秒）")
+    wait_mode: Literal["ready", "networkidle", "fixed"] = Field("ready", description="截图前的等待模式")
+    use_cache: bool = Field(True, description="是否使用渲染缓存")
+
+class HtmlRenderRequest(BaseModel):
+    html: str = Field(..., min_length=1, description="HTML源码不能为空")
+    width: int = 375
+    height: int = 667
+    full_page: bool = False
+    wait_time: float = Field(1.0, description="fixed 模式为等待时间，其他模式为最长等待时间（秒）")
+    wait_mode: Literal["ready", "networkidle", "fixed"] = Field("ready", description="截图前的等待模式")
+    use_cache: bool = Field(True, description="是否使用渲染缓存")
+    image_format: Literal["png", "jpeg", "webp"] = Field("png", description="输出图片格式")
+    quality: Optional[int] = Field(None, ge=0, le=100, description="JPEG/WebP 质量，可选")
+    save: bool = Field(False, description="是否同时保存到图片输出目录")
 
 class HotspotAnalyzeRequest(BaseModel):
     ai_service: Optional[str] = None
     ai_model: Optional[str] = None
+    incremental: bool = Field(False, description="是否只分析相对上次分析新增或排名大幅变化的话题")
 
 class HotspotContentRequest(BaseModel):
     url: str
 
+class HotspotContentsRequest(BaseModel):
+    urls: Optional[List[str]] = Field(None, description="要提取正文的URL列表，为空时使用当前热点榜单")
+    top: int = Field(20, ge=1, le=50, description="未指定URL时提取榜单前N条热点")
+
 class XHSPublishRequest(BaseModel):
     title: str
     content: str
@@ -159,6 +261,13 @@ class XHSPublishRequest(BaseModel):
     images: Optional[List[str]] = None
     videos: Optional[List[str]] = None
 
+class XHSPublishJobRequest(XHSPublishRequest):
+    account: Optional[str] = Field(None, description="发布使用的Cookie账号，默认使用当前活动账号")
+    max_attempts: Optional[int] = Field(None, ge=1, le=10, description="最多执行次数，可选")
+
+class XHSPublishJobsRequest(BaseModel):
+    jobs: List[XHSPublishJobRequest] = Field(..., min_length=1, description="发布任务列表")
+
 # Cookie管理请求模型
 class CookieAccountRequest(BaseModel):
     account_name: str = Field(..., min_length=1, description="账号名称不能为空")
@@ -183,7 +292,7 @@ async def generate_content(request: GenerateRequest):
         provider = AIProviderFactory.get_provider(request.service)
         
         # 调用模型生成内容
-        content = provider.generate_content([msg.model_dump() for msg in request.messages], request.model)
+        content = await provider.agenerate_content([msg.model_dump() for msg in request.messages], request.model)
         return {"content": content}
     except ValueError as e:
         logger.error(f"Value error: {str(e)}", exc_info=True)
@@ -194,23 +303,48 @@ async def generate_content(request: GenerateRequest):
 
 # Add new endpoints for HTML generation steps
 
+def _create_generator(
+    generator_class,
+    service: Optional[str] = None,
+    model: Optional[str] = None,
+    use_cache: bool = True
+):
+    """创建生成器，未指定服务或模型时使用配置中的默认值"""
+    creator = HTMLCreator()
+    return generator_class(
+        config=creator.config,
+        service_name=service or creator.service_name,
+        model=model or creator.model,
+        max_retries=creator.max_retries,
+        retry_base_delay=creator.retry_base_delay,
+        use_cache=use_cache
+    )
+
+def _sse_event(event_type: str, content: str) -> str:
+    return f"data: {json.dumps({'type': event_type, 'content': content}, ensure_ascii=False)}\n\n"
+
+def _stream_generation(generator, chunks, postprocess=None) -> StreamingResponse:
+    """将生成器的文本块以SSE转发，结束时在 done 事件中返回处理后的完整结果"""
+    async def event_stream():
+        parts = []
+        try:
+            async with generator:
+                async for chunk in chunks:
+                    parts.append(chunk)
+                    yield _sse_event("chunk", chunk)
+            result = "".join(parts)
+            yield _sse_event("done", postprocess(result) if postprocess else result)
+        except Exception as e:
+            logger.error(f"流式生成失败: {str(e)}", exc_info=True)
+            yield _sse_event("error", str(e))
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.post("/api/generate-html/title")
 async def generate_html_title(request: HTMLGenerateRequest):
     """生成小红书笔记标题"""
     try:
-        creator = HTMLCreator()
-        # 如果指定了模型和服务，直接使用指定的参数创建生成器
-        service_name = request.service or creator.service_name
-        model = request.model or creator.model
-        
-        title_generator = TitleGenerator(
-            config=creator.config,
-            service_name=service_name,
-            model=model,
-            max_retries=creator.max_retries,
-            retry_base_delay=creator.retry_base_delay
-        )
-            
+        title_generator = _create_generator(TitleGenerator, request.service, request.model, request.use_cache)
         async with title_generator:
             title = await title_generator.generate_note_title(
                 theme=request.theme, style=request.style, audience=request.audience
@@ -224,19 +358,7 @@ async def generate_html_title(request: HTMLGenerateRequest):
 async def generate_html_css(request: HTMLGenerateRequest): # Reuse HTMLGenerateRequest for style
     """生成HTML所需的CSS样式"""
     try:
-        creator = HTMLCreator()
-        # 如果指定了模型和服务，直接使用指定的参数创建生成器
-        service_name = request.service or creator.service_name
-        model = request.model or creator.model
-        
-        css_generator = CSSGenerator(
-            config=creator.config,
-            service_name=service_name,
-            model=model,
-            max_retries=creator.max_retries,
-            retry_base_delay=creator.retry_base_delay
-        )
-            
+        css_generator = _create_generator(CSSGenerator, request.service, request.model, request.use_cache)
         async with css_generator:
             css_style = await css_generator.generate_css_style(style=request.style)
         return {"css_style": css_style}
@@ -248,19 +370,7 @@ async def generate_html_css(request: HTMLGenerateRequest): # Reuse HTMLGenerateR
 async def generate_html_content(request: ContentRequest):
     """生成小红书笔记文案内容"""
     try:
-        creator = HTMLCreator()
-        # 如果指定了模型和服务，直接使用指定的参数创建生成器
-        service_name = request.service or creator.service_name
-        model = request.model or creator.model
-        
-        content_generator = ContentGenerator(
-            config=creator.config,
-            service_name=service_name,
-            model=model,
-            max_retries=creator.max_retries,
-            retry_base_delay=creator.retry_base_delay
-        )
-            
+        content_generator = _create_generator(ContentGenerator, request.service, request.model, request.use_cache)
         async with content_generator:
             content = await content_generator.generate_note_content(
                 title=request.title,
@@ -273,12 +383,84 @@ async def generate_html_content(request: ContentRequest):
         logger.error(f"生成内容失败: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"生成内容失败: {str(e)}")
 
+@app.post("/api/generate-html/title/stream")
+async def stream_html_title(request: HTMLGenerateRequest):
+    """流式生成小红书笔记标题"""
+    try:
+        title_generator = _create_generator(TitleGenerator, request.service, request.model, request.use_cache)
+    except Exception as e:
+        logger.error(f"生成标题失败: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"生成标题失败: {str(e)}")
+    chunks = title_generator.stream_note_title(
+        theme=request.theme, style=request.style, audience=request.audience
+    )
+    return _stream_generation(title_generator, chunks, TitleGenerator.postprocess_title)
+
+@app.post("/api/generate-html/css/stream")
+async def stream_html_css(request: HTMLGenerateRequest):
+    """流式生成HTML所需的CSS样式"""
+    try:
+        css_generator = _create_generator(CSSGenerator, request.service, request.model, request.use_cache)
+    except Exception as e:
+        logger.error(f"生成CSS失败: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"生成CSS失败: {str(e)}")
+    chunks = css_generator.stream_css_style(style=request.style)
+    return _stream_generation(css_generator, chunks, str.strip)
+
+@app.post("/api/generate-html/content/stream")
+async def stream_html_content(request: ContentRequest):
+    """流式生成小红书笔记文案内容"""
+    try:
+        content_generator = _create_generator(ContentGenerator, request.service, request.model, request.use_cache)
+    except Exception as e:
+        logger.error(f"生成内容失败: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"生成内容失败: {str(e)}")
+    chunks = content_generator.stream_note_content(
+        title=request.title,
+        style=request.style,
+        audience=request.audience,
+        theme=request.theme
+    )
+    return _stream_generation(content_generator, chunks)
+
+@app.post("/api/generate-html/pipeline")
+async def generate_note_pipeline(request: NotePipelineRequest):
+    """一次调用完成整篇笔记生成（标题、CSS、文案、分段、分段HTML及图片），以SSE汇报进度"""
+    try:
+        pipeline = NotePipeline(
+            html_output_dir=HTML_OUTPUT_DIR,
+            image_output_dir=IMAGE_OUTPUT_DIR,
+            browser_pool=browser_pool,
+            render_cache=render_cache,
+            service=request.service,
+            model=request.model,
+            use_cache=request.use_cache
+        )
+    except Exception as e:
+        logger.error(f"创建笔记生成流水线失败: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"创建笔记生成流水线失败: {str(e)}")
+
+    async def event_stream():
+        async for event in pipeline.run(
+            theme=request.theme,
+            style=request.style,
+            audience=request.audience,
+            num_sections=request.num_sections,
+            render_images=request.render_images,
+            width=request.width,
+            height=request.height,
+            full_page=request.full_page
+        ):
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.post("/api/generate-html/sections")
 async def split_html_content(request: SectionsRequest):
     """将笔记内容分割成多个部分"""
     try:
         creator = HTMLCreator()
-        content_splitter = creator.get_content_splitter()
+        content_splitter = creator.get_content_splitter(use_cache=request.use_cache)
         async with content_splitter:
             sections = await content_splitter.split_content_into_sections(
                 content=request.content, num_sections=request.num_sections
@@ -293,12 +475,35 @@ async def split_html_content(request: SectionsRequest):
         raise HTTPException(status_code=500, detail=f"分割内容失败: {str(e)}")
 
 # Add new endpoint for generating HTML for a single section
+def _save_section_html(section_html: str) -> dict:
+    """保存分段HTML到输出目录，返回文件路径及访问URL"""
+    section_id = uuid.uuid4().hex
+    html_filename = f'section_{section_id}.html'
+    html_path = os.path.join(HTML_OUTPUT_DIR, html_filename)
+    
+    # 确保输出目录存在
+    os.makedirs(os.path.dirname(html_path), exist_ok=True)
+    
+    # 保存 HTML 文件
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(section_html)
+    
+    # 生成 HTML 文件的 URL
+    html_url = f"/static/html_outputs/{html_filename}"
+    
+    return {
+        "html": section_html, 
+        "file_path": html_path,
+        "html_url": html_url,
+        "section_id": section_id
+    }
+
 @app.post("/api/generate-html/section_html")
 async def generate_html_section(request: SectionHTMLRequest):
     """生成单个内容区块的HTML"""
     try:
         creator = HTMLCreator()
-        html_builder = creator.get_html_builder()
+        html_builder = creator.get_html_builder(use_cache=request.use_cache)
         async with html_builder:
             # 根据是否为问题模式选择不同的生成方法
             if request.is_question:
@@ -315,38 +520,51 @@ async def generate_html_section(request: SectionHTMLRequest):
                     style=request.style,
                     css_style=request.css_style or ""
             )
-        # 保存到输出目录
-        section_id = uuid.uuid4().hex
-        html_filename = f'section_{section_id}.html'
-        html_path = os.path.join(HTML_OUTPUT_DIR, html_filename)
-        
-        # 确保输出目录存在
-        os.makedirs(os.path.dirname(html_path), exist_ok=True)
-        
-        # 保存 HTML 文件
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(section_html)
-        
-        # 生成 HTML 文件的 URL
-        html_url = f"/static/html_outputs/{html_filename}"
-        
-        return {
-            "html": section_html, 
-            "file_path": html_path,
-            "html_url": html_url,
-            "section_id": section_id
-        }
+        return _save_section_html(section_html)
     except Exception as e:
         logger.error(f"生成内容区块HTML失败: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"生成内容区块HTML失败: {str(e)}")
 
-@app.post("/api/html-to-image")
-async def html_to_image(request: HtmlToImageRequest, background_tasks: BackgroundTasks):
-    """将HTML文件转为图片"""
+@app.post("/api/generate-html/sections_html")
+async def generate_html_sections(request: SectionsHTMLRequest):
+    """并行生成多个内容区块的HTML，按输入顺序返回逐项结果"""
+    try:
+        creator = HTMLCreator()
+        html_builder = creator.get_html_builder(use_cache=request.use_cache)
+        async with html_builder:
+            outputs = await html_builder.generate_sections_html(
+                title=request.title,
+                sections=request.sections,
+                style=request.style,
+                css_style=request.css_style or "",
+                is_question=request.is_question,
+                max_concurrency=request.max_concurrency
+            )
+    except Exception as e:
+        logger.error(f"批量生成内容区块HTML失败: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"批量生成内容区块HTML失败: {str(e)}")
+
+    results = []
+    for index, output in enumerate(outputs):
+        if isinstance(output, Exception):
+            logger.error(f"生成第{index + 1}个内容区块HTML失败: {output}")
+            results.append({"index": index, "success": False, "msg": str(output)})
+        else:
+            results.append({"index": index, "success": True, **_save_section_html(output)})
+    return {"results": results}
+
+async def _render_html_file(
+    html_path: str,
+    output_path: Optional[str],
+    width: int,
+    height: int,
+    full_page: bool,
+    wait_time: float,
+    wait_mode: str = "ready",
+    use_cache: bool = True
+) -> dict:
+    """使用浏览器池将单个HTML文件转为图片，返回结果字典"""
     try:
-        # 检查文件路径
-        html_path = request.html_path
-        
         # 如果是相对路径，转换为绝对路径
         if not os.path.isabs(html_path):
             html_path = os.path.abspath(html_path)
@@ -359,7 +577,6 @@ async def html_to_image(request: HtmlToImageRequest, background_tasks: Backgroun
             return {"success": False, "msg": error_msg}
         
         # 处理输出路径
-        output_path = request.output_path
         if output_path:
             if not os.path.isabs(output_path):
                 output_path = os.path.abspath(output_path)
@@ -375,24 +592,38 @@ async def html_to_image(request: HtmlToImageRequest, background_tasks: Backgroun
         output_dir = os.path.dirname(output_path)
         os.makedirs(output_dir, exist_ok=True)
         
-        # 使用线程池运行同步截图代码
-        logger.info(f"使用线程池生成截图: {html_path} -> {output_path}")
+        # 查找渲染缓存，输出格式由扩展名决定
+        image_format = os.path.splitext(output_path)[1].lstrip('.').lower() or 'png'
+        cache_key = None
+        cached = False
+        if use_cache:
+            with open(html_path, 'rb') as f:
+                cache_key = RenderCache.make_key(
+                    f.read(), width=width, height=height, full_page=full_page,
+                    wait_mode=wait_mode, image_format=image_format
+                )
+            cached_path = render_cache.get_path(cache_key)
+            if cached_path:
+                logger.info(f"命中渲染缓存: {html_path} -> {output_path}")
+                shutil.copyfile(cached_path, output_path)
+                cached = True
         
-        # 创建线程池执行同步截图函数
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            # 将同步函数包装在线程池中执行
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                executor, 
-                take_screenshot,
+        if cached:
+            result = True
+        else:
+            # 使用常驻浏览器池生成截图
+            logger.info(f"使用浏览器池生成截图: {html_path} -> {output_path}")
+            result = await browser_pool.screenshot(
                 html_path,
                 output_path,
-                request.width,
-                request.height,
-                True,  # headless
-                request.full_page,
-                request.wait_time
+                width=width,
+                height=height,
+                full_page=full_page,
+                wait_time=wait_time,
+                wait_mode=wait_mode
             )
+            if result and cache_key and os.path.exists(output_path):
+                render_cache.put_file(cache_key, output_path, image_format)
         
         # 检查结果
         if result:
@@ -411,7 +642,8 @@ async def html_to_image(request: HtmlToImageRequest, background_tasks: Backgroun
                     "success": True, 
                     "output_path": output_path, 
                     "file_size": file_size,
-                    "image_url": image_url
+                    "image_url": image_url,
+                    "cached": cached
                 }
             else:
                 error_msg = f"截图生成成功但文件不存在: {output_path}"
@@ -426,24 +658,124 @@ async def html_to_image(request: HtmlToImageRequest, background_tasks: Backgroun
         logger.error(error_msg, exc_info=True)
         return {"success": False, "msg": error_msg}
 
+@app.post("/api/html-to-image")
+async def html_to_image(request: HtmlToImageRequest, background_tasks: BackgroundTasks):
+    """将HTML文件转为图片"""
+    return await _render_html_file(
+        request.html_path,
+        request.output_path,
+        request.width,
+        request.height,
+        request.full_page,
+        request.wait_time,
+        request.wait_mode,
+        request.use_cache
+    )
+
+@app.post("/api/html-to-image/batch")
+async def html_to_image_batch(request: HtmlToImageBatchRequest):
+    """批量将HTML文件转为图片，在浏览器池的多个页面中并行渲染"""
+    # 同名HTML文件追加序号，避免并行渲染时输出到同一个图片
+    output_paths = batch_output_paths(request.html_paths, request.output_dir or IMAGE_OUTPUT_DIR)
+
+    logger.info(f"开始批量生成截图，共{len(request.html_paths)}个文件")
+    results = await asyncio.gather(*[
+        _render_html_file(
+            html_path,
+            output_path,
+            request.width,
+            request.height,
+            request.full_page,
+            request.wait_time,
+            request.wait_mode,
+            request.use_cache
+        )
+        for html_path, output_path in zip(request.html_paths, output_paths)
+    ])
+    for html_path, result in zip(request.html_paths, results):
+        result["html_path"] = html_path
+
+    success_count = sum(1 for result in results if result["success"])
+    logger.info(f"批量截图完成: 成功{success_count}个，失败{len(results) - success_count}个")
+    return {
+        "success": success_count == len(results),
+        "total": len(results),
+        "success_count": success_count,
+        "results": results
+    }
+
+@app.post("/api/html-to-image/render")
+async def render_html_to_image(request: HtmlRenderRequest):
+    """直接渲染HTML源码，在响应中返回图片，不经过HTML文件"""
+    cache_key = None
+    image = None
+    if request.use_cache:
+        cache_key = RenderCache.make_key(
+            request.html, width=request.width, height=request.height,
+            full_page=request.full_page, wait_mode=request.wait_mode,
+            image_format=request.image_format, quality=request.quality
+        )
+        image = render_cache.get(cache_key)
+
+    headers = {"X-Render-Cache": "hit" if image is not None else "miss"}
+    if image is None:
+        try:
+            image = await browser_pool.render_html(
+                request.html,
+                width=request.width,
+                height=request.height,
+                full_page=request.full_page,
+                wait_time=request.wait_time,
+                wait_mode=request.wait_mode,
+                image_format=request.image_format,
+                quality=request.quality
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"渲染HTML失败: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"渲染HTML失败: {str(e)}")
+        if cache_key:
+            render_cache.put(cache_key, image, request.image_format)
+
+    if request.save:
+        image_filename = f"render_{uuid.uuid4().hex}.{request.image_format}"
+        with open(os.path.join(IMAGE_OUTPUT_DIR, image_filename), 'wb') as f:
+            f.write(image)
+        headers["X-Image-Url"] = f"/api/images/{image_filename}"
+
+    return Response(content=image, media_type=IMAGE_FORMATS[request.image_format], headers=headers)
+
+@app.get("/api/html-to-image/stats")
+async def html_to_image_stats():
+    """获取浏览器池与渲染缓存的运行状态"""
+    return {"browser_pool": browser_pool.stats(), "render_cache": render_cache.stats()}
+
 @app.get("/api/hotspots")
 async def get_hotspots():
     """获取当前热点榜单"""
     try:
-        service = HotspotService()
-        hotspots = service.fetch_all_hotspots()
+        hotspots = await hotspot_service.get_hotspots()
         return {"hotspots": hotspots}
     except Exception as e:
         logger.error(f"获取热点失败: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"获取热点失败: {str(e)}")
 
+@app.get("/api/hotspots/sources")
+async def get_hotspot_sources():
+    """获取各热点数据源的熔断状态"""
+    return {"sources": hotspot_service.source_status()}
+
 @app.post("/api/hotspots/analyze")
 async def analyze_hotspots(request: HotspotAnalyzeRequest):
     """AI分析当前热点榜单"""
     try:
-        service = HotspotService()
-        hotspots = service.fetch_all_hotspots()
-        report = service.analyze_hotspots(hotspots, ai_service=request.ai_service or None, ai_model=request.ai_model or None)
+        hotspots = await hotspot_service.get_hotspots()
+        if request.incremental:
+            return await hotspot_service.analyze_hotspots_incremental(
+                hotspots, ai_service=request.ai_service or None, ai_model=request.ai_model or None
+            )
+        report = await hotspot_service.analyze_hotspots(hotspots, ai_service=request.ai_service or None, ai_model=request.ai_model or None)
         return {"report": report}
     except Exception as e:
         logger.error(f"热点分析失败: {str(e)}", exc_info=True)
@@ -453,13 +785,27 @@ async def analyze_hotspots(request: HotspotAnalyzeRequest):
 async def get_hotspot_content(request: HotspotContentRequest):
     """获取指定URL的热点内容"""
     try:
-        service = HotspotService()
-        content = service.get_hotspot_content(request.url)
+        content = await hotspot_service.get_hotspot_content(request.url)
         return {"content": content}
     except Exception as e:
         logger.error(f"获取热点内容失败: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"获取热点内容失败: {str(e)}")
 
+@app.post("/api/hotspots/contents")
+async def get_hotspot_contents(request: HotspotContentsRequest):
+    """并发获取多个热点的正文内容"""
+    try:
+        if request.urls:
+            urls = request.urls
+        else:
+            hotspots = await hotspot_service.get_hotspots()
+            urls = [h["url"] for h in hotspots[:request.top] if h.get("url")]
+        contents = await hotspot_service.get_hotspots_content(urls)
+        return {"contents": contents}
+    except Exception as e:
+        logger.error(f"批量获取热点内容失败: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"批量获取热点内容失败: {str(e)}")
+
 @app.get("/api/cookies/accounts")
 async def list_cookie_accounts():
     """获取所有已保存的Cookie账号列表"""
@@ -526,8 +872,8 @@ async def get_active_cookie_account():
 async def publish_to_xiaohongshu(request: XHSPublishRequest):
     """发布内容到小红书"""
     try:
-        publisher = XHSPublisher()
-        result = publisher.publish_note(
+        publisher = publish_queue.get_publisher(_resolve_publish_account(None))
+        result = await publisher.publish(
             title=request.title,
             content=request.content,
             topics=request.topics,
@@ -551,6 +897,40 @@ async def publish_to_xiaohongshu(request: XHSPublishRequest):
             detail=f"发布过程出错: {str(e)}"
         )
 
+def _enqueue_publish_job(request: XHSPublishJobRequest) -> dict:
+    payload = request.model_dump(exclude={"account", "max_attempts"})
+    return publish_queue.enqueue(
+        _resolve_publish_account(request.account), payload, max_attempts=request.max_attempts
+    )
+
+@app.post("/api/publish/xhs/jobs")
+async def create_publish_job(request: XHSPublishJobRequest):
+    """添加小红书发布任务到队列"""
+    return {"job": _enqueue_publish_job(request)}
+
+@app.post("/api/publish/xhs/jobs/batch")
+async def create_publish_jobs(request: XHSPublishJobsRequest):
+    """批量添加发布任务，不同账号的任务并行执行"""
+    accounts = {job.account for job in request.jobs}
+    for account in accounts:
+        _resolve_publish_account(account)
+    return {"jobs": [_enqueue_publish_job(job) for job in request.jobs]}
+
+@app.get("/api/publish/xhs/jobs")
+async def list_publish_jobs(status: Optional[str] = None, account: Optional[str] = None, limit: int = 100):
+    """查询发布任务列表"""
+    if status and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"无效的任务状态: {status}")
+    return {"jobs": publish_queue.list_jobs(status=status, account=account, limit=limit), **publish_queue.stats()}
+
+@app.get("/api/publish/xhs/jobs/{job_id}")
+async def get_publish_job(job_id: str):
+    """查询发布任务状态"""
+    job = publish_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+    return {"job": job}
+
 @app.get("/api/images/{image_name}")
 async def get_image(image_name: str):
     """获取图片文件"""
@@ -565,5 +945,8 @@ async def get_image(image_name: str):
     return FileResponse(image_path)
 
 if __name__ == "__main__":
+    # PyInstaller 打包后子进程会重新执行可执行文件，需在入口处拦截
+    import multiprocessing
+    multiprocessing.freeze_support()
     import uvicorn
     uvicorn.run("src.app.main:app", host="0.0.0.0", port=port, reload=True)
\ No newline at end of file
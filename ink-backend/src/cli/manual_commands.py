@@ -113,7 +113,7 @@ def add_manual_parser(subparsers):
     export_parser = manual_subparsers.add_parser("export", help="导出数据")
     export_parser.add_argument(
         "--format", 
-        choices=["excel", "json"], 
+        choices=["excel", "json", "parquet"], 
         default="excel",
         help="导出格式 (默认: excel)"
     )
@@ -115,8 +115,8 @@ class ChromeDriverManager:
             chrome_options.add_argument('--disable-notifications')
             chrome_options.add_argument('--disable-features=TranslateUI')
             
-            # 添加调试端口（有助于无头模式稳定性）
-            chrome_options.add_argument('--remote-debugging-port=9222')
+            # 添加调试端口（有助于无头模式稳定性），由Chrome自动分配，允许多个浏览器同时运行
+            chrome_options.add_argument('--remote-debugging-port=0')
             
             # 窗口设置（即使无头模式也设置）
             chrome_options.add_argument('--start-maximized')
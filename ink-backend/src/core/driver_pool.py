@@ -0,0 +1,351 @@
+"""
+Selenium浏览器会话池
+
+按cookies账号保留已登录创作者中心的Chrome会话，供发布和数据采集复用，
+避免每次任务都重新启动浏览器、访问页面并注入cookies。
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import XHSConfig
+from .browser import ChromeDriverManager
+from .exceptions import BrowserError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def cookies_file_version(cookies_file: str) -> Optional[Tuple[str, float, int]]:
+    """cookies文件的版本标识（路径、修改时间、大小），文件不存在时返回None"""
+    path = Path(cookies_file)
+    try:
+        stat = path.stat()
+        return (str(path.resolve()), stat.st_mtime, stat.st_size)
+    except OSError:
+        return None
+
+
+def create_logged_in_driver(config: XHSConfig) -> Any:
+    """
+    启动Chrome并使用配置中的cookies登录创作者中心
+
+    Args:
+        config: 配置管理器实例，cookies_file 指定登录的账号
+
+    Returns:
+        已登录的 WebDriver 实例
+    """
+    from ..auth.cookie_manager import CookieManager
+
+    manager = ChromeDriverManager(config)
+    driver = manager.create_driver()
+    try:
+        manager.navigate_to_creator_center()
+        cookies = CookieManager(config).load_cookies()
+        cookie_result = manager.load_cookies(cookies)
+        logger.info(f"🍪 Cookies加载结果: {cookie_result}")
+    except Exception:
+        manager.close_driver()
+        raise
+
+    # 驱动交由会话池管理，避免管理器析构时关闭浏览器
+    manager.driver = None
+    manager.is_initialized = False
+    return driver
+
+
+class _PooledSession:
+    """池中的一个浏览器会话"""
+
+    def __init__(self, key: str, driver: Any, cookies_version):
+        self.key = key
+        self.driver = driver
+        self.cookies_version = cookies_version
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.leased = True
+        self.leases = 1
+
+
+class DriverPool:
+    """按cookies账号划分的Selenium会话池
+
+    同一时间一个会话只租给一个调用方。租用时检查浏览器是否仍可响应、
+    cookies文件是否变化，超过 ``max_age`` 或空闲超过 ``idle_timeout`` 的会话回收重建，
+    空闲会话到期后由后台定时器关闭。
+    会话总数达到 ``max_sessions`` 时优先关闭最久未用的空闲会话，否则等待归还。
+    线程安全，Selenium调用均在锁外执行。
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[XHSConfig], Any]] = None,
+        max_sessions: int = 3,
+        max_age: float = 1800,
+        idle_timeout: float = 600,
+        acquire_timeout: float = 300
+    ):
+        """
+        Args:
+            session_factory: 根据配置创建已登录 WebDriver 的函数
+            max_sessions: 最多同时保留的浏览器会话数
+            max_age: 会话最长存活时间（秒），超过后重建
+            idle_timeout: 会话最长空闲时间（秒），超过后关闭
+            acquire_timeout: 等待空闲会话的最长时间（秒）
+        """
+        self.session_factory = session_factory or create_logged_in_driver
+        self.max_sessions = max(1, max_sessions)
+        self.max_age = max_age
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+
+        self._sessions: List[_PooledSession] = []
+        # 正在启动中的会话数，计入总数上限
+        self._creating = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        # 回收到期空闲会话的定时器及其触发时间
+        self._reap_timer: Optional[threading.Timer] = None
+        self._reap_at: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "DriverPool":
+        """根据环境变量创建会话池"""
+        return cls(
+            max_sessions=int(os.getenv("DRIVER_POOL_MAX_SESSIONS", "3")),
+            max_age=float(os.getenv("DRIVER_POOL_MAX_AGE", "1800")),
+            idle_timeout=float(os.getenv("DRIVER_POOL_IDLE_TIMEOUT", "600")),
+            acquire_timeout=float(os.getenv("DRIVER_POOL_ACQUIRE_TIMEOUT", "300"))
+        )
+
+    @staticmethod
+    def account_key(config: XHSConfig) -> str:
+        """会话按cookies文件区分账号"""
+        return str(Path(config.cookies_file).resolve())
+
+    def acquire(self, config: XHSConfig) -> Any:
+        """
+        租用账号的浏览器会话，没有可用会话时启动新的浏览器并登录
+
+        Args:
+            config: 配置管理器实例，cookies_file 指定账号
+
+        Returns:
+            已登录的 WebDriver 实例，用完后必须调用 release 归还
+
+        Raises:
+            BrowserError: 等待空闲会话超时或会话池已关闭时
+        """
+        key = self.account_key(config)
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            session, stale = self._reserve(key, deadline)
+            self._close_sessions(stale)
+            if session is None:
+                return self._create_session(key, config)
+
+            reason = self._check_session(session)
+            if reason is None:
+                logger.info(f"♻️ 复用浏览器会话: {Path(key).stem}")
+                return session.driver
+            logger.info(f"🔄 回收浏览器会话 {Path(key).stem}: {reason}")
+            self.release(session.driver, discard=True)
+
+    def release(self, driver: Any, discard: bool = False) -> None:
+        """
+        归还浏览器会话
+
+        Args:
+            driver: acquire 返回的 WebDriver
+            discard: 是否关闭该会话，页面状态异常时应丢弃
+        """
+        with self._cond:
+            session = next((s for s in self._sessions if s.driver is driver), None)
+            expired = []
+            # 会话池关闭后归还的会话直接关闭
+            close_session = discard or self._closed
+            if session is not None:
+                if close_session:
+                    self._sessions.remove(session)
+                else:
+                    session.leased = False
+                    session.last_used = time.monotonic()
+                expired = self._pop_expired_locked(time.monotonic())
+                self._schedule_reap_locked()
+                self._cond.notify_all()
+
+        if session is None:
+            logger.warning("⚠️ 归还的浏览器会话不属于会话池，直接关闭")
+            self._quit(driver)
+        elif close_session:
+            self._close_sessions([session])
+        self._close_sessions(expired)
+
+    @contextmanager
+    def lease(self, config: XHSConfig):
+        """租用浏览器会话的上下文管理器，出现异常时丢弃会话"""
+        driver = self.acquire(config)
+        ok = False
+        try:
+            yield driver
+            ok = True
+        finally:
+            self.release(driver, discard=not ok)
+
+    def close(self) -> None:
+        """关闭会话池及所有空闲会话，租用中的会话在归还时关闭，之后不能再租用"""
+        with self._cond:
+            self._closed = True
+            self._cancel_reap_locked()
+            idle = [s for s in self._sessions if not s.leased]
+            self._sessions = [s for s in self._sessions if s.leased]
+            leased = len(self._sessions)
+            # 唤醒等待会话的调用方，使其收到会话池已关闭的错误
+            self._cond.notify_all()
+        self._close_sessions(idle)
+        if leased:
+            logger.info(f"仍有 {leased} 个浏览器会话在使用中，归还后关闭")
+
+    def reap(self) -> int:
+        """关闭超过最长存活时间或最长空闲时间的空闲会话，返回关闭的会话数"""
+        with self._cond:
+            expired = self._pop_expired_locked(time.monotonic())
+            self._schedule_reap_locked()
+        self._close_sessions(expired)
+        if expired:
+            logger.info(f"🧹 关闭了 {len(expired)} 个过期的浏览器会话")
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._cond:
+            sessions = [{
+                "account": Path(s.key).stem,
+                "leased": s.leased,
+                "leases": s.leases,
+                "age_seconds": round(now - s.created_at, 1),
+                "idle_seconds": 0 if s.leased else round(now - s.last_used, 1)
+            } for s in self._sessions]
+            creating = self._creating
+        return {"max_sessions": self.max_sessions, "creating": creating, "sessions": sessions}
+
+    def _reserve(self, key: str, deadline: float) -> Tuple[Optional[_PooledSession], List[_PooledSession]]:
+        """在锁内选出空闲会话或预留新建名额，返回 (会话或None, 需要关闭的会话)"""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise BrowserError("浏览器会话池已关闭", browser_action="acquire")
+                now = time.monotonic()
+                stale = self._pop_expired_locked(now)
+
+                for session in self._sessions:
+                    if session.key == key and not session.leased:
+                        session.leased = True
+                        session.leases += 1
+                        return session, stale
+
+                if len(self._sessions) + self._creating >= self.max_sessions:
+                    idle = [s for s in self._sessions if not s.leased]
+                    if idle:
+                        victim = min(idle, key=lambda s: s.last_used)
+                        self._sessions.remove(victim)
+                        stale.append(victim)
+
+                if len(self._sessions) + self._creating < self.max_sessions:
+                    self._creating += 1
+                    return None, stale
+
+                # 所有会话都在使用中（此时 stale 必然为空），等待归还
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise BrowserError(
+                        f"等待浏览器会话超时（{self.acquire_timeout}秒），当前会话均在使用中",
+                        browser_action="acquire"
+                    )
+                self._cond.wait(remaining)
+
+    def _pop_expired_locked(self, now: float) -> List[_PooledSession]:
+        expired = [
+            s for s in self._sessions
+            if not s.leased and (now - s.created_at > self.max_age or now - s.last_used > self.idle_timeout)
+        ]
+        for session in expired:
+            self._sessions.remove(session)
+        return expired
+
+    def _schedule_reap_locked(self) -> None:
+        """按最早到期的空闲会话安排回收定时器"""
+        idle = [s for s in self._sessions if not s.leased]
+        if self._closed or not idle:
+            self._cancel_reap_locked()
+            return
+        reap_at = min(min(s.last_used + self.idle_timeout, s.created_at + self.max_age) for s in idle)
+        if self._reap_timer is not None and self._reap_at is not None and self._reap_at <= reap_at:
+            return
+        self._cancel_reap_locked()
+        timer = threading.Timer(max(reap_at - time.monotonic(), 0) + 0.1, self._on_reap_timer)
+        timer.daemon = True
+        self._reap_timer, self._reap_at = timer, reap_at
+        timer.start()
+
+    def _cancel_reap_locked(self) -> None:
+        if self._reap_timer is not None:
+            self._reap_timer.cancel()
+        self._reap_timer = self._reap_at = None
+
+    def _on_reap_timer(self) -> None:
+        with self._cond:
+            if self._reap_timer is not threading.current_thread():
+                return
+            self._reap_timer = self._reap_at = None
+        self.reap()
+
+    def _check_session(self, session: _PooledSession) -> Optional[str]:
+        """检查会话能否复用，不能复用时返回原因"""
+        if time.monotonic() - session.created_at > self.max_age:
+            return "超过最长存活时间"
+        if session.cookies_version != cookies_file_version(session.key):
+            return "cookies已更新"
+        try:
+            session.driver.current_url
+        except Exception:
+            return "浏览器无响应"
+        return None
+
+    def _create_session(self, key: str, config: XHSConfig) -> Any:
+        # 在加载cookies之前记录版本，加载期间文件被更新时下次租用会重新登录
+        cookies_version = cookies_file_version(key)
+        try:
+            driver = self.session_factory(config)
+        except Exception:
+            with self._cond:
+                self._creating -= 1
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._creating -= 1
+            self._sessions.append(_PooledSession(key, driver, cookies_version))
+        logger.info(f"✅ 新建浏览器会话: {Path(key).stem}")
+        return driver
+
+    def _close_sessions(self, sessions: List[_PooledSession]) -> None:
+        for session in sessions:
+            self._quit(session.driver)
+
+    @staticmethod
+    def _quit(driver: Any) -> None:
+        try:
+            driver.quit()
+            logger.debug("🔒 浏览器会话已关闭")
+        except Exception as e:
+            logger.warning(f"⚠️ 关闭浏览器会话时出错: {e}")
+
+
+# 全局会话池实例
+driver_pool = DriverPool.from_env()
@@ -54,8 +54,16 @@ class AuthenticationError(XHSToolkitError):
 class PublishError(XHSToolkitError):
     """发布相关错误"""
     
+    # 点击发布按钮及之后的步骤，出错时笔记可能已经发布
+    SUBMIT_STEP = "提交发布"
+    
     def __init__(self, message: str, publish_step: Optional[str] = None):
         super().__init__(message, "PUBLISH_ERROR", {"publish_step": publish_step})
+    
+    @property
+    def submitted(self) -> bool:
+        """是否在点击发布按钮之后出错，此时发布结果未知，不能重试"""
+        return self.details.get("publish_step") == self.SUBMIT_STEP
 
 
 class NetworkError(XHSToolkitError):
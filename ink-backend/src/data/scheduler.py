@@ -152,6 +152,7 @@ class DataCollectionScheduler:
             from ..xiaohongshu.data_collector.dashboard import collect_dashboard_data
             from ..xiaohongshu.data_collector.content_analysis import collect_content_analysis_data
             from ..xiaohongshu.data_collector.fans import collect_fans_data
+            from ..core.driver_pool import driver_pool
         except ImportError as e:
             logger.error(f"导入数据采集模块失败: {e}")
             # 如果导入失败，尝试另一种导入方式
@@ -161,32 +162,23 @@ class DataCollectionScheduler:
                 from xiaohongshu.data_collector.dashboard import collect_dashboard_data
                 from xiaohongshu.data_collector.content_analysis import collect_content_analysis_data
                 from xiaohongshu.data_collector.fans import collect_fans_data
+                from core.driver_pool import driver_pool
                 logger.info("使用备用导入方式成功")
             except ImportError as e2:
                 logger.error(f"备用导入方式也失败: {e2}")
                 return
         
-        # 创建WebDriver实例用于数据采集
-        driver = None
+        # 从会话池租用已登录的WebDriver用于数据采集（启动浏览器和等待归还都可能较慢，放到线程中执行）
         try:
-            driver = self.client.browser_manager.create_driver()
-            
-            # 加载cookies
-            cookies = self.client.cookie_manager.load_cookies()
-            if cookies:
-                # 先访问小红书主页以设置域名
-                driver.get("https://www.xiaohongshu.com")
-                
-                # 加载cookies
-                cookie_result = self.client.browser_manager.load_cookies(cookies)
-                logger.info(f"🍪 Cookies加载结果: {cookie_result}")
-            else:
+            if not self.client.cookie_manager.load_cookies():
                 logger.warning("⚠️ 未找到cookies，数据采集可能失败")
-        
+            driver = await asyncio.to_thread(driver_pool.acquire, self.client.config)
         except Exception as e:
-            logger.error(f"❌ 创建WebDriver失败: {e}")
+            logger.error(f"❌ 获取WebDriver失败: {e}")
             return
         
+        driver_ok = True
+        
         try:
             # 采集仪表板数据
             if collect_dashboard:
@@ -230,14 +222,12 @@ class DataCollectionScheduler:
                 except Exception as e:
                     logger.error(f"❌ 粉丝数据采集失败: {e}")
                     
+        except BaseException:
+            driver_ok = False
+            raise
         finally:
-            # 确保关闭WebDriver
-            if driver:
-                try:
-                    driver.quit()
-                    logger.debug("🔒 WebDriver已关闭")
-                except Exception as e:
-                    logger.warning(f"⚠️ 关闭WebDriver时出错: {e}")
+            # 归还WebDriver，异常中断时丢弃会话
+            await asyncio.to_thread(driver_pool.release, driver, not driver_ok)
                 
         # 记录采集结果
         end_time = datetime.now()
@@ -271,6 +261,9 @@ class DataCollectionScheduler:
             self.scheduler.shutdown(wait=True)
             self._running = False
             logger.info("数据采集调度器已停止")
+        # 写入缓冲中尚未写入的采集数据
+        if not await asyncio.to_thread(storage_manager.flush):
+            logger.warning("存储写入缓冲未能在超时前写完")
             
     def is_running(self) -> bool:
         """检查调度器是否在运行"""
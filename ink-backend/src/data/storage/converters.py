@@ -0,0 +1,40 @@
+"""
+存储字段值转换
+
+采集到的数据多为字符串（如 "1,234"、"62.5%"），带类型的存储在写入前统一转换
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+
+def to_int(value: Any) -> int:
+    """数值字段，无法解析时为0"""
+    try:
+        return int(float(str(value).replace(',', '')))
+    except (TypeError, ValueError):
+        return 0
+
+
+def to_percent(value: Any) -> Optional[float]:
+    """百分比字段，"62.5%" -> 62.5，空值为0，无法解析时为None"""
+    if value is None or value == '':
+        return 0.0
+    try:
+        return float(str(value).strip().rstrip('%'))
+    except ValueError:
+        return None
+
+
+def to_timestamp(value: Any) -> Optional[datetime]:
+    """ISO格式时间字符串转换为datetime，无法解析时为None"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def to_text(value: Any) -> str:
+    return '' if value is None else str(value)
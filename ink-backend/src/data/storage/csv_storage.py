@@ -4,6 +4,7 @@ CSV存储实现
 提供基于CSV文件的数据存储功能
 """
 
+import os
 import csv
 import json
 import logging
@@ -301,53 +302,114 @@ class CSVStorage(BaseStorage):
             List[Dict[str, Any]]: 数据列表
         """
         try:
-            if data_type == 'dashboard':
-                file_path = self.dashboard_file
-                fields = self.dashboard_fields
-                chinese_headers = self.dashboard_chinese_headers
-            elif data_type == 'content_analysis':
-                file_path = self.content_analysis_file
-                fields = self.content_analysis_fields
-                chinese_headers = self.content_analysis_chinese_headers
-            elif data_type == 'fans':
-                file_path = self.fans_file
-                fields = self.fans_fields
-                chinese_headers = self.fans_chinese_headers
-            else:
+            dataset = self._datasets().get(data_type)
+            if dataset is None:
                 logger.warning(f"⚠️ 未知数据类型: {data_type}")
                 return []
             
+            file_path, fields, chinese_headers = dataset
             if not file_path.exists():
                 return []
             
-            # 读取CSV文件
+            # 读取表头
+            with open(file_path, 'r', newline='', encoding='utf-8') as f:
+                headers = next(csv.reader(f), None)
+            if not headers:
+                return []
+            # 中文表头需要转换为英文字段名，英文表头或其他格式直接使用
+            keys = fields if headers == chinese_headers else headers
+            
+            # 数据按创建时间顺序追加，从文件末尾倒序读取 limit 条即可
             data = []
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                headers = next(reader, None)  # 读取表头
-                
-                if headers:
-                    # 检查是否为中文表头
-                    if headers == chinese_headers:
-                        # 中文表头，需要转换为英文字段名
-                        for row in reader:
-                            if len(row) == len(fields):
-                                row_dict = {field: value for field, value in zip(fields, row)}
-                                data.append(row_dict)
-                    else:
-                        # 英文表头或其他格式，直接使用
-                        for row in reader:
-                            if len(row) == len(headers):
-                                row_dict = {header: value for header, value in zip(headers, row)}
-                                data.append(row_dict)
-            
-            # 按创建时间倒序排列，返回最新的limit条
+            for line in self._iter_lines_reversed(file_path):
+                if len(data) >= limit:
+                    break
+                row = next(csv.reader([line]), [])
+                if row == headers or len(row) != len(keys):
+                    continue
+                data.append(dict(zip(keys, row)))
+            
+            # 按创建时间倒序排列
             data.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-            return data[:limit]
+            return data
             
         except Exception as e:
             logger.error(f"❌ 获取最新数据失败: {e}")
             return []
+
+    def read_range(self, data_type: str, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        读取日期范围内的数据（按创建时间的日期过滤）
+
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            start_date: 起始日期 YYYY-MM-DD（含），默认不限
+            end_date: 结束日期 YYYY-MM-DD（含），默认不限
+
+        Returns:
+            List[Dict[str, Any]]: 按文件顺序的数据列表
+        """
+        dataset = self._datasets().get(data_type)
+        if dataset is None:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+
+        file_path, fields, chinese_headers = dataset
+        if not file_path.exists():
+            return []
+
+        data = []
+        with open(file_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            headers = next(reader, None)
+            if not headers:
+                return []
+            keys = fields if headers == chinese_headers else headers
+            for row in reader:
+                if len(row) != len(keys):
+                    continue
+                record = dict(zip(keys, row))
+                date = str(record.get('created_at', ''))[:10]
+                if (start_date and date < start_date) or (end_date and date > end_date):
+                    continue
+                data.append(record)
+        return data
+
+    def _datasets(self) -> Dict[str, tuple]:
+        """数据类型 -> (CSV文件路径, 英文字段, 中文表头)"""
+        return {
+            'dashboard': (self.dashboard_file, self.dashboard_fields, self.dashboard_chinese_headers),
+            'content_analysis': (self.content_analysis_file, self.content_analysis_fields,
+                                 self.content_analysis_chinese_headers),
+            'fans': (self.fans_file, self.fans_fields, self.fans_chinese_headers)
+        }
+    
+    @staticmethod
+    def _iter_lines_reversed(file_path: Path, block_size: int = 64 * 1024):
+        """
+        从文件末尾按块向前读取，倒序逐行产出非空行（包括表头）
+        
+        Args:
+            file_path: 文件路径
+            block_size: 每次读取的字节数
+        """
+        with open(file_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b''
+            while position > 0:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                lines = (f.read(read_size) + remainder).split(b'\n')
+                # 块的第一行可能不完整，留到下一块拼接（换行符不会出现在UTF-8多字节字符中间）
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if line.strip():
+                        yield line.decode('utf-8').rstrip('\r')
+            if remainder.strip():
+                yield remainder.decode('utf-8').rstrip('\r')
     
     async def close(self) -> None:
         """关闭存储连接"""
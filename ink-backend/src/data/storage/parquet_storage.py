@@ -0,0 +1,326 @@
+"""
+Parquet存储实现
+
+以带类型的列式格式保存创作者数据，按日期分区，读取时只加载需要的列和日期分区。
+依赖 pyarrow（可选依赖）。
+"""
+
+import os
+import re
+import json
+import shutil
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .base import BaseStorage
+from .converters import to_int, to_percent, to_timestamp, to_text
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PATTERN = re.compile(r'^date=(\d{4}-\d{2}-\d{2})$')
+
+# 记录已从CSV导入历史数据的数据类型
+BACKFILL_MARKER = '_csv_backfill.json'
+
+# 分区字段，以 hive 目录形式保存（date=YYYY-MM-DD），不写入文件内容
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+_COMMON_FIELDS = [
+    ("created_at", pa.timestamp("us")),
+    ("updated_at", pa.timestamp("us")),
+    ("timestamp", pa.string()),
+]
+
+_PERCENT = pa.float64()
+
+# 各数据类型的列定义，百分比字段保存为数值（如 "62.5%" -> 62.5）
+SCHEMAS = {
+    'dashboard': pa.schema(_COMMON_FIELDS + [
+        ("dimension", pa.string()),
+        ("views", pa.int64()),
+        ("likes", pa.int64()),
+        ("collects", pa.int64()),
+        ("comments", pa.int64()),
+        ("shares", pa.int64()),
+        ("interactions", pa.int64()),
+    ]),
+    'content_analysis': pa.schema(_COMMON_FIELDS + [
+        ("title", pa.string()),
+        ("note_type", pa.string()),
+        ("publish_time", pa.string()),
+        ("views", pa.int64()),
+        ("likes", pa.int64()),
+        ("comments", pa.int64()),
+        ("collects", pa.int64()),
+        ("shares", pa.int64()),
+        ("fans_growth", pa.int64()),
+        ("avg_watch_time", pa.string()),
+        ("danmu_count", pa.int64()),
+        # 观众来源数据
+        ("source_recommend", _PERCENT),
+        ("source_search", _PERCENT),
+        ("source_follow", _PERCENT),
+        ("source_other", _PERCENT),
+        # 观众分析数据
+        ("gender_male", _PERCENT),
+        ("gender_female", _PERCENT),
+        ("age_18_24", _PERCENT),
+        ("age_25_34", _PERCENT),
+        ("age_35_44", _PERCENT),
+        ("age_45_plus", _PERCENT),
+        ("city_top1", pa.string()),
+        ("city_top2", pa.string()),
+        ("city_top3", pa.string()),
+        ("interest_top1", pa.string()),
+        ("interest_top2", pa.string()),
+        ("interest_top3", pa.string()),
+    ]),
+    'fans': pa.schema(_COMMON_FIELDS + [
+        ("dimension", pa.string()),
+        ("total_fans", pa.int64()),
+        ("new_fans", pa.int64()),
+        ("lost_fans", pa.int64()),
+    ]),
+}
+
+
+def _convert(value: Any, data_type: pa.DataType) -> Any:
+    """将采集到的原始值转换为列类型"""
+    if pa.types.is_int64(data_type):
+        return to_int(value)
+    if pa.types.is_floating(data_type):
+        return to_percent(value)
+    if pa.types.is_timestamp(data_type):
+        return to_timestamp(value)
+    return to_text(value)
+
+
+class ParquetStorage(BaseStorage):
+    """Parquet列式存储实现类
+
+    数据保存在 ``<data_dir>/creator_parquet/<数据类型>/date=<YYYY-MM-DD>/data.parquet``，
+    每天一个分区，保存时只替换当天的分区。读取时按日期裁剪分区、只读取指定的列。
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化Parquet存储
+
+        Args:
+            config: 配置参数，包含data_dir等
+        """
+        super().__init__(config)
+        self.data_dir = Path(config.get('data_dir', 'src/data'))
+        self.parquet_dir = self.data_dir / 'creator_parquet'
+        self._initialize_sync()
+
+    def _initialize_sync(self) -> None:
+        self.parquet_dir.mkdir(parents=True, exist_ok=True)
+        for data_type in SCHEMAS:
+            (self.parquet_dir / data_type).mkdir(exist_ok=True)
+        self._initialized = True
+        logger.info(f"📁 Parquet存储初始化成功，数据目录: {self.parquet_dir}")
+
+    async def initialize(self) -> bool:
+        try:
+            self._initialize_sync()
+            return True
+        except Exception as e:
+            logger.error(f"❌ Parquet存储初始化失败: {e}")
+            return False
+
+    def save_dashboard_data(self, data: List[Dict[str, Any]]) -> None:
+        """同步保存仪表板数据"""
+        self._save_today('dashboard', data)
+
+    def save_content_analysis_data(self, data: List[Dict[str, Any]]) -> None:
+        """同步保存内容分析数据"""
+        self._save_today('content_analysis', data)
+
+    def save_fans_data(self, data: List[Dict[str, Any]]) -> None:
+        """同步保存粉丝数据"""
+        self._save_today('fans', data)
+
+    def _partitions(self, data_type: str) -> List[str]:
+        """按日期升序返回已有的分区日期"""
+        dataset_dir = self.parquet_dir / data_type
+        if not dataset_dir.exists():
+            return []
+        dates = []
+        for path in dataset_dir.iterdir():
+            match = PARTITION_PATTERN.match(path.name)
+            if match and (path / 'data.parquet').exists():
+                dates.append(match.group(1))
+        return sorted(dates)
+
+    def _save_today(self, data_type: str, data: List[Dict[str, Any]]) -> None:
+        """用新数据替换当天的分区"""
+        now = datetime.now()
+        rows = [{**item, 'created_at': now, 'updated_at': now} for item in data]
+        self._write_partition(data_type, now.strftime('%Y-%m-%d'), rows)
+        logger.info(f"💾 {data_type} 数据已保存到Parquet: {len(rows)} 条记录")
+
+    def _write_partition(self, data_type: str, date: str, rows: List[Dict[str, Any]]) -> None:
+        """将记录转换为列类型后写入（替换）某一天的分区"""
+        schema = SCHEMAS[data_type]
+        table = pa.Table.from_pylist(
+            [{field.name: _convert(row.get(field.name), field.type) for field in schema} for row in rows],
+            schema=schema
+        )
+        partition_dir = self.parquet_dir / data_type / f"date={date}"
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = partition_dir / 'data.parquet.tmp'
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, partition_dir / 'data.parquet')
+
+    def backfilled_types(self) -> List[str]:
+        """已从CSV导入过历史数据的数据类型"""
+        marker = self.parquet_dir / BACKFILL_MARKER
+        if not marker.exists():
+            return []
+        try:
+            return json.loads(marker.read_text(encoding='utf-8')).get('data_types', [])
+        except (OSError, ValueError):
+            return []
+
+    def backfill(self, data_type: str, rows: List[Dict[str, Any]]) -> int:
+        """
+        导入CSV中的历史数据，按创建时间的日期分区，只写入Parquet中还没有的日期
+
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            rows: CSV中的记录（英文字段名）
+
+        Returns:
+            int: 导入的记录数
+        """
+        existing = set(self._partitions(data_type))
+        by_date: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            date = str(row.get('created_at') or '')[:10]
+            if PARTITION_PATTERN.match(f"date={date}") and date not in existing:
+                by_date.setdefault(date, []).append(row)
+
+        for date, date_rows in by_date.items():
+            self._write_partition(data_type, date, date_rows)
+
+        marker = self.parquet_dir / BACKFILL_MARKER
+        data_types = sorted(set(self.backfilled_types()) | {data_type})
+        marker.write_text(json.dumps({'data_types': data_types}), encoding='utf-8')
+        imported = sum(len(date_rows) for date_rows in by_date.values())
+        if imported:
+            logger.info(f"📥 已从CSV导入 {data_type} 历史数据到Parquet: {len(by_date)} 天，{imported} 条记录")
+        return imported
+
+    def read_table(self, data_type: str, columns: Optional[List[str]] = None,
+                   start_date: Optional[str] = None, end_date: Optional[str] = None) -> pa.Table:
+        """
+        读取数据，只加载指定列和日期范围内的分区
+
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            columns: 需要的列，默认全部
+            start_date: 起始日期 YYYY-MM-DD（含），默认不限
+            end_date: 结束日期 YYYY-MM-DD（含），默认不限
+
+        Returns:
+            pyarrow.Table，按创建时间升序
+        """
+        if data_type not in SCHEMAS:
+            raise ValueError(f"未知数据类型: {data_type}")
+        schema = SCHEMAS[data_type]
+        columns = list(columns) if columns else schema.names
+        if not self._partitions(data_type):
+            return pa.Table.from_pylist([], schema=pa.schema([schema.field(c) for c in columns]))
+
+        dataset = ds.dataset(self.parquet_dir / data_type, format="parquet",
+                             partitioning=PARTITIONING, schema=schema.append(pa.field("date", pa.string())),
+                             exclude_invalid_files=True)
+        condition = None
+        if start_date:
+            condition = ds.field("date") >= start_date
+        if end_date:
+            upper = ds.field("date") <= end_date
+            condition = upper if condition is None else condition & upper
+
+        # 排序需要 created_at，未请求时读取后再去掉
+        read_columns = columns if "created_at" in columns else columns + ["created_at"]
+        table = dataset.to_table(columns=read_columns, filter=condition)
+        table = table.sort_by("created_at")
+        return table.select(columns)
+
+    def read_dataframe(self, data_type: str, columns: Optional[List[str]] = None,
+                       start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """读取数据为 pandas DataFrame，参数同 read_table"""
+        return self.read_table(data_type, columns, start_date, end_date).to_pandas()
+
+    async def get_latest_data(self, data_type: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        获取最新数据，从最新的分区开始读取，读够 limit 条即停止
+
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            limit: 返回数据条数限制
+
+        Returns:
+            List[Dict[str, Any]]: 按创建时间倒序的数据列表，时间字段为ISO字符串
+        """
+        if data_type not in SCHEMAS:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+
+        data = []
+        try:
+            for date in reversed(self._partitions(data_type)):
+                if len(data) >= limit:
+                    break
+                rows = pq.read_table(self.parquet_dir / data_type / f"date={date}" / 'data.parquet').to_pylist()
+                rows.sort(key=lambda x: x['created_at'] or datetime.min, reverse=True)
+                data.extend(rows)
+        except Exception as e:
+            logger.error(f"❌ 获取最新数据失败: {e}")
+            return []
+
+        for row in data:
+            for key in ('created_at', 'updated_at'):
+                if isinstance(row.get(key), datetime):
+                    row[key] = row[key].isoformat()
+        return data[:limit]
+
+    async def close(self) -> None:
+        """关闭存储连接"""
+        logger.debug("📁 Parquet存储连接已关闭")
+
+    def get_storage_info(self) -> Dict[str, Any]:
+        """获取存储信息"""
+        info = {
+            'storage_type': 'Parquet',
+            'data_path': str(self.parquet_dir),
+            'initialized': self._initialized,
+            'datasets': {}
+        }
+        for data_type in SCHEMAS:
+            dates = self._partitions(data_type)
+            files = [self.parquet_dir / data_type / f"date={date}" / 'data.parquet' for date in dates]
+            info['datasets'][data_type] = {
+                'partitions': len(dates),
+                'first_date': dates[0] if dates else None,
+                'last_date': dates[-1] if dates else None,
+                'records': sum(pq.ParquetFile(f).metadata.num_rows for f in files),
+                'size_bytes': sum(f.stat().st_size for f in files)
+            }
+        return info
+
+    def remove_partition(self, data_type: str, date: str) -> bool:
+        """删除某一天的分区"""
+        partition_dir = self.parquet_dir / data_type / f"date={date}"
+        if not partition_dir.exists():
+            return False
+        shutil.rmtree(partition_dir)
+        return True
@@ -0,0 +1,213 @@
+"""
+按天分区的CSV存储实现
+
+每种数据一个目录、每天一个CSV文件，覆盖当天数据只需重写当天的文件
+"""
+
+import os
+import re
+import csv
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from .csv_storage import CSVStorage
+
+logger = logging.getLogger(__name__)
+
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}')
+
+
+class PartitionedCSVStorage(CSVStorage):
+    """按天分区的CSV存储
+
+    数据按 created_at 的日期写入 ``creator_db/<数据文件名>/<YYYY-MM-DD>.csv``，
+    每个分区文件的表头与单文件格式相同。保存时只重写当天的分区，
+    耗时与历史数据量无关；读取最新数据时从最新的分区开始，读够即止。
+    首次初始化时将旧的单文件数据按天拆分为分区，旧文件重命名为 ``*.csv.migrated``。
+    """
+
+    def _initialize_sync(self) -> None:
+        """同步初始化分区目录，并迁移旧的单文件数据"""
+        try:
+            self.csv_dir.mkdir(parents=True, exist_ok=True)
+            for file_path, fields, chinese_headers in self._datasets().values():
+                self._partition_dir(file_path).mkdir(exist_ok=True)
+                self._migrate_legacy_file(file_path, fields, chinese_headers)
+
+            self._initialized = True
+            logger.info(f"📁 分区CSV存储初始化成功，数据目录: {self.csv_dir}")
+
+        except Exception as e:
+            logger.error(f"❌ 分区CSV存储初始化失败: {e}")
+            raise
+
+    def _partition_dir(self, file_path: Path) -> Path:
+        return self.csv_dir / file_path.stem
+
+    def _partition_files(self, file_path: Path) -> List[Path]:
+        """按日期升序返回所有分区文件"""
+        partition_dir = self._partition_dir(file_path)
+        if not partition_dir.exists():
+            return []
+        return sorted(p for p in partition_dir.glob('*.csv') if DATE_PATTERN.match(p.stem))
+
+    def _write_partition(self, partition: Path, fields: List[str], rows: List[Dict[str, Any]],
+                         chinese_headers: Optional[List[str]] = None) -> None:
+        """写入整个分区文件，先写临时文件再替换，避免写入中断留下半个文件"""
+        tmp_path = partition.with_suffix('.csv.tmp')
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(chinese_headers or fields)
+            for row in rows:
+                writer.writerow([row.get(field, '') for field in fields])
+        os.replace(tmp_path, partition)
+
+    def _read_partition(self, partition: Path, fields: List[str],
+                        chinese_headers: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """读取分区文件，中文表头转换为英文字段名"""
+        with open(partition, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            headers = next(reader, None)
+            if not headers:
+                return []
+            if headers == chinese_headers:
+                headers = fields
+            return [dict(zip(headers, row)) for row in reader if len(row) == len(headers)]
+
+    def _save_with_daily_overwrite(self, file_path: Path, fields: List[str], new_data: List[Dict[str, Any]],
+                                   chinese_headers: List[str] = None) -> None:
+        """
+        用新数据替换当天的分区
+
+        Args:
+            file_path: 单文件CSV路径，用于确定分区目录
+            fields: 英文字段列表
+            new_data: 新数据列表
+            chinese_headers: 中文表头列表
+        """
+        partition_dir = self._partition_dir(file_path)
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        partition = partition_dir / f"{self._get_today_date()}.csv"
+        self._write_partition(partition, fields, new_data, chinese_headers)
+        logger.info(f"💾 数据已按日期覆盖保存: {partition_dir.name}/{partition.name}，{len(new_data)} 条今日记录")
+
+    def _migrate_legacy_file(self, file_path: Path, fields: List[str], chinese_headers: List[str]) -> None:
+        """将旧的单文件数据按创建日期拆分到分区，已存在的分区不覆盖"""
+        if not file_path.exists():
+            return
+
+        rows = self._read_partition(file_path, fields, chinese_headers)
+        by_date: Dict[str, List[Dict[str, Any]]] = {}
+        last_date = '1970-01-01'
+        for row in rows:
+            created_at = str(row.get('created_at', ''))
+            # 旧数据按时间顺序追加，缺少日期的行归入上一行所在的日期
+            if DATE_PATTERN.match(created_at):
+                last_date = created_at[:10]
+            by_date.setdefault(last_date, []).append(row)
+
+        partition_dir = self._partition_dir(file_path)
+        written = 0
+        for date, date_rows in by_date.items():
+            partition = partition_dir / f"{date}.csv"
+            if not partition.exists():
+                self._write_partition(partition, fields, date_rows, chinese_headers)
+                written += 1
+
+        file_path.rename(file_path.with_name(file_path.name + '.migrated'))
+        logger.info(f"📦 已将 {file_path.name} 的 {len(rows)} 条记录迁移到 {written} 个日期分区")
+
+    async def get_latest_data(self, data_type: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        获取最新数据，从最新的分区开始读取，读够 limit 条即停止
+
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            limit: 返回数据条数限制
+
+        Returns:
+            List[Dict[str, Any]]: 按创建时间倒序的数据列表
+        """
+        dataset = self._datasets().get(data_type)
+        if dataset is None:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+
+        file_path, fields, chinese_headers = dataset
+        data = []
+        try:
+            for partition in reversed(self._partition_files(file_path)):
+                if len(data) >= limit:
+                    break
+                rows = self._read_partition(partition, fields, chinese_headers)
+                rows.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+                data.extend(rows)
+        except Exception as e:
+            logger.error(f"❌ 获取最新数据失败: {e}")
+            return []
+        return data[:limit]
+
+    def read_range(self, data_type: str, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        读取日期范围内的数据，只打开范围内的分区
+
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            start_date: 起始日期 YYYY-MM-DD（含），默认不限
+            end_date: 结束日期 YYYY-MM-DD（含），默认不限
+
+        Returns:
+            List[Dict[str, Any]]: 按日期升序的数据列表
+        """
+        dataset = self._datasets().get(data_type)
+        if dataset is None:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+
+        file_path, fields, chinese_headers = dataset
+        data = []
+        for partition in self._partition_files(file_path):
+            date = partition.stem
+            if (start_date and date < start_date) or (end_date and date > end_date):
+                continue
+            data.extend(self._read_partition(partition, fields, chinese_headers))
+        return data
+
+    def get_storage_info(self) -> Dict[str, Any]:
+        """获取存储信息"""
+        try:
+            info = {
+                'storage_type': 'PartitionedCSV',
+                'data_path': str(self.data_dir),
+                'csv_path': str(self.csv_dir),
+                'initialized': self._initialized,
+                'files': {}
+            }
+
+            for file_path, _, _ in self._datasets().values():
+                partitions = self._partition_files(file_path)
+                records = 0
+                for partition in partitions:
+                    with open(partition, 'r', newline='', encoding='utf-8') as f:
+                        records += max(0, sum(1 for _ in csv.reader(f)) - 1)  # 减去表头
+
+                info['files'][file_path.name] = {
+                    'exists': bool(partitions),
+                    'path': str(self._partition_dir(file_path)),
+                    'partitions': len(partitions),
+                    'first_date': partitions[0].stem if partitions else None,
+                    'last_date': partitions[-1].stem if partitions else None,
+                    'records': records,
+                    'size_bytes': sum(p.stat().st_size for p in partitions)
+                }
+
+            return info
+
+        except Exception as e:
+            logger.error(f"❌ 获取存储信息失败: {e}")
+            return {
+                'storage_type': 'PartitionedCSV',
+                'error': str(e)
+            }
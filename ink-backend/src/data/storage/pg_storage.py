@@ -1,149 +1,393 @@
 """
-PostgreSQL数据存储实现（占位代码）
+PostgreSQL数据存储实现
 
-TODO: 等主程序及整体功能测试通过后再实现
+使用 asyncpg 连接池，初始化时自动执行建表迁移。每次保存按 (统计日期, 维度/笔记)
+批量合并：少量数据使用多行 INSERT ... ON CONFLICT，大批量数据先 COPY 到临时表再合并。
+依赖 asyncpg（可选依赖）。
 """
 
-from typing import Dict, List, Any, Optional
+from datetime import date, datetime
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlparse
 
 from .base import BaseStorage
+from .converters import to_int, to_percent, to_text
 from ...utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 迁移加锁使用的 advisory lock 编号，避免多个进程同时执行迁移
+MIGRATION_LOCK_ID = 7_305_412
+
+# 数据库迁移，按版本顺序执行，已执行的版本记录在 schema_migrations 表中。
+# 已发布的迁移不要修改，表结构变更请追加新版本。
+MIGRATIONS: List[Tuple[int, str]] = [
+    (1, """
+        CREATE TABLE IF NOT EXISTS dashboard_data (
+            stat_date DATE NOT NULL,
+            dimension TEXT NOT NULL,
+            "timestamp" TEXT,
+            views BIGINT NOT NULL DEFAULT 0,
+            likes BIGINT NOT NULL DEFAULT 0,
+            collects BIGINT NOT NULL DEFAULT 0,
+            comments BIGINT NOT NULL DEFAULT 0,
+            shares BIGINT NOT NULL DEFAULT 0,
+            interactions BIGINT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (stat_date, dimension)
+        );
+
+        CREATE TABLE IF NOT EXISTS content_analysis_data (
+            stat_date DATE NOT NULL,
+            note_key TEXT NOT NULL,
+            note_id TEXT,
+            "timestamp" TEXT,
+            title TEXT,
+            note_type TEXT,
+            publish_time TEXT,
+            views BIGINT NOT NULL DEFAULT 0,
+            likes BIGINT NOT NULL DEFAULT 0,
+            comments BIGINT NOT NULL DEFAULT 0,
+            collects BIGINT NOT NULL DEFAULT 0,
+            shares BIGINT NOT NULL DEFAULT 0,
+            fans_growth BIGINT NOT NULL DEFAULT 0,
+            avg_watch_time TEXT,
+            danmu_count BIGINT NOT NULL DEFAULT 0,
+            source_recommend DOUBLE PRECISION,
+            source_search DOUBLE PRECISION,
+            source_follow DOUBLE PRECISION,
+            source_other DOUBLE PRECISION,
+            gender_male DOUBLE PRECISION,
+            gender_female DOUBLE PRECISION,
+            age_18_24 DOUBLE PRECISION,
+            age_25_34 DOUBLE PRECISION,
+            age_35_44 DOUBLE PRECISION,
+            age_45_plus DOUBLE PRECISION,
+            city_top1 TEXT,
+            city_top2 TEXT,
+            city_top3 TEXT,
+            interest_top1 TEXT,
+            interest_top2 TEXT,
+            interest_top3 TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (stat_date, note_key)
+        );
+
+        CREATE TABLE IF NOT EXISTS fans_data (
+            stat_date DATE NOT NULL,
+            dimension TEXT NOT NULL,
+            "timestamp" TEXT,
+            total_fans BIGINT NOT NULL DEFAULT 0,
+            new_fans BIGINT NOT NULL DEFAULT 0,
+            lost_fans BIGINT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (stat_date, dimension)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_dashboard_data_updated_at ON dashboard_data (updated_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_content_analysis_data_updated_at ON content_analysis_data (updated_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_fans_data_updated_at ON fans_data (updated_at DESC);
+    """),
+]
+
+_PERCENT_FIELDS = [
+    'source_recommend', 'source_search', 'source_follow', 'source_other',
+    'gender_male', 'gender_female', 'age_18_24', 'age_25_34', 'age_35_44', 'age_45_plus'
+]
+
+# 数据类型 -> 表名、主键、数据列及其转换函数
+TABLES: Dict[str, Dict[str, Any]] = {
+    'dashboard': {
+        'table': 'dashboard_data',
+        'key': ('stat_date', 'dimension'),
+        'columns': [('dimension', to_text), ('timestamp', to_text)] + [
+            (name, to_int) for name in ('views', 'likes', 'collects', 'comments', 'shares', 'interactions')
+        ],
+    },
+    'content_analysis': {
+        'table': 'content_analysis_data',
+        'key': ('stat_date', 'note_key'),
+        'columns': [
+            ('note_key', to_text), ('note_id', to_text), ('timestamp', to_text),
+            ('title', to_text), ('note_type', to_text), ('publish_time', to_text),
+        ] + [
+            (name, to_int) for name in ('views', 'likes', 'comments', 'collects', 'shares', 'fans_growth')
+        ] + [('avg_watch_time', to_text), ('danmu_count', to_int)] + [
+            (name, to_percent) for name in _PERCENT_FIELDS
+        ] + [
+            (name, to_text) for name in ('city_top1', 'city_top2', 'city_top3',
+                                         'interest_top1', 'interest_top2', 'interest_top3')
+        ],
+    },
+    'fans': {
+        'table': 'fans_data',
+        'key': ('stat_date', 'dimension'),
+        'columns': [('dimension', to_text), ('timestamp', to_text)] + [
+            (name, to_int) for name in ('total_fans', 'new_fans', 'lost_fans')
+        ],
+    },
+}
+
+
+def note_key(note: Dict[str, Any]) -> str:
+    """笔记的唯一标识，优先使用笔记ID，没有时使用标题和发布时间"""
+    note_id = to_text(note.get('note_id')).strip()
+    if note_id:
+        return note_id
+    return f"{to_text(note.get('title')).strip()}|{to_text(note.get('publish_time')).strip()}"
+
 
 class PostgreSQLStorage(BaseStorage):
-    """PostgreSQL数据存储实现（占位）"""
-    
+    """PostgreSQL数据存储实现
+
+    所有方法都是协程，连接池绑定在调用 initialize 的事件循环上，
+    之后的调用必须在同一个事件循环中执行。
+    """
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化PostgreSQL存储
-        
+
         Args:
-            config: 配置参数，包含数据库连接信息
+            config: 配置参数，包含 database_url 或 host/port/database/user/password，
+                以及连接池参数 min_pool_size/max_pool_size/command_timeout/copy_threshold
         """
         super().__init__(config)
+        self.database_url = config.get('database_url')
         self.host = config.get('host', 'localhost')
         self.port = config.get('port', 5432)
         self.database = config.get('database', 'xhs_toolkit')
-        self.username = config.get('username', 'postgres')
+        self.username = config.get('user') or config.get('username', 'postgres')
         self.password = config.get('password', '')
-        self.connection = None
-    
+        self.min_pool_size = config.get('min_pool_size', 1)
+        self.max_pool_size = config.get('max_pool_size', 5)
+        self.command_timeout = config.get('command_timeout', 30)
+        # 超过该行数时使用 COPY 写入，否则使用多行 INSERT
+        self.copy_threshold = config.get('copy_threshold', 50)
+        self._pool = None
+
     async def initialize(self) -> bool:
         """
-        初始化PostgreSQL连接
-        
+        创建连接池并执行数据库迁移
+
         Returns:
             bool: 初始化是否成功
         """
-        # TODO: 实现PostgreSQL连接初始化
-        logger.warning("⚠️ PostgreSQL存储暂未实现，请使用CSV存储")
-        return False
-    
-    async def save_dashboard_data(self, data: Dict[str, Any]) -> bool:
+        if self._initialized:
+            return True
+        try:
+            import asyncpg
+        except ImportError:
+            logger.error("❌ 未安装asyncpg，无法使用PostgreSQL存储，请执行: pip install asyncpg")
+            return False
+
+        try:
+            connect_args = {'dsn': self.database_url} if self.database_url else {
+                'host': self.host, 'port': self.port, 'database': self.database,
+                'user': self.username, 'password': self.password
+            }
+            self._pool = await asyncpg.create_pool(
+                min_size=self.min_pool_size,
+                max_size=self.max_pool_size,
+                command_timeout=self.command_timeout,
+                **connect_args
+            )
+            async with self._pool.acquire() as conn:
+                applied = await self._migrate(conn)
+            self._initialized = True
+            logger.info(f"🐘 PostgreSQL存储初始化成功，执行迁移 {applied} 个")
+            return True
+        except Exception as e:
+            logger.error(f"❌ PostgreSQL存储初始化失败: {e}")
+            await self.close()
+            return False
+
+    @staticmethod
+    async def _migrate(conn) -> int:
+        """执行尚未执行的迁移，返回本次执行的数量"""
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", MIGRATION_LOCK_ID)
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version INTEGER PRIMARY KEY, applied_at TIMESTAMP NOT NULL DEFAULT now())"
+            )
+            applied = {row['version'] for row in await conn.fetch("SELECT version FROM schema_migrations")}
+            count = 0
+            for version, sql in MIGRATIONS:
+                if version in applied:
+                    continue
+                await conn.execute(sql)
+                await conn.execute("INSERT INTO schema_migrations (version) VALUES ($1)", version)
+                logger.info(f"📜 已执行数据库迁移 v{version}")
+                count += 1
+            return count
+
+    @staticmethod
+    def _columns(data_type: str) -> List[str]:
+        return ['stat_date'] + [name for name, _ in TABLES[data_type]['columns']] + ['created_at', 'updated_at']
+
+    @staticmethod
+    def _prepare_records(data_type: str, data: List[Dict[str, Any]],
+                         now: Optional[datetime] = None) -> List[tuple]:
+        """
+        将数据转换为按列顺序的记录，同一主键只保留最后一条
+
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            data: 采集到的数据列表
+            now: 保存时间，统计日期取其日期部分
+
+        Returns:
+            与 _columns 顺序一致的记录列表
+        """
+        spec = TABLES[data_type]
+        now = now or datetime.now()
+        records: Dict[tuple, tuple] = {}
+        for item in data:
+            if data_type == 'content_analysis':
+                item = {**item, 'note_key': note_key(item)}
+            values = {name: convert(item.get(name)) for name, convert in spec['columns']}
+            values['stat_date'] = now.date()
+            key = tuple(values[name] for name in spec['key'])
+            records[key] = (now.date(), *(values[name] for name, _ in spec['columns']), now, now)
+        return list(records.values())
+
+    async def _upsert(self, data_type: str, data: List[Dict[str, Any]]) -> bool:
+        """按主键批量合并数据，已存在的记录保留创建时间、更新其余字段"""
+        if not self._initialized:
+            logger.error("❌ PostgreSQL存储未初始化")
+            return False
+        records = self._prepare_records(data_type, data)
+        if not records:
+            return True
+
+        spec = TABLES[data_type]
+        table = spec['table']
+        columns = self._columns(data_type)
+        column_list = ", ".join(f'"{name}"' for name in columns)
+        conflict = f"ON CONFLICT ({', '.join(spec['key'])}) DO UPDATE SET " + ", ".join(
+            f'"{name}" = EXCLUDED."{name}"' for name in columns
+            if name not in spec['key'] and name != 'created_at'
+        )
+
+        try:
+            async with self._pool.acquire() as conn:
+                async with conn.transaction():
+                    if len(records) > self.copy_threshold:
+                        await conn.execute(
+                            f"CREATE TEMP TABLE _staging_{table} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+                        )
+                        await conn.copy_records_to_table(f"_staging_{table}", records=records, columns=columns)
+                        await conn.execute(
+                            f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM _staging_{table} {conflict}"
+                        )
+                    else:
+                        width = len(columns)
+                        placeholders = ", ".join(
+                            "(" + ", ".join(f"${row * width + col + 1}" for col in range(width)) + ")"
+                            for row in range(len(records))
+                        )
+                        args = [value for record in records for value in record]
+                        await conn.execute(f"INSERT INTO {table} ({column_list}) VALUES {placeholders} {conflict}", *args)
+            logger.info(f"🐘 {data_type} 数据已保存到PostgreSQL: {len(records)} 条记录")
+            return True
+        except Exception as e:
+            logger.error(f"❌ 保存{data_type}数据到PostgreSQL失败: {e}")
+            return False
+
+    async def save_dashboard_data(self, data: List[Dict[str, Any]]) -> bool:
         """
         保存账号概览数据到PostgreSQL
-        
+
         Args:
-            data: 账号概览数据
-            
+            data: 账号概览数据列表，每个维度一条
+
         Returns:
             bool: 保存是否成功
         """
-        # TODO: 实现PostgreSQL数据保存
-        logger.warning("⚠️ PostgreSQL存储暂未实现")
-        return False
-    
+        return await self._upsert('dashboard', data)
+
     async def save_content_analysis_data(self, data: List[Dict[str, Any]]) -> bool:
         """
         保存内容分析数据到PostgreSQL
-        
+
         Args:
             data: 内容分析数据列表
-            
+
         Returns:
             bool: 保存是否成功
         """
-        # TODO: 实现PostgreSQL数据保存
-        logger.warning("⚠️ PostgreSQL存储暂未实现")
-        return False
-    
-    async def save_fans_data(self, data: Dict[str, Any]) -> bool:
+        return await self._upsert('content_analysis', data)
+
+    async def save_fans_data(self, data: List[Dict[str, Any]]) -> bool:
         """
         保存粉丝数据到PostgreSQL
-        
+
         Args:
-            data: 粉丝数据
-            
+            data: 粉丝数据列表，每个维度一条
+
         Returns:
             bool: 保存是否成功
         """
-        # TODO: 实现PostgreSQL数据保存
-        logger.warning("⚠️ PostgreSQL存储暂未实现")
-        return False
-    
+        return await self._upsert('fans', data)
+
     async def get_latest_data(self, data_type: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         从PostgreSQL获取最新数据
-        
+
         Args:
             data_type: 数据类型 (dashboard, content_analysis, fans)
             limit: 返回数据条数限制
-            
+
         Returns:
-            List[Dict[str, Any]]: 数据列表
+            List[Dict[str, Any]]: 按更新时间倒序的数据列表，日期时间字段为ISO字符串
         """
-        # TODO: 实现PostgreSQL数据查询
-        logger.warning("⚠️ PostgreSQL存储暂未实现")
-        return []
-    
+        spec = TABLES.get(data_type)
+        if spec is None:
+            logger.warning(f"⚠️ 未知数据类型: {data_type}")
+            return []
+        if not self._initialized:
+            return []
+
+        try:
+            async with self._pool.acquire() as conn:
+                rows = await conn.fetch(
+                    f"SELECT * FROM {spec['table']} ORDER BY updated_at DESC, stat_date DESC LIMIT $1", limit
+                )
+        except Exception as e:
+            logger.error(f"❌ 获取最新数据失败: {e}")
+            return []
+
+        data = []
+        for row in rows:
+            item = dict(row)
+            for key, value in item.items():
+                if isinstance(value, (date, datetime)):
+                    item[key] = value.isoformat()
+            data.append(item)
+        return data
+
     async def close(self) -> None:
-        """关闭PostgreSQL连接"""
-        # TODO: 实现连接关闭
-        if self.connection:
-            # await self.connection.close()
-            pass
+        """关闭连接池"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+        self._initialized = False
         logger.debug("🔌 PostgreSQL存储连接已关闭")
 
-
-# TODO: 后续实现计划
-"""
-PostgreSQL实现计划：
-
-1. 数据库表结构设计：
-   - dashboard_data: 账号概览数据表
-   - content_analysis_data: 内容分析数据表  
-   - fans_data: 粉丝数据表
-
-2. 依赖库：
-   - asyncpg: 异步PostgreSQL驱动
-   - sqlalchemy: ORM框架（可选）
-
-3. 功能实现：
-   - 连接池管理
-   - 自动建表
-   - 数据插入/查询
-   - 事务处理
-   - 错误重试
-
-4. 配置项：
-   - 数据库连接参数
-   - 连接池大小
-   - 超时设置
-   - 重试策略
-
-示例配置：
-{
-    "storage_type": "postgresql",
-    "host": "localhost",
-    "port": 5432,
-    "database": "xhs_toolkit",
-    "username": "postgres", 
-    "password": "password",
-    "pool_size": 10,
-    "max_overflow": 20,
-    "pool_timeout": 30,
-    "pool_recycle": 3600
-}
-""" 
\ No newline at end of file
+    def get_storage_info(self) -> Dict[str, Any]:
+        """获取存储信息"""
+        info = {
+            'storage_type': 'PostgreSQL',
+            'database': urlparse(self.database_url).path.lstrip('/') if self.database_url else self.database,
+            'initialized': self._initialized,
+            'schema_version': MIGRATIONS[-1][0],
+            'pool_max_size': self.max_pool_size
+        }
+        if self._pool is not None:
+            info['pool_size'] = self._pool.get_size()
+            info['pool_idle'] = self._pool.get_idle_size()
+        return info
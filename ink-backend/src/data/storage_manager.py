@@ -1,18 +1,53 @@
 """
 数据存储管理器
 
-提供统一的数据存储接口，支持CSV和PostgreSQL存储
+提供统一的数据存储接口，支持CSV、Parquet和PostgreSQL存储
 """
 
 import os
+import atexit
+import asyncio
 import logging
+import threading
+import pandas as pd
 from typing import Optional, List, Dict, Any
 from .storage.base import BaseStorage
 from .storage.csv_storage import CSVStorage
+from .storage.partitioned_storage import PartitionedCSVStorage
 from .storage.pg_storage import PostgreSQLStorage
+from .write_buffer import WriteBehindBuffer
 
 logger = logging.getLogger(__name__)
 
+DATA_LABELS = {'dashboard': '仪表板', 'content_analysis': '内容分析', 'fans': '粉丝'}
+
+
+class _BackgroundLoop:
+    """在专用线程中运行的事件循环
+
+    PostgreSQL连接池绑定在创建它的事件循环上，而存储管理器会被不同线程、
+    不同事件循环中的代码调用，因此所有数据库操作都提交到这个循环中执行。
+    """
+
+    def __init__(self, name: str):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def run(self, coro, timeout: Optional[float] = None) -> Any:
+        """在后台循环中执行协程并同步等待结果"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def run_async(self, coro) -> Any:
+        """在后台循环中执行协程，当前事件循环中等待结果"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        if not self._thread.is_alive():
+            self.loop.close()
+
 
 class StorageManager:
     """数据存储管理器"""
@@ -20,6 +55,12 @@ class StorageManager:
     def __init__(self):
         self._csv_storage: Optional[CSVStorage] = None
         self._pg_storage: Optional[PostgreSQLStorage] = None
+        self._pg_loop: Optional[_BackgroundLoop] = None
+        self._pg_timeout = 60.0
+        self._parquet_storage: Optional[BaseStorage] = None
+        self._write_buffer: Optional[WriteBehindBuffer] = None
+        self._flush_timeout = 60.0
+        self._atexit_registered = False
         self._initialized = False
         
     def initialize(self, data_path: Optional[str] = None, 
@@ -39,14 +80,31 @@ class StorageManager:
             data_path = os.getenv('DATA_STORAGE_PATH', 'data')
             
         # 初始化CSV存储（始终启用）
+        # partitioned: 按天分区的CSV文件（默认）；csv: 旧的单文件CSV
+        engine = os.getenv('DATA_STORAGE_ENGINE', 'partitioned').lower()
         try:
             csv_config = {'data_dir': data_path}
-            self._csv_storage = CSVStorage(csv_config)
-            logger.info(f"CSV存储已初始化，数据路径: {data_path}")
+            if engine == 'csv':
+                self._csv_storage = CSVStorage(csv_config)
+            else:
+                self._csv_storage = PartitionedCSVStorage(csv_config)
+            logger.info(f"CSV存储已初始化（{engine}），数据路径: {data_path}")
         except Exception as e:
             logger.error(f"CSV存储初始化失败: {e}")
             raise
             
+        # Parquet列式存储（可选，需要pyarrow）
+        if os.getenv('ENABLE_PARQUET_STORAGE', 'false').lower() == 'true':
+            try:
+                from .storage.parquet_storage import ParquetStorage
+                self._parquet_storage = ParquetStorage({'data_dir': data_path})
+                logger.info("Parquet存储已启用")
+                self._backfill_parquet()
+            except ImportError:
+                logger.warning("未安装pyarrow，Parquet存储不可用，请执行: pip install pyarrow")
+            except Exception as e:
+                logger.warning(f"Parquet存储初始化失败，将仅使用CSV存储: {e}")
+            
         # 检查是否启用PostgreSQL数据库
         enable_database = os.getenv('ENABLE_DATABASE', 'false').lower() == 'true'
         
@@ -55,24 +113,50 @@ class StorageManager:
             if database_config is None:
                 database_config = self._get_database_config_from_env()
                 
-            # 初始化PostgreSQL存储
+            # 初始化PostgreSQL存储（连接池和迁移在专用的事件循环线程中执行）
+            self._pg_timeout = float(database_config.get('command_timeout', 30)) * 2
+            pg_loop = _BackgroundLoop("pg-storage")
+            pg_storage = PostgreSQLStorage(database_config)
             try:
-                self._pg_storage = PostgreSQLStorage(database_config)
-                logger.info("PostgreSQL存储已启用")
+                ok = pg_loop.run(pg_storage.initialize(), timeout=self._pg_timeout)
             except Exception as e:
-                logger.warning(f"PostgreSQL存储初始化失败，将仅使用CSV存储: {e}")
-                self._pg_storage = None
+                logger.warning(f"PostgreSQL存储初始化失败: {e}")
+                ok = False
+            if ok:
+                self._pg_storage, self._pg_loop = pg_storage, pg_loop
+                logger.info("PostgreSQL存储已启用")
+            else:
+                pg_loop.stop()
+                logger.warning("PostgreSQL存储初始化失败，将仅使用CSV存储")
         else:
             logger.info("PostgreSQL存储已禁用，仅使用CSV存储")
             
+        # 写入缓冲：保存时立即返回，由后台线程批量写入
+        if os.getenv('STORAGE_WRITE_BEHIND', 'true').lower() == 'true':
+            self._flush_timeout = float(os.getenv('STORAGE_FLUSH_TIMEOUT', '60'))
+            self._write_buffer = WriteBehindBuffer(
+                self._write, flush_interval=float(os.getenv('STORAGE_FLUSH_INTERVAL', '1.0'))
+            )
+            if not self._atexit_registered:
+                # 进程正常退出时写入剩余数据
+                atexit.register(self.flush)
+                self._atexit_registered = True
+            logger.info("存储写入缓冲已启用")
+            
         self._initialized = True
         
     def _get_database_config_from_env(self) -> Dict[str, Any]:
         """从环境变量获取数据库配置"""
+        pool_config = {
+            'min_pool_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '1')),
+            'max_pool_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '5')),
+            'command_timeout': float(os.getenv('DATABASE_COMMAND_TIMEOUT', '30'))
+        }
+        
         # 优先使用DATABASE_URL
         database_url = os.getenv('DATABASE_URL')
         if database_url:
-            return {'database_url': database_url}
+            return {'database_url': database_url, **pool_config}
             
         # 使用分离的配置项
         return {
@@ -80,7 +164,8 @@ class StorageManager:
             'port': int(os.getenv('DATABASE_PORT', '5432')),
             'database': os.getenv('DATABASE_NAME', 'xhs_toolkit'),
             'user': os.getenv('DATABASE_USER', 'username'),
-            'password': os.getenv('DATABASE_PASSWORD', 'password')
+            'password': os.getenv('DATABASE_PASSWORD', 'password'),
+            **pool_config
         }
         
     def is_database_enabled(self) -> bool:
@@ -93,6 +178,12 @@ class StorageManager:
             self.initialize()
         return self._csv_storage
         
+    def get_parquet_storage(self) -> Optional[BaseStorage]:
+        """获取Parquet存储实例，未启用时返回None"""
+        if not self._initialized:
+            self.initialize()
+        return self._parquet_storage
+        
     def get_pg_storage(self) -> Optional[PostgreSQLStorage]:
         """获取PostgreSQL存储实例"""
         if not self._initialized:
@@ -101,52 +192,157 @@ class StorageManager:
         
     def save_dashboard_data(self, data: List[Dict[str, Any]]) -> None:
         """保存仪表板数据"""
+        self._save('dashboard', data)
+                
+    def save_content_analysis_data(self, data: List[Dict[str, Any]]) -> None:
+        """保存内容分析数据"""
+        self._save('content_analysis', data)
+                
+    def save_fans_data(self, data: List[Dict[str, Any]]) -> None:
+        """保存粉丝数据"""
+        self._save('fans', data)
+        
+    def _save(self, data_type: str, data: List[Dict[str, Any]]) -> None:
+        """启用写入缓冲时放入缓冲区立即返回，否则直接写入"""
         if not self._initialized:
             self.initialize()
             
+        if self._write_buffer:
+            self._write_buffer.submit(data_type, data)
+        else:
+            self._write(data_type, data)
+            
+    def _write(self, data_type: str, data: List[Dict[str, Any]]) -> None:
+        """将数据写入所有已启用的存储"""
+        label = DATA_LABELS.get(data_type, data_type)
+        save_method = f"save_{data_type}_data"
+        
         # 保存到CSV（始终执行）
         if self._csv_storage:
-            self._csv_storage.save_dashboard_data(data)
+            getattr(self._csv_storage, save_method)(data)
             
-        # 保存到PostgreSQL（如果启用）
+        # 保存到Parquet（如果启用）
+        if self._parquet_storage:
+            try:
+                getattr(self._parquet_storage, save_method)(data)
+            except Exception as e:
+                logger.error(f"保存{label}数据到Parquet失败: {e}")
+            
+        # 保存到PostgreSQL（如果启用），在PostgreSQL事件循环中执行并等待完成
         if self._pg_storage:
             try:
-                self._pg_storage.save_dashboard_data(data)
+                if not self._pg_loop.run(getattr(self._pg_storage, save_method)(data), timeout=self._pg_timeout):
+                    logger.error(f"保存{label}数据到PostgreSQL失败")
             except Exception as e:
-                logger.error(f"保存仪表板数据到PostgreSQL失败: {e}")
+                logger.error(f"保存{label}数据到PostgreSQL失败: {e}")
                 
-    def save_content_analysis_data(self, data: List[Dict[str, Any]]) -> None:
-        """保存内容分析数据"""
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即写入写入缓冲中的所有数据并等待完成
+        
+        Args:
+            timeout: 最长等待时间（秒），默认使用 STORAGE_FLUSH_TIMEOUT
+            
+        Returns:
+            bool: 是否全部写入成功，写入失败的数据会在下次 flush 时重试；未启用写入缓冲时始终为True
+        """
+        if not self._write_buffer:
+            return True
+        return self._write_buffer.flush(self._flush_timeout if timeout is None else timeout)
+        
+    def get_write_queue_stats(self) -> Dict[str, Any]:
+        """写入缓冲的队列深度和写入统计"""
+        if not self._write_buffer:
+            return {'enabled': False}
+        return {'enabled': True, **self._write_buffer.stats()}
+            
+    async def get_latest_data(self, data_type: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        获取最新数据，启用PostgreSQL时从数据库读取，否则从CSV读取
+        
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            limit: 返回数据条数限制
+            
+        Returns:
+            List[Dict[str, Any]]: 按时间倒序的数据列表
+        """
         if not self._initialized:
             self.initialize()
             
-        # 保存到CSV（始终执行）
-        if self._csv_storage:
-            self._csv_storage.save_content_analysis_data(data)
+        # 先写入缓冲中的数据，保证读到刚保存的数据
+        if self._write_buffer:
+            await asyncio.to_thread(self.flush)
             
-        # 保存到PostgreSQL（如果启用）
         if self._pg_storage:
             try:
-                self._pg_storage.save_content_analysis_data(data)
+                return await self._pg_loop.run_async(self._pg_storage.get_latest_data(data_type, limit))
             except Exception as e:
-                logger.error(f"保存内容分析数据到PostgreSQL失败: {e}")
-                
-    def save_fans_data(self, data: List[Dict[str, Any]]) -> None:
-        """保存粉丝数据"""
+                logger.warning(f"从PostgreSQL读取{data_type}数据失败，改为读取CSV: {e}")
+        return await self._csv_storage.get_latest_data(data_type, limit)
+        
+    def close(self) -> None:
+        """写入缓冲中的剩余数据，关闭数据库连接池和后台事件循环"""
+        if self._write_buffer:
+            self._write_buffer.close(self._flush_timeout)
+            self._write_buffer = None
+            
+        if self._pg_storage and self._pg_loop:
+            try:
+                self._pg_loop.run(self._pg_storage.close(), timeout=self._pg_timeout)
+            except Exception as e:
+                logger.warning(f"关闭PostgreSQL连接池失败: {e}")
+            self._pg_loop.stop()
+        self._pg_storage = None
+        self._pg_loop = None
+        self._initialized = False
+        
+    def _backfill_parquet(self) -> None:
+        """首次启用Parquet存储时导入CSV中的历史数据，之后从Parquet读取不会缺少早期数据"""
+        done = set(self._parquet_storage.backfilled_types())
+        for data_type in ('dashboard', 'content_analysis', 'fans'):
+            if data_type in done:
+                continue
+            try:
+                self._parquet_storage.backfill(data_type, self._csv_storage.read_range(data_type))
+            except Exception as e:
+                logger.warning(f"从CSV导入{data_type}历史数据到Parquet失败，下次启动时重试: {e}")
+
+    def read_dataframe(self, data_type: str, columns: Optional[List[str]] = None,
+                       start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """
+        读取数据为 pandas DataFrame，只返回需要的列和日期范围
+
+        启用Parquet存储时直接从列式文件读取（列裁剪、按日期分区过滤），
+        否则从CSV读取后筛选，CSV数据的列均为字符串。
+
+        Args:
+            data_type: 数据类型 (dashboard, content_analysis, fans)
+            columns: 需要的列（英文字段名），默认全部
+            start_date: 起始日期 YYYY-MM-DD（含），默认不限
+            end_date: 结束日期 YYYY-MM-DD（含），默认不限
+
+        Returns:
+            按创建时间升序的 DataFrame
+        """
         if not self._initialized:
             self.initialize()
-            
-        # 保存到CSV（始终执行）
-        if self._csv_storage:
-            self._csv_storage.save_fans_data(data)
-            
-        # 保存到PostgreSQL（如果启用）
-        if self._pg_storage:
+        self.flush()
+
+        if self._parquet_storage:
             try:
-                self._pg_storage.save_fans_data(data)
+                return self._parquet_storage.read_dataframe(data_type, columns, start_date, end_date)
             except Exception as e:
-                logger.error(f"保存粉丝数据到PostgreSQL失败: {e}")
-                
+                logger.warning(f"从Parquet读取{data_type}数据失败，改为读取CSV: {e}")
+
+        rows = self._csv_storage.read_range(data_type, start_date, end_date)
+        df = pd.DataFrame(rows)
+        if columns:
+            df = df.reindex(columns=columns)
+        if 'created_at' in df.columns:
+            df = df.sort_values('created_at', kind='stable').reset_index(drop=True)
+        return df
+        
     def get_storage_info(self) -> Dict[str, Any]:
         """获取存储信息"""
         if not self._initialized:
@@ -154,6 +350,7 @@ class StorageManager:
             
         info = {
             'csv_enabled': self._csv_storage is not None,
+            'parquet_enabled': self._parquet_storage is not None,
             'postgresql_enabled': self._pg_storage is not None,
             'storage_types': []
         }
@@ -162,10 +359,15 @@ class StorageManager:
             info['storage_types'].append('CSV')
             info['csv_info'] = self._csv_storage.get_storage_info()
             
+        if self._parquet_storage:
+            info['storage_types'].append('Parquet')
+            info['parquet_info'] = self._parquet_storage.get_storage_info()
+            
         if self._pg_storage:
             info['storage_types'].append('PostgreSQL')
             info['postgresql_info'] = self._pg_storage.get_storage_info()
             
+        info['write_queue'] = self.get_write_queue_stats()
         return info
 
 
@@ -185,4 +387,9 @@ def get_storage_manager() -> StorageManager:
 
 def initialize() -> None:
     """初始化全局存储管理器"""
-    storage_manager.initialize() 
\ No newline at end of file
+    storage_manager.initialize()
+
+
+def close() -> None:
+    """关闭全局存储管理器"""
+    storage_manager.close()
@@ -0,0 +1,191 @@
+"""
+存储写入缓冲
+
+采集任务保存数据时只把数据放入缓冲区立即返回，由后台线程批量写入存储，
+避免文件读写和数据库写入阻塞采集任务所在的事件循环。
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """写后缓冲
+
+    每次保存都是某类数据当天的完整快照（存储按日期覆盖当天数据），
+    因此同一类数据在写入前再次提交时只保留最新的一份。
+    后台线程在收到数据后等待 ``flush_interval`` 秒收集同一批次，然后依次写入；
+    调用 flush() 时立即写入并等待完成。
+    写入失败的快照保留下来，在下次 flush() 时重试，提交了同类新快照时由新快照代替；
+    存在未能写入的快照时 flush() 返回False。
+    """
+
+    def __init__(self, writer: Callable[[str, List[Dict[str, Any]]], None], flush_interval: float = 1.0):
+        """
+        Args:
+            writer: 实际写入函数 writer(data_type, data)，在后台线程中调用
+            flush_interval: 收到数据后等待合并批次的时间（秒）
+        """
+        self.writer = writer
+        self.flush_interval = flush_interval
+
+        # data_type -> (数据, 提交时间)，按提交顺序写入
+        self._pending: Dict[str, tuple] = {}
+        # 写入失败、等待重试的快照：data_type -> (数据, 提交时间)
+        self._failed: Dict[str, tuple] = {}
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self._stats = {
+            'submitted': 0,
+            'coalesced': 0,
+            'batches': 0,
+            'written': 0,
+            'failed': 0,
+            'max_depth': 0,
+            'last_flush_at': None,
+            'last_flush_seconds': None,
+            'last_error': None
+        }
+
+    def submit(self, data_type: str, data: List[Dict[str, Any]]) -> None:
+        """提交数据，立即返回"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("写入缓冲已关闭")
+            if data_type in self._pending:
+                # 未写入的旧快照直接被新快照替换
+                self._stats['coalesced'] += 1
+                del self._pending[data_type]
+            # 写入失败的旧快照不再重试
+            self._failed.pop(data_type, None)
+            self._pending[data_type] = (list(data), time.monotonic())
+            self._stats['submitted'] += 1
+            self._stats['max_depth'] = max(self._stats['max_depth'], len(self._pending) + self._in_flight)
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即写入所有缓冲的数据并等待完成，之前写入失败的数据一并重试
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            bool: 超时前是否全部写入成功
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._failed:
+                for data_type, snapshot in self._failed.items():
+                    self._pending.setdefault(data_type, snapshot)
+                self._failed = {}
+                self._ensure_thread()
+            while self._pending or self._in_flight:
+                self._flush_requested = True
+                self._cond.notify_all()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            if self._failed:
+                logger.warning(f"⚠️ 以下数据写入失败，将在下次写入时重试: {', '.join(self._failed)}")
+            return not self._failed
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """写入剩余数据并停止后台线程，返回是否全部写入"""
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        if not flushed:
+            logger.warning(f"⚠️ 写入缓冲关闭时仍有 {self.depth() + len(self._failed)} 批数据未写入")
+        return flushed
+
+    def depth(self) -> int:
+        """等待写入和正在写入的数据批数"""
+        with self._cond:
+            return len(self._pending) + self._in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        """缓冲区指标"""
+        now = time.monotonic()
+        with self._cond:
+            return {
+                **self._stats,
+                'pending': {data_type: len(data) for data_type, (data, _) in self._pending.items()},
+                'pending_records': sum(len(data) for data, _ in self._pending.values()),
+                'oldest_pending_seconds': round(now - min(t for _, t in self._pending.values()), 3)
+                if self._pending else 0,
+                'failed_pending': {data_type: len(data) for data_type, (data, _) in self._failed.items()},
+                'in_flight': self._in_flight,
+                'depth': len(self._pending) + self._in_flight,
+                'flush_interval': self.flush_interval
+            }
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> Optional[Dict[str, tuple]]:
+        """等待并取出下一批数据，缓冲关闭且没有数据时返回None"""
+        with self._cond:
+            while not self._pending:
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+            # 收到数据后稍等片刻，让同一轮采集的其他数据进入同一批次
+            deadline = time.monotonic() + self.flush_interval
+            while not (self._flush_requested or self._closed):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch, self._pending = self._pending, {}
+            self._in_flight = len(batch)
+            self._flush_requested = False
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            started = time.monotonic()
+            for data_type, (data, submitted_at) in batch.items():
+                try:
+                    self.writer(data_type, data)
+                    ok, error = True, None
+                except Exception as e:
+                    logger.error(f"❌ 写入{data_type}数据失败: {e}", exc_info=True)
+                    ok, error = False, f"{data_type}: {e}"
+                with self._cond:
+                    self._in_flight -= 1
+                    self._stats['written' if ok else 'failed'] += 1
+                    if error:
+                        self._stats['last_error'] = error
+                        # 写入期间已提交新快照时由新快照代替
+                        if data_type not in self._pending:
+                            self._failed[data_type] = (data, submitted_at)
+                    self._cond.notify_all()
+
+            with self._cond:
+                self._stats['batches'] += 1
+                self._stats['last_flush_at'] = time.time()
+                self._stats['last_flush_seconds'] = round(time.monotonic() - started, 3)
+                self._cond.notify_all()
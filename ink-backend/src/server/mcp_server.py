@@ -19,6 +19,7 @@ from dataclasses import dataclass, asdict
 from fastmcp import FastMCP
 
 from ..core.config import XHSConfig
+from ..core.driver_pool import driver_pool
 from ..core.exceptions import format_error_message, XHSToolkitError
 from ..xiaohongshu.client import XHSClient
 from ..xiaohongshu.models import XHSNote
@@ -490,13 +491,10 @@ class MCPServer:
                         "suggestion": "请检查cookies状态并重启服务器"
                     }, ensure_ascii=False, indent=2)
                 
-                # 获取存储管理器
-                csv_storage = storage_manager.get_csv_storage()
-                
-                # 读取所有数据
-                dashboard_data = await csv_storage.get_latest_data('dashboard', limit=100)
-                content_data = await csv_storage.get_latest_data('content_analysis', limit=100)
-                fans_data = await csv_storage.get_latest_data('fans', limit=100)
+                # 读取所有数据，经由存储管理器读取以包含写缓冲中尚未落盘的数据
+                dashboard_data = await storage_manager.get_latest_data('dashboard', limit=100)
+                content_data = await storage_manager.get_latest_data('content_analysis', limit=100)
+                fans_data = await storage_manager.get_latest_data('fans', limit=100)
                 
                 # 获取存储信息
                 storage_info = storage_manager.get_storage_info()
@@ -773,6 +771,8 @@ class MCPServer:
                 if hasattr(self.xhs_client, 'browser_manager') and self.xhs_client.browser_manager.is_initialized:
                     logger.info("🧹 清理残留的浏览器实例...")
                     self.xhs_client.browser_manager.close_driver()
+                driver_pool.close()
+                storage_manager.close()
             except Exception as cleanup_error:
                 logger.warning(f"⚠️ 清理资源时出错: {cleanup_error}")
             
@@ -919,6 +919,8 @@ class MCPServer:
                 if hasattr(self.xhs_client, 'browser_manager') and self.xhs_client.browser_manager.is_initialized:
                     logger.info("🧹 清理残留的浏览器实例...")
                     self.xhs_client.browser_manager.close_driver()
+                driver_pool.close()
+                storage_manager.close()
             except Exception as cleanup_error:
                 logger.warning(f"⚠️ 清理资源时出错: {cleanup_error}")
             
@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from fastapi import HTTPException
 import os
+import copy
 import json
-from openai import AuthenticationError, APIError
+import asyncio
+import threading
+from openai import AuthenticationError, APIError, RateLimitError
 from langchain_openai import ChatOpenAI
 
 class AIProvider(ABC):
@@ -10,32 +14,131 @@ class AIProvider(ABC):
     def generate_content(self, messages: list, model: str) -> str:
         pass
 
+    async def agenerate_content(self, messages: list, model: str) -> str:
+        """异步生成内容。默认在线程中运行同步实现，子类应覆盖为真正的异步调用"""
+        return await asyncio.to_thread(self.generate_content, messages, model)
+
+    async def astream_content(self, messages: list, model: str):
+        """流式生成内容，逐块产出文本。默认一次性产出完整结果，子类应覆盖为真正的流式调用"""
+        yield await self.agenerate_content(messages, model)
+
 class OllamaProvider(AIProvider):
     def __init__(self, config):
         self.base_url = config['base_url']
         self.models = config['models']
+        # 按模型复用客户端，保持底层连接池
+        self._clients = {}
 
-    def generate_content(self, messages: list, model: str) -> str:
-        if model not in self.models:
-            raise ValueError(f"Model {model} not supported by Ollama provider")
-        prompt = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
-        try:
-            # Use OllamaLLM with base_url, model, and request_timeout
-            llm = ChatOpenAI(
+    def _get_client(self, model: str) -> ChatOpenAI:
+        client = self._clients.get(model)
+        if client is None:
+            client = ChatOpenAI(
                 base_url=self.base_url,
                 model=model,
                 temperature=0.7,  # 将温度从 30 修改为 0.7
                 api_key=None,  # Ollama does not require an API key
             )
-            response = llm.invoke(prompt)
-            # Ensure response is a string (handle potential list return)
-            if isinstance(response, list):
-                return "".join(str(item) for item in response)
-            return str(response)
+            self._clients[model] = client
+        return client
+
+    def _build_prompt(self, messages: list, model: str) -> str:
+        if model not in self.models:
+            raise ValueError(f"Model {model} not supported by Ollama provider")
+        return "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+
+    @staticmethod
+    def _to_text(response) -> str:
+        # Ensure response is a string (handle potential list return)
+        if isinstance(response, list):
+            return "".join(str(item) for item in response)
+        return str(response)
+
+    def _api_error(self, model: str, e: Exception) -> ValueError:
+        return ValueError(f"Ollama API error: {str(e)}. Check if base_url '{self.base_url}' and model '{model}' are correct.")
+
+    def generate_content(self, messages: list, model: str) -> str:
+        prompt = self._build_prompt(messages, model)
+        try:
+            response = self._get_client(model).invoke(prompt)
+            return self._to_text(response)
         except Exception as e:
-            raise ValueError(f"Ollama API error: {str(e)}. Check if base_url '{self.base_url}' and model '{model}' are correct.")
+            raise self._api_error(model, e)
+
+    async def agenerate_content(self, messages: list, model: str) -> str:
+        prompt = self._build_prompt(messages, model)
+        try:
+            response = await self._get_client(model).ainvoke(prompt)
+            return self._to_text(response)
+        except Exception as e:
+            raise self._api_error(model, e)
+
+    async def astream_content(self, messages: list, model: str):
+        prompt = self._build_prompt(messages, model)
+        try:
+            async for chunk in self._get_client(model).astream(prompt):
+                if chunk.content:
+                    yield str(chunk.content)
+        except Exception as e:
+            raise self._api_error(model, e)
+
+class OpenAICompatibleProvider(AIProvider):
+    """基于 OpenAI 兼容接口的提供商公共实现，子类负责创建 self.client"""
+    display_name = "OpenAI-compatible"
+
+    def _check_model(self, model: str) -> None:
+        if model not in self.models:
+            raise ValueError(f"Model {model} not supported by {self.display_name} provider")
+
+    @staticmethod
+    def _to_text(response) -> str:
+        # Ensure response is a string
+        if isinstance(response.content, list):
+            return "".join(str(item) for item in response.content)
+        return str(response.content)
+
+    @contextmanager
+    def _translate_errors(self):
+        """将底层 API 异常转换为 HTTPException"""
+        try:
+            yield
+        except AuthenticationError as e:
+            raise HTTPException(status_code=401, detail=f"{self.display_name} authentication failed: {str(e)}")
+        except RateLimitError as e:
+            # 保留 Retry-After，供调用方退避重试
+            retry_after = e.response.headers.get('retry-after') if e.response is not None else None
+            raise HTTPException(
+                status_code=429,
+                detail=f"{self.display_name} rate limit exceeded: {str(e)}",
+                headers={"Retry-After": retry_after} if retry_after else None
+            )
+        except APIError as e:
+            raise HTTPException(status_code=500, detail=f"{self.display_name} API error: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Unexpected error with {self.display_name}: {str(e)}")
+
+    def generate_content(self, messages: list, model: str) -> str:
+        self._check_model(model)
+        with self._translate_errors():
+            response = self.client.invoke(messages, model=model)
+            return self._to_text(response)
+
+    async def agenerate_content(self, messages: list, model: str) -> str:
+        self._check_model(model)
+        with self._translate_errors():
+            response = await self.client.ainvoke(messages, model=model)
+            return self._to_text(response)
+
+    async def astream_content(self, messages: list, model: str):
+        self._check_model(model)
+        with self._translate_errors():
+            async for chunk in self.client.astream(messages, model=model):
+                text = self._to_text(chunk)
+                if text:
+                    yield text
+
+class DeepSeekProvider(OpenAICompatibleProvider):
+    display_name = "DeepSeek"
 
-class DeepSeekProvider(AIProvider):
     def __init__(self, config):
         self.models = config['models']
         self.api_key = config.get('api_key')
@@ -47,24 +150,9 @@ class DeepSeekProvider(AIProvider):
             temperature=0.7
         )
 
-    def generate_content(self, messages: list, model: str) -> str:
-        if model not in self.models:
-            raise ValueError(f"Model {model} not supported by DeepSeek provider")
-
-        try:
-            response = self.client.invoke(messages, model=model)
-            # Ensure response is a string
-            if isinstance(response.content, list):
-                return "".join(str(item) for item in response.content)
-            return str(response.content)
-        except AuthenticationError as e:
-            raise HTTPException(status_code=401, detail=f"DeepSeek authentication failed: {str(e)}")
-        except APIError as e:
-            raise HTTPException(status_code=500, detail=f"DeepSeek API error: {str(e)}")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Unexpected error with DeepSeek: {str(e)}")
+class SiliconFlowProvider(OpenAICompatibleProvider):
+    display_name = "SiliconFlow"
 
-class SiliconFlowProvider(AIProvider):
     def __init__(self, config):
         self.base_url = config['base_url']
         self.models = config['models']
@@ -77,24 +165,9 @@ class SiliconFlowProvider(AIProvider):
             temperature=0.7
         )
 
-    def generate_content(self, messages: list, model: str) -> str:
-        if model not in self.models:
-            raise ValueError(f"Model {model} not supported by SiliconFlow provider")
-
-        try:
-            response = self.client.invoke(messages, model=model)
-            # Ensure response is a string
-            if isinstance(response.content, list):
-                return "".join(str(item) for item in response.content)
-            return str(response.content)
-        except AuthenticationError as e:
-            raise HTTPException(status_code=401, detail=f"SiliconFlow authentication failed: {str(e)}")
-        except APIError as e:
-            raise HTTPException(status_code=500, detail=f"SiliconFlow API error: {str(e)}")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Unexpected error with SiliconFlow: {str(e)}")
+class AliyunBailianProvider(OpenAICompatibleProvider):
+    display_name = "Aliyun Bailian"
 
-class AliyunBailianProvider(AIProvider):
     def __init__(self, config):
         self.models = config['models']
         self.api_key = config.get('api_key')
@@ -106,23 +179,6 @@ class AliyunBailianProvider(AIProvider):
             temperature=0.7
         )
 
-    def generate_content(self, messages: list, model: str) -> str:
-        if model not in self.models:
-            raise ValueError(f"Model {model} not supported by Aliyun Bailian provider")
-
-        try:
-            response = self.client.invoke(messages, model=model)
-            # Ensure response is a string
-            if isinstance(response.content, list):
-                return "".join(str(item) for item in response.content)
-            return str(response.content)
-        except AuthenticationError as e:
-            raise HTTPException(status_code=401, detail=f"Aliyun Bailian authentication failed: {str(e)}")
-        except APIError as e:
-            raise HTTPException(status_code=500, detail=f"Aliyun Bailian API error: {str(e)}")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Unexpected error with Aliyun Bailian: {str(e)}")
-
 
 class AIProviderFactory:
     _providers = {
@@ -132,13 +188,26 @@ class AIProviderFactory:
         'aliyun_bailian': AliyunBailianProvider
     }
 
+    # 进程级提供商注册表：(服务名, 服务配置) -> 提供商实例，
+    # 提供商内部持有的 ChatOpenAI 客户端及连接池在请求间复用
+    _registry = {}
+    _registry_lock = threading.Lock()
+    # 配置文件缓存：绝对路径 -> (修改时间, 配置)
+    _config_cache = {}
+
     @staticmethod
     def load_config(config_path: str = 'config.json') -> dict:
         # Construct absolute path to config.json relative to the current file
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        config_abs_path = os.path.join(current_dir, '..', '..', config_path)
-        with open(config_abs_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        config_abs_path = os.path.abspath(os.path.join(current_dir, '..', '..', config_path))
+        # 文件未修改时直接使用缓存，返回副本避免调用方修改共享配置
+        mtime = os.path.getmtime(config_abs_path)
+        cached = AIProviderFactory._config_cache.get(config_abs_path)
+        if cached is None or cached[0] != mtime:
+            with open(config_abs_path, 'r', encoding='utf-8') as f:
+                cached = (mtime, json.load(f))
+            AIProviderFactory._config_cache[config_abs_path] = cached
+        return copy.deepcopy(cached[1])
 
     @staticmethod
     def get_provider(service_name: str, config: dict | None = None) -> AIProvider: # Updated type hint
@@ -153,4 +222,18 @@ class AIProviderFactory:
         if not provider_class:
             raise ValueError(f"No provider class found for type {service_config['type']}")
 
-        return provider_class(service_config)
\ No newline at end of file
+        # 服务配置变化（如更换 api_key）时生成新的实例
+        key = (service_name, json.dumps(service_config, sort_keys=True))
+        with AIProviderFactory._registry_lock:
+            provider = AIProviderFactory._registry.get(key)
+            if provider is None:
+                provider = provider_class(service_config)
+                AIProviderFactory._registry[key] = provider
+            return provider
+
+    @staticmethod
+    def clear_registry() -> None:
+        """清空已缓存的提供商实例和配置"""
+        with AIProviderFactory._registry_lock:
+            AIProviderFactory._registry.clear()
+        AIProviderFactory._config_cache.clear()
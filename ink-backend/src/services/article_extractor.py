@@ -0,0 +1,139 @@
+import os
+import sys
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import httpx
+from bs4 import BeautifulSoup
+from readability import Document
+
+# 正文解析进程数
+ARTICLE_PARSE_WORKERS = int(os.getenv("ARTICLE_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+def parse_article(html: str) -> str:
+    """从页面HTML中提取标题和正文，在解析进程中运行"""
+    doc = Document(html)
+    title = doc.title()
+
+    summary_html = doc.summary(html_partial=True)
+
+    soup = BeautifulSoup(summary_html, 'html.parser')
+    content_text = soup.get_text('\\n', strip=True)
+
+    if not content_text:
+        return f"标题: {title}\\n\\n无法从此页面提取正文内容。可能是一个动态加载或非标准文章页面。"
+
+    return f"标题: {title}\\n\\n{content_text}"
+
+
+class ArticleExtractor:
+    """热点文章正文提取器
+
+    并发下载页面，在进程池中解析正文，并按 URL + ETag 缓存结果：
+    再次请求时带上条件请求头，页面未变化（304、ETag 或内容哈希相同）时直接返回缓存。
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, max_concurrency: int = 8,
+                 cache_size: int = 256, timeout: float = 15):
+        """
+        Args:
+            executor: 解析使用的执行器，默认按需创建进程池（打包运行时为线程池）
+            max_concurrency: 批量提取时的最大并发下载数
+            cache_size: 最多缓存的URL数量
+            timeout: 单个页面的下载超时时间（秒）
+        """
+        self._executor = executor
+        self._owns_executor = executor is None
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+        self.timeout = timeout
+        # url -> {"etag", "last_modified", "digest", "content"}，按最近使用排列
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if getattr(sys, "frozen", False):
+                # 打包后的可执行文件中 spawn 子进程会重新启动整个应用，改用线程池解析
+                self._executor = ThreadPoolExecutor(max_workers=ARTICLE_PARSE_WORKERS)
+                return self._executor
+            # 使用 spawn 启动解析进程，避免在多线程的服务进程中 fork
+            self._executor = ProcessPoolExecutor(
+                max_workers=ARTICLE_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def close(self) -> None:
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _remember(self, url: str, entry: Dict) -> None:
+        self._cache[url] = entry
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def extract(self, client: httpx.AsyncClient, url: str) -> str:
+        """下载并提取单个页面的正文"""
+        if not url or not url.startswith('http'):
+            return "无效或空的URL。"
+
+        cached = self._cache.get(url)
+        headers = dict(REQUEST_HEADERS)
+        if cached is not None:
+            if cached["etag"]:
+                headers['If-None-Match'] = cached["etag"]
+            if cached["last_modified"]:
+                headers['If-Modified-Since'] = cached["last_modified"]
+
+        try:
+            response = await client.get(url, headers=headers, timeout=self.timeout, follow_redirects=True)
+            if response.status_code == 304 and cached is not None:
+                self._cache.move_to_end(url)
+                return cached["content"]
+            response.raise_for_status()
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
+            logging.error(f"获取热点内容失败 (Request Error) for URL {url}: {e}")
+            return "获取内容失败：网络请求错误或超时。"
+
+        etag = response.headers.get('ETag')
+        digest = hashlib.sha256(response.content).hexdigest()
+        if cached is not None and ((etag and etag == cached["etag"]) or digest == cached["digest"]):
+            self._cache.move_to_end(url)
+            return cached["content"]
+
+        try:
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(self._get_executor(), parse_article, response.text)
+        except Exception as e:
+            logging.error(f"解析热点内容失败 for URL {url}: {e}")
+            return "获取内容失败：页面解析时发生未知错误。"
+
+        self._remember(url, {
+            "etag": etag,
+            "last_modified": response.headers.get('Last-Modified'),
+            "digest": digest,
+            "content": content
+        })
+        return content
+
+    async def extract_many(self, client: httpx.AsyncClient, urls: List[str]) -> List[Dict]:
+        """并发提取多个页面的正文，按输入顺序返回"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def extract_one(url: str) -> Dict:
+            async with semaphore:
+                return {"url": url, "content": await self.extract(client, url)}
+
+        return await asyncio.gather(*[extract_one(url) for url in urls])
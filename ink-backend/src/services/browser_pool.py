@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Playwright 浏览器池
+常驻的异步 Chromium 实例与页面，由 FastAPI 应用生命周期持有，
+每次渲染只需导航 + 截图，避免重复启动浏览器
+"""
+
+import os
+import time
+import asyncio
+import logging
+from pathlib import Path
+import base64
+from contextlib import asynccontextmanager
+from typing import Optional, List
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# 截图前的等待模式：
+#   ready       - load 事件后等待字体加载与图片解码完成
+#   networkidle - 在 ready 基础上先等待网络空闲（至少多等 500ms 的静默期）
+#   fixed       - 固定等待 wait_time 秒
+WAIT_MODES = ("ready", "networkidle", "fixed")
+
+# 在页面中等待字体和图片解码完成，超过 timeoutMs 返回 false
+PAGE_READY_SCRIPT = """
+async (timeoutMs) => {
+    const ready = (async () => {
+        await document.fonts.ready;
+        await Promise.all(Array.from(document.images).map(img => {
+            if (img.complete) {
+                return img.decode ? img.decode().catch(() => {}) : null;
+            }
+            return new Promise(resolve => {
+                img.addEventListener('load', resolve, { once: true });
+                img.addEventListener('error', resolve, { once: true });
+            });
+        }));
+        return true;
+    })();
+    const timeout = new Promise(resolve => setTimeout(() => resolve(false), timeoutMs));
+    return Promise.race([ready, timeout]);
+}
+"""
+
+
+# 内存渲染支持的输出格式及对应的 MIME 类型
+IMAGE_FORMATS = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
+# Playwright 只能输出 PNG/JPEG，WebP 借助页面内 canvas 编码
+WEBP_ENCODE_SCRIPT = """
+async ([pngBase64, quality]) => {
+    const img = new Image();
+    img.src = 'data:image/png;base64,' + pngBase64;
+    await img.decode();
+    const canvas = document.createElement('canvas');
+    canvas.width = img.naturalWidth;
+    canvas.height = img.naturalHeight;
+    canvas.getContext('2d').drawImage(img, 0, 0);
+    const dataUrl = canvas.toDataURL('image/webp', quality / 100);
+    return dataUrl.slice(dataUrl.indexOf(',') + 1);
+}
+"""
+
+
+async def wait_for_page_ready(page: Page, wait_time: float = 1.0, wait_mode: str = "ready") -> None:
+    """导航完成后等待页面可以截图
+
+    Args:
+        page: 已完成导航（load 事件）的页面
+        wait_time: fixed 模式为固定等待时间，其他模式为最长等待时间（秒）
+        wait_mode: 等待模式，见 WAIT_MODES
+    """
+    if wait_mode not in WAIT_MODES:
+        raise ValueError(f"不支持的等待模式: {wait_mode}，可选: {', '.join(WAIT_MODES)}")
+
+    timeout_ms = int(wait_time * 1000)
+    if wait_mode == "fixed":
+        await page.wait_for_timeout(timeout_ms)
+        return
+    if timeout_ms <= 0:
+        return
+
+    started = time.monotonic()
+    if wait_mode == "networkidle":
+        try:
+            await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+        except PlaywrightTimeoutError:
+            logger.debug(f"等待网络空闲超时 ({wait_time}s)")
+
+    remaining_ms = timeout_ms - int((time.monotonic() - started) * 1000)
+    if remaining_ms > 0:
+        if not await page.evaluate(PAGE_READY_SCRIPT, remaining_ms):
+            logger.debug(f"等待字体和图片加载超时 ({wait_time}s)")
+
+
+def batch_output_paths(html_files: List[str], output_dir: Optional[str] = None,
+                       extension: str = ".png") -> List[str]:
+    """为批量渲染的HTML文件生成互不重复的图片输出路径
+
+    图片名取自HTML文件名，同一批次中重名时依次追加序号（name_2.png、name_3.png），
+    避免并行渲染时互相覆盖。
+
+    Args:
+        html_files: HTML文件路径列表
+        output_dir: 输出目录，为None时输出到各HTML文件所在目录
+        extension: 图片扩展名
+
+    Returns:
+        List[str]: 与 html_files 一一对应的输出路径
+    """
+    used = set()
+    paths = []
+    for html_file in html_files:
+        html_file = html_file.strip()
+        directory = output_dir if output_dir else os.path.dirname(html_file)
+        stem = Path(html_file).stem
+        path = os.path.join(directory, f"{stem}{extension}")
+        index = 2
+        while os.path.abspath(path) in used:
+            path = os.path.join(directory, f"{stem}_{index}{extension}")
+            index += 1
+        used.add(os.path.abspath(path))
+        paths.append(path)
+    return paths
+
+
+class _PageSlot:
+    """渲染槽位：独立的浏览器上下文及其常驻页面"""
+
+    def __init__(self, browser_index: int):
+        self.browser_index = browser_index
+        self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
+        self.page: Optional[Page] = None
+        self.renders = 0
+
+
+class BrowserPool:
+    """Playwright Chromium 浏览器池
+
+    池中启动 ``browsers`` 个浏览器，每个浏览器持有 ``contexts_per_browser`` 个
+    上下文（各带一个常驻页面）。页面在租用前进行健康检查，累计渲染
+    ``max_renders`` 次或出错后回收重建。
+    """
+
+    def __init__(
+        self,
+        browsers: int = 1,
+        contexts_per_browser: int = 4,
+        max_renders: int = 200,
+        headless: bool = True
+    ):
+        """
+        Args:
+            browsers: 浏览器实例数量
+            contexts_per_browser: 每个浏览器的上下文（页面）数量
+            max_renders: 单个页面最多渲染次数，超过后回收重建
+            headless: 是否无头模式
+        """
+        self.browsers = max(1, browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.max_renders = max(1, max_renders)
+        self.headless = headless
+
+        self._playwright = None
+        self._browsers: List[Optional[Browser]] = []
+        self._browser_locks: List[asyncio.Lock] = []
+        self._slots: List[_PageSlot] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+        self._started = False
+
+        self._total_renders = 0
+        self._recycles = 0
+
+    @classmethod
+    def from_env(cls) -> "BrowserPool":
+        """根据环境变量创建浏览器池"""
+        return cls(
+            browsers=int(os.getenv("SCREENSHOT_POOL_BROWSERS", "1")),
+            contexts_per_browser=int(os.getenv("SCREENSHOT_POOL_CONTEXTS", "4")),
+            max_renders=int(os.getenv("SCREENSHOT_POOL_MAX_RENDERS", "200")),
+            headless=os.getenv("SCREENSHOT_POOL_HEADLESS", "true").lower() == "true"
+        )
+
+    @property
+    def size(self) -> int:
+        """池中页面总数，即最大并发渲染数"""
+        return self.browsers * self.contexts_per_browser
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self) -> None:
+        """启动 Playwright 及所有浏览器（重复调用无副作用）"""
+        async with self._start_lock:
+            if self._started:
+                return
+
+            logger.info(
+                f"启动浏览器池: browsers={self.browsers}, "
+                f"contexts_per_browser={self.contexts_per_browser}, max_renders={self.max_renders}"
+            )
+            self._playwright = await async_playwright().start()
+            try:
+                self._browsers = [await self._launch_browser() for _ in range(self.browsers)]
+            except Exception:
+                await self._playwright.stop()
+                self._playwright = None
+                raise
+            self._browser_locks = [asyncio.Lock() for _ in range(self.browsers)]
+
+            # 页面在首次租用时再创建
+            self._idle = asyncio.Queue()
+            self._slots = []
+            for index in range(self.browsers):
+                for _ in range(self.contexts_per_browser):
+                    slot = _PageSlot(index)
+                    self._slots.append(slot)
+                    self._idle.put_nowait(slot)
+
+            self._started = True
+
+    async def close(self) -> None:
+        """关闭所有页面、浏览器及 Playwright"""
+        async with self._start_lock:
+            if not self._started:
+                return
+
+            logger.info("关闭浏览器池")
+            for slot in self._slots:
+                await self._close_slot(slot)
+            for browser in self._browsers:
+                if browser is None:
+                    continue
+                try:
+                    await browser.close()
+                except Exception as e:
+                    logger.debug(f"关闭浏览器失败: {e}")
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"停止 Playwright 失败: {e}")
+
+            self._playwright = None
+            self._browsers = []
+            self._slots = []
+            self._idle = None
+            self._started = False
+
+    async def _launch_browser(self) -> Browser:
+        return await self._playwright.chromium.launch(headless=self.headless)
+
+    async def _ensure_browser(self, index: int) -> Browser:
+        """返回可用的浏览器，已断开则重新启动"""
+        async with self._browser_locks[index]:
+            browser = self._browsers[index]
+            if browser is None or not browser.is_connected():
+                logger.warning(f"浏览器 #{index} 已断开，重新启动")
+                self._browsers[index] = await self._launch_browser()
+            return self._browsers[index]
+
+    def _is_healthy(self, slot: _PageSlot) -> bool:
+        """槽位是否可直接复用"""
+        return (
+            slot.page is not None
+            and not slot.page.is_closed()
+            and slot.browser is self._browsers[slot.browser_index]
+            and slot.browser.is_connected()
+            and slot.renders < self.max_renders
+        )
+
+    async def _close_slot(self, slot: _PageSlot) -> None:
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception as e:
+                logger.debug(f"关闭浏览器上下文失败: {e}")
+        slot.browser = None
+        slot.context = None
+        slot.page = None
+        slot.renders = 0
+
+    async def _recycle_slot(self, slot: _PageSlot) -> None:
+        """关闭旧上下文并创建新的上下文和页面"""
+        if slot.page is not None:
+            self._recycles += 1
+            logger.debug(f"回收页面 (browser #{slot.browser_index}, renders={slot.renders})")
+        await self._close_slot(slot)
+
+        browser = await self._ensure_browser(slot.browser_index)
+        slot.browser = browser
+        slot.context = await browser.new_context()
+        slot.page = await slot.context.new_page()
+
+    @asynccontextmanager
+    async def acquire_page(self, width: int = 375, height: int = 667):
+        """租用一个已设置好视口的页面，用完自动归还
+
+        Args:
+            width: 视口宽度
+            height: 视口高度
+        """
+        await self.start()
+        slot = await self._idle.get()
+        try:
+            if not self._is_healthy(slot):
+                await self._recycle_slot(slot)
+            await slot.page.set_viewport_size({"width": width, "height": height})
+            yield slot.page
+            slot.renders += 1
+            self._total_renders += 1
+        except BaseException:
+            # 出错的页面状态未知，下次租用时重建
+            slot.renders = self.max_renders
+            raise
+        finally:
+            if self._idle is not None:
+                self._idle.put_nowait(slot)
+
+    async def screenshot(
+        self,
+        html_file: str,
+        output_path: str,
+        width: int = 375,
+        height: int = 667,
+        full_page: bool = False,
+        wait_time: float = 1.0,
+        wait_mode: str = "ready"
+    ) -> bool:
+        """将本地HTML文件渲染为图片
+
+        Args:
+            html_file: HTML文件路径
+            output_path: 输出图片路径
+            width: 视口宽度
+            height: 视口高度
+            full_page: 是否截取整页
+            wait_time: fixed 模式为等待时间，其他模式为最长等待时间（秒）
+            wait_mode: 等待模式，见 WAIT_MODES
+
+        Returns:
+            bool: 是否成功生成截图
+        """
+        file_url = Path(html_file).resolve().as_uri()
+        try:
+            async with self.acquire_page(width, height) as page:
+                logger.debug(f"导航到 URL: {file_url}")
+                await page.goto(file_url)
+                await wait_for_page_ready(page, wait_time, wait_mode)
+                await page.screenshot(path=output_path, full_page=full_page)
+            return True
+        except Exception as e:
+            logger.error(f"浏览器池截图失败: {html_file} -> {output_path}: {e}", exc_info=True)
+            return False
+
+    async def render_html(
+        self,
+        html: str,
+        width: int = 375,
+        height: int = 667,
+        full_page: bool = False,
+        wait_time: float = 1.0,
+        wait_mode: str = "ready",
+        image_format: str = "png",
+        quality: Optional[int] = None
+    ) -> bytes:
+        """直接渲染内存中的HTML，返回图片字节，不经过磁盘
+
+        页面基础地址为 about:blank，HTML中的相对路径资源无法加载，
+        生成的卡片应内联样式或使用绝对URL。
+
+        Args:
+            html: HTML源码
+            width: 视口宽度
+            height: 视口高度
+            full_page: 是否截取整页
+            wait_time: fixed 模式为等待时间，其他模式为最长等待时间（秒）
+            wait_mode: 等待模式，见 WAIT_MODES
+            image_format: 输出格式，见 IMAGE_FORMATS
+            quality: JPEG/WebP 质量（0-100），PNG 忽略
+
+        Returns:
+            bytes: 图片内容
+
+        Raises:
+            ValueError: 不支持的输出格式
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"不支持的图片格式: {image_format}，可选: {', '.join(IMAGE_FORMATS)}")
+
+        async with self.acquire_page(width, height) as page:
+            await page.set_content(html, wait_until="load")
+            await wait_for_page_ready(page, wait_time, wait_mode)
+            return await self._capture(page, full_page, image_format, quality)
+
+    async def _capture(self, page: Page, full_page: bool, image_format: str, quality: Optional[int]) -> bytes:
+        """按指定格式截图并返回字节"""
+        if image_format == "jpeg":
+            return await page.screenshot(full_page=full_page, type="jpeg", quality=90 if quality is None else quality)
+
+        png = await page.screenshot(full_page=full_page, type="png")
+        if image_format == "png":
+            return png
+
+        webp_base64 = await page.evaluate(
+            WEBP_ENCODE_SCRIPT, [base64.b64encode(png).decode("ascii"), 90 if quality is None else quality]
+        )
+        return base64.b64decode(webp_base64)
+
+    def stats(self) -> dict:
+        """浏览器池运行状态"""
+        return {
+            "started": self._started,
+            "size": self.size,
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "browsers_connected": sum(
+                1 for b in self._browsers if b is not None and b.is_connected()
+            ),
+            "total_renders": self._total_renders,
+            "recycles": self._recycles,
+        }
@@ -66,6 +66,10 @@ class CookieService:
             raise ValueError("无效的账号名称")
         return self.accounts_dir / f"{safe_name}.json"
 
+    def get_account_cookie_path(self, account_name: str) -> Path:
+        """获取指定账号的cookie文件路径"""
+        return self._get_account_cookie_path(account_name)
+
     def _get_manager_for_account(self, account_name: str) -> CookieManager:
         """为指定账号创建一个配置好路径的CookieManager实例"""
         config = XHSConfig()
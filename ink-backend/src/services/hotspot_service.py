@@ -1,66 +1,93 @@
-import requests
+import httpx
+import asyncio
 import logging
 import os
-from typing import List, Dict, Optional
+import time
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
 from src.services.ai_providers import AIProviderFactory
-from bs4 import BeautifulSoup
-from readability import Document
+from src.services.hotspot_sources import create_source
+from src.services.article_extractor import ArticleExtractor
+
+# 热点榜单缓存有效期（秒），过期后先返回旧数据并在后台刷新
+HOTSPOT_CACHE_TTL = float(os.getenv("HOTSPOT_CACHE_TTL", "300"))
+# 单次获取所有数据源的总时限（秒）
+HOTSPOT_FETCH_DEADLINE = float(os.getenv("HOTSPOT_FETCH_DEADLINE", "5"))
 
 class HotspotService:
-    def __init__(self, config_path: str = 'config.json'):
+    # 排名变化达到此名次数的话题视为大幅变化
+    RERANK_THRESHOLD = 5
+    # 累计增量更新达到此次数后重新完整分析
+    MAX_INCREMENTAL_UPDATES = 3
+    # 变化话题超过榜单此比例时重新完整分析
+    FULL_REANALYSIS_RATIO = 0.5
+
+    def __init__(self, config_path: str = 'config.json', client: Optional[httpx.AsyncClient] = None,
+                 cache_ttl: float = HOTSPOT_CACHE_TTL, fetch_deadline: float = HOTSPOT_FETCH_DEADLINE,
+                 extractor: Optional[ArticleExtractor] = None):
         self.config = AIProviderFactory.load_config(config_path)
         self.data_sources = self.config.get('hotspot_sources', [
             {"name": "baidu", "type": "baidu"},
             {"name": "weibo", "type": "weibo"}
         ])
+        self.sources = [
+            source for source in (create_source(config) for config in self.data_sources)
+            if source is not None
+        ]
+        self.fetch_deadline = fetch_deadline
+        # 超过总时限后仍在后台运行的数据源请求
+        self._pending_fetches = set()
+        # 各数据源共享的异步HTTP客户端，首次使用时创建
+        self._client = client
+        self.cache_ttl = cache_ttl
+        # 榜单缓存：(获取时间, 热点列表)
+        self._cache: Optional[Tuple[float, List[Dict]]] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        # 文章正文提取器，解析在进程池中进行并按 URL + ETag 缓存
+        self.extractor = extractor or ArticleExtractor()
+        # 最近一次分析的基线：服务、模型、热点快照、完整报告和之后的增量更新
+        self._analysis: Optional[Dict] = None
+        self._analysis_lock = asyncio.Lock()
 
-    def fetch_baidu_hot(self) -> List[Dict]:
-        url = "https://top.baidu.com/api/board?platform=wise&tab=realtime"
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            content = data.get("data", {}).get("cards", [{}])[0].get("content", [])
-            return [
-                {
-                    "source": "baidu",
-                    "title": item.get("word"),
-                    "url": item.get("url"),
-                    "hot_score": item.get("hotScore")
-                }
-                for item in content
-            ][:10]
-        except Exception as e:
-            logging.error(f"获取百度热搜失败: {e}")
-            return []
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=10, follow_redirects=True)
+        return self._client
+
+    async def close(self) -> None:
+        """关闭共享的HTTP客户端并取消进行中的后台刷新"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        for task in list(self._pending_fetches):
+            task.cancel()
+        self.extractor.close()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_all_hotspots(self, deadline: Optional[float] = None) -> List[Dict]:
+        """并发请求所有数据源，合并后按热度排序
 
-    def fetch_weibo_hot(self) -> List[Dict]:
-        url = "https://weibo.com/ajax/side/hotSearch"
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            realtime = data.get("data", {}).get("realtime", [])
-            return [
-                {
-                    "source": "weibo",
-                    "title": item.get("word"),
-                    "url": f"https://s.weibo.com/weibo?q={item.get('word')}",
-                    "hot_score": item.get("raw_hot")
-                }
-                for item in realtime
-            ][:10]
-        except Exception as e:
-            logging.error(f"获取微博热搜失败: {e}")
+        超过总时限仍未返回的数据源使用其最近一次成功的快照，
+        请求继续在后台完成并更新快照。
+        """
+        deadline = self.fetch_deadline if deadline is None else deadline
+        client = self._get_client()
+        tasks = {asyncio.ensure_future(source.collect(client)): source for source in self.sources}
+        if not tasks:
             return []
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            self._pending_fetches.add(task)
+            task.add_done_callback(self._pending_fetches.discard)
 
-    def fetch_all_hotspots(self) -> List[Dict]:
         all_hotspots = []
-        for source in self.data_sources:
-            if source["type"] == "baidu":
-                all_hotspots.extend(self.fetch_baidu_hot())
-            elif source["type"] == "weibo":
-                all_hotspots.extend(self.fetch_weibo_hot())
+        for task, source in tasks.items():
+            if task in done:
+                all_hotspots.extend(task.result())
+            else:
+                logging.warning(f"热点数据源 {source.name} 未在{deadline}秒内返回，使用上次结果")
+                all_hotspots.extend(source.last_good)
         # 按热度排序，None 视为 0
         def safe_score(x):
             v = x.get("hot_score", 0)
@@ -71,67 +98,169 @@ class HotspotService:
         all_hotspots.sort(key=safe_score, reverse=True)
         return all_hotspots
 
-    def get_hotspot_content(self, url: str) -> str:
+    def source_status(self) -> List[Dict]:
+        """各数据源的熔断状态和最近一次获取情况"""
+        return [source.status() for source in self.sources]
+
+    async def _refresh(self) -> List[Dict]:
+        hotspots = await self.fetch_all_hotspots()
+        # 所有数据源都失败时保留旧数据
+        if hotspots or self._cache is None:
+            self._cache = (time.monotonic(), hotspots)
+        return self._cache[1]
+
+    def _start_refresh(self) -> asyncio.Task:
+        """启动刷新任务，同一时间只有一个刷新在进行"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    async def get_hotspots(self, force_refresh: bool = False) -> List[Dict]:
+        """获取热点榜单
+
+        缓存未过期时直接返回；已过期时返回旧数据并在后台刷新；
+        没有缓存或 force_refresh 时等待刷新完成。
+        """
+        if self._cache is None or force_refresh:
+            return list(await asyncio.shield(self._start_refresh()))
+
+        fetched_at, hotspots = self._cache
+        if time.monotonic() - fetched_at > self.cache_ttl:
+            self._start_refresh()
+        return list(hotspots)
+
+    async def get_hotspot_content(self, url: str) -> str:
         """
         Fetches and extracts the main content from a given hotspot URL.
         """
-        if not url or not url.startswith('http'):
-            return "无效或空的URL。"
-
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-
-            doc = Document(response.text)
-            title = doc.title()
-            
-            summary_html = doc.summary(html_partial=True)
-            
-            soup = BeautifulSoup(summary_html, 'html.parser')
-            content_text = soup.get_text('\\n', strip=True)
-
-            if not content_text:
-                return f"标题: {title}\\n\\n无法从此页面提取正文内容。可能是一个动态加载或非标准文章页面。"
-
-            return f"标题: {title}\\n\\n{content_text}"
-
-        except requests.exceptions.RequestException as e:
-            logging.error(f"获取热点内容失败 (Request Error) for URL {url}: {e}")
-            return "获取内容失败：网络请求错误或超时。"
-        except Exception as e:
-            logging.error(f"解析热点内容失败 for URL {url}: {e}")
-            return "获取内容失败：页面解析时发生未知错误。"
-
-    def analyze_hotspots(self, hotspots: List[Dict], ai_service: Optional[str] = None, ai_model: Optional[str] = None) -> str:
-        if not hotspots:
-            return "今日无热点数据可供分析。"
-        # 构建 prompt
-        prompt = self.build_prompt(hotspots)
-        # 选择AI服务
+        return await self.extractor.extract(self._get_client(), url)
+
+    async def get_hotspots_content(self, urls: List[str]) -> List[Dict]:
+        """并发提取多个热点URL的正文，按输入顺序返回"""
+        return await self.extractor.extract_many(self._get_client(), urls)
+
+    def _resolve_ai(self, ai_service: Optional[str], ai_model: Optional[str]) -> Tuple[str, str]:
+        """确定分析使用的AI服务和模型，未指定时使用配置中的默认值"""
         config = self.config
         service = ai_service if isinstance(ai_service, str) and ai_service else config.get('defaults', {}).get('ai_service')
         if not service:
             service = 'aliyun_bailian'
-        if service is None:
-            service = 'aliyun_bailian'
         service = str(service)
         model = ai_model if isinstance(ai_model, str) and ai_model else config.get('defaults', {}).get('ai_model')
         if not model:
             model = 'qwen-plus'
-        if model is None:
-            model = 'qwen-plus'
         model = str(model)
-        assert isinstance(service, str) and service, 'service must be a non-empty string'
-        assert isinstance(model, str) and model, 'model must be a non-empty string'
-        provider = AIProviderFactory.get_provider(service, config)
+        return service, model
+
+    async def _call_ai(self, prompt: str, service: str, model: str) -> str:
+        provider = AIProviderFactory.get_provider(service, self.config)
         messages = [{"role": "user", "content": prompt}]
-        return provider.generate_content(messages, model)
+        return await provider.agenerate_content(messages, model)
+
+    async def analyze_hotspots(self, hotspots: List[Dict], ai_service: Optional[str] = None, ai_model: Optional[str] = None) -> str:
+        if not hotspots:
+            return "今日无热点数据可供分析。"
+        service, model = self._resolve_ai(ai_service, ai_model)
+        report = await self._call_ai(self.build_prompt(hotspots), service, model)
+        # 记录本次分析，作为增量分析的基线
+        self._analysis = {
+            "service": service,
+            "model": model,
+            "hotspots": list(hotspots),
+            "base_report": report,
+            "updates": []
+        }
+        return report
+
+    @staticmethod
+    def _topic_key(hotspot: Dict) -> str:
+        return "".join(str(hotspot.get("title") or "").split())
+
+    def diff_hotspots(self, previous: List[Dict], current: List[Dict]) -> Dict[str, List[Dict]]:
+        """对比两次热点榜单，找出新上榜和排名大幅变化的话题"""
+        previous_ranks = {}
+        for rank, item in enumerate(previous):
+            previous_ranks.setdefault(self._topic_key(item), rank)
+
+        new_topics, reranked_topics = [], []
+        for rank, item in enumerate(current):
+            old_rank = previous_ranks.get(self._topic_key(item))
+            if old_rank is None:
+                new_topics.append({**item, "rank": rank + 1})
+            elif abs(old_rank - rank) >= self.RERANK_THRESHOLD:
+                reranked_topics.append({**item, "rank": rank + 1, "previous_rank": old_rank + 1})
+        return {"new_topics": new_topics, "reranked_topics": reranked_topics}
+
+    def _render_report(self) -> str:
+        """将增量更新合并到基线报告中，放在综合趋势章节之前"""
+        analysis = self._analysis
+        if not analysis["updates"]:
+            return analysis["base_report"]
+        updates = "\n\n".join(
+            f"## 热点更新 ({update['time']})\n\n{update['content'].strip()}"
+            for update in analysis["updates"]
+        )
+        report = analysis["base_report"]
+        marker = "## 综合趋势与业务建议"
+        index = report.find(marker)
+        if index == -1:
+            return f"{report.rstrip()}\n\n{updates}\n"
+        return f"{report[:index].rstrip()}\n\n{updates}\n\n{report[index:]}"
+
+    async def analyze_hotspots_incremental(self, hotspots: List[Dict], ai_service: Optional[str] = None,
+                                           ai_model: Optional[str] = None) -> Dict:
+        """增量分析热点：只将新上榜或排名大幅变化的话题发送给模型，并合并到上次的报告中
+
+        没有可用的基线、服务/模型变化、变化话题过多或增量更新次数达到上限时进行完整分析。
+
+        Returns:
+            包含 report、mode（full/incremental/unchanged）、new_topics 和 reranked_topics 的字典
+        """
+        async with self._analysis_lock:
+            service, model = self._resolve_ai(ai_service, ai_model)
+            analysis = self._analysis
+            if (
+                not hotspots
+                or analysis is None
+                or (analysis["service"], analysis["model"]) != (service, model)
+                or len(analysis["updates"]) >= self.MAX_INCREMENTAL_UPDATES
+            ):
+                report = await self.analyze_hotspots(hotspots, service, model)
+                return {"report": report, "mode": "full", "new_topics": [], "reranked_topics": []}
+
+            changes = self.diff_hotspots(analysis["hotspots"], hotspots)
+            changed = changes["new_topics"] + changes["reranked_topics"]
+            if len(changed) > len(hotspots) * self.FULL_REANALYSIS_RATIO:
+                report = await self.analyze_hotspots(hotspots, service, model)
+                return {"report": report, "mode": "full", **changes}
+
+            analysis["hotspots"] = list(hotspots)
+            if not changed:
+                return {"report": self._render_report(), "mode": "unchanged", **changes}
+
+            content = await self._call_ai(
+                self.build_incremental_prompt(changes, self._render_report()), service, model
+            )
+            analysis["updates"].append({"time": datetime.now().strftime('%H:%M'), "content": content})
+            return {"report": self._render_report(), "mode": "incremental", **changes}
+
+    def build_incremental_prompt(self, changes: Dict[str, List[Dict]], previous_report: str) -> str:
+        analyzed_events = "\n".join(
+            line.lstrip("#").strip() for line in previous_report.splitlines() if line.startswith("### ")
+        ) or "无"
+        topics_str = "\n".join(
+            [
+                f"- [新上榜 第{item['rank']}名] [{item['source']}] {item['title']} (热度: {item.get('hot_score', 'N/A')})"
+                for item in changes["new_topics"]
+            ] + [
+                f"- [排名变化 第{item['previous_rank']}名→第{item['rank']}名] [{item['source']}] {item['title']} (热度: {item.get('hot_score', 'N/A')})"
+                for item in changes["reranked_topics"]
+            ]
+        )
+        return f"""
+你是一位资深的市场与行业分析师。今天的热点分析报告已经完成，以下是报告生成之后热点榜单的变化，请只针对这些变化补充分析。\n\n**已分析过的重点事件：**\n{analyzed_events}\n\n**榜单变化：**\n{topics_str}\n\n**输出要求：**\n1.  从上述变化中挑选最多3个值得关注的事件，不要重复分析已分析过的重点事件，除非其排名变化带来了新的解读。\n2.  对每个事件，使用三级标题 `### 事件标题`，撰写约150字的分析，覆盖事件简述、潜在影响和舆论焦点。\n3.  如果这些变化改变了整体趋势判断，在最后用一段以 `**趋势补充：**` 开头的文字说明；否则不要输出该段。\n4.  不要输出一级或二级标题，不要重复已有报告的内容。\n"""
 
     def build_prompt(self, hotspots: List[Dict]) -> str:
-        from datetime import datetime
         today_str = datetime.now().strftime('%Y-%m-%d')
         hotspots_str = "\n".join(
             f"{idx+1}. [{item['source']}] {item['title']} (热度: {item.get('hot_score', 'N/A')})"
@@ -0,0 +1,173 @@
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Type
+
+import httpx
+
+# 数据源类型注册表：type -> 数据源类
+_SOURCE_TYPES: Dict[str, Type["HotspotSource"]] = {}
+
+
+def register_source(source_type: str):
+    """注册热点数据源类型，配置中 hotspot_sources 的 type 字段对应此名称"""
+    def decorator(cls):
+        cls.source_type = source_type
+        _SOURCE_TYPES[source_type] = cls
+        return cls
+    return decorator
+
+
+def create_source(config: Dict) -> Optional["HotspotSource"]:
+    """根据配置创建数据源，类型未注册或已禁用时返回None"""
+    if not config.get("enabled", True):
+        return None
+    source_class = _SOURCE_TYPES.get(config.get("type"))
+    if source_class is None:
+        logging.warning(f"未知的热点数据源类型: {config.get('type')}")
+        return None
+    return source_class(config)
+
+
+class CircuitBreaker:
+    """熔断器：连续失败达到阈值后熔断，冷却期过后放行一次试探请求"""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        # 半开状态下是否已有试探请求在进行，期间其余请求仍被拦截
+        self.probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def release_probe(self) -> None:
+        """试探请求未得出结果（如被取消）时释放名额，下次请求重新试探"""
+        self.probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probe_in_flight = False
+        # 试探请求失败或连续失败达到阈值时（重新）熔断
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class HotspotSource:
+    """热点数据源基类，子类实现 fetch 并用 register_source 注册
+
+    每个数据源有独立的超时时间、熔断器和最近一次成功结果的快照，
+    请求失败、超时或熔断时返回快照。
+    """
+    source_type = ""
+    default_timeout = 4.0
+
+    def __init__(self, config: Dict):
+        self.name = config.get("name", self.source_type)
+        self.timeout = float(config.get("timeout", self.default_timeout))
+        self.limit = int(config.get("limit", 10))
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(config.get("failure_threshold", 3)),
+            reset_timeout=float(config.get("reset_timeout", 60))
+        )
+        # 最近一次成功获取的结果及时间
+        self.last_good: List[Dict] = []
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    async def fetch(self, client: httpx.AsyncClient) -> List[Dict]:
+        """请求并解析数据源，失败时抛出异常"""
+        raise NotImplementedError
+
+    async def collect(self, client: httpx.AsyncClient) -> List[Dict]:
+        """在超时预算内获取热点，失败时返回最近一次成功的快照"""
+        if not self.breaker.allow_request():
+            return list(self.last_good)
+        try:
+            hotspots = await asyncio.wait_for(self.fetch(client), timeout=self.timeout)
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        except Exception as e:
+            self.breaker.record_failure()
+            self.last_error = f"{type(e).__name__}: {e}"
+            logging.error(f"获取{self.name}热搜失败: {self.last_error}")
+            return list(self.last_good)
+
+        self.breaker.record_success()
+        self.last_good = hotspots[:self.limit]
+        self.last_success = time.time()
+        self.last_error = None
+        return list(self.last_good)
+
+    def status(self) -> Dict:
+        return {
+            "name": self.name,
+            "type": self.source_type,
+            "state": self.breaker.state,
+            "failures": self.breaker.failures,
+            "last_success": self.last_success,
+            "last_error": self.last_error,
+            "snapshot_size": len(self.last_good),
+        }
+
+
+@register_source("baidu")
+class BaiduHotSource(HotspotSource):
+    url = "https://top.baidu.com/api/board?platform=wise&tab=realtime"
+
+    async def fetch(self, client: httpx.AsyncClient) -> List[Dict]:
+        response = await client.get(self.url)
+        response.raise_for_status()
+        data = response.json()
+        content = data.get("data", {}).get("cards", [{}])[0].get("content", [])
+        return [
+            {
+                "source": self.name,
+                "title": item.get("word"),
+                "url": item.get("url"),
+                "hot_score": item.get("hotScore")
+            }
+            for item in content
+        ]
+
+
+@register_source("weibo")
+class WeiboHotSource(HotspotSource):
+    url = "https://weibo.com/ajax/side/hotSearch"
+
+    async def fetch(self, client: httpx.AsyncClient) -> List[Dict]:
+        response = await client.get(self.url)
+        response.raise_for_status()
+        data = response.json()
+        realtime = data.get("data", {}).get("realtime", [])
+        return [
+            {
+                "source": self.name,
+                "title": item.get("word"),
+                "url": f"https://s.weibo.com/weibo?q={item.get('word')}",
+                "hot_score": item.get("raw_hot")
+            }
+            for item in realtime
+        ]
@@ -1,7 +1,4 @@
-import json
 import logging
-from pathlib import Path
-import httpx # Keep httpx for potential future use or if BaseGenerator still needs it
 from src.services.ai_providers import AIProviderFactory
 from .html_generation.title_generator import TitleGenerator
 from .html_generation.css_generator import CSSGenerator
@@ -18,10 +15,8 @@ class HTMLCreator:
 
     def __init__(self):
         """初始化工厂，加载配置并初始化AI服务提供商"""
-        # 加载配置文件
-        config_path = Path(__file__).parent.parent.parent / 'config.json'
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
+        # 加载配置文件（文件未修改时使用缓存）
+        self.config = AIProviderFactory.load_config()
         defaults = self.config.get('defaults', {})
 
         # 从配置文件加载配置
@@ -36,54 +31,57 @@ class HTMLCreator:
         except Exception as e:
             raise ValueError(f"初始化AI服务提供商失败: {str(e)}")
 
-        # Note: We no longer need the HTTP client here as it's in BaseGenerator
-
-    def get_title_generator(self) -> TitleGenerator:
+    def get_title_generator(self, use_cache: bool = True) -> TitleGenerator:
         """获取标题生成器实例"""
         return TitleGenerator(
             config=self.config,
             service_name=self.service_name,
             model=self.model,
             max_retries=self.max_retries,
-            retry_base_delay=self.retry_base_delay
+            retry_base_delay=self.retry_base_delay,
+            use_cache=use_cache
         )
 
-    def get_css_generator(self) -> CSSGenerator:
+    def get_css_generator(self, use_cache: bool = True) -> CSSGenerator:
         """获取CSS生成器实例"""
         return CSSGenerator(
             config=self.config,
             service_name=self.service_name,
             model=self.model,
             max_retries=self.max_retries,
-            retry_base_delay=self.retry_base_delay
+            retry_base_delay=self.retry_base_delay,
+            use_cache=use_cache
         )
 
-    def get_content_generator(self) -> ContentGenerator:
+    def get_content_generator(self, use_cache: bool = True) -> ContentGenerator:
         """获取内容生成器实例"""
         return ContentGenerator(
             config=self.config,
             service_name=self.service_name,
             model=self.model,
             max_retries=self.max_retries,
-            retry_base_delay=self.retry_base_delay
+            retry_base_delay=self.retry_base_delay,
+            use_cache=use_cache
         )
 
-    def get_content_splitter(self) -> ContentSplitter:
+    def get_content_splitter(self, use_cache: bool = True) -> ContentSplitter:
         """获取内容分割器实例"""
         return ContentSplitter(
             config=self.config,
             service_name=self.service_name,
             model=self.model,
             max_retries=self.max_retries,
-            retry_base_delay=self.retry_base_delay
+            retry_base_delay=self.retry_base_delay,
+            use_cache=use_cache
         )
 
-    def get_html_builder(self) -> HTMLBuilder:
+    def get_html_builder(self, use_cache: bool = True) -> HTMLBuilder:
         """获取HTML构建器实例"""
         return HTMLBuilder(
             config=self.config,
             service_name=self.service_name,
             model=self.model,
             max_retries=self.max_retries,
-            retry_base_delay=self.retry_base_delay
+            retry_base_delay=self.retry_base_delay,
+            use_cache=use_cache
         )
\ No newline at end of file
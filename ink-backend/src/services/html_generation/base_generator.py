@@ -1,26 +1,37 @@
 import asyncio
 import random
 import logging
-import httpx
+import weakref
 from src.services.ai_providers import AIProviderFactory
+from .response_cache import ResponseCache
+
+# 流式读取上游结束的标记
+_STREAM_END = object()
+
 
 class BaseGenerator:
-    def __init__(self, config, service_name, model, max_retries, retry_base_delay):
+    # 各AI服务的并发请求上限，由同一事件循环中的所有生成器实例共享：
+    # 事件循环 -> {服务名: (上限, 信号量)}，信号量只能在创建它的事件循环中使用
+    _semaphores = weakref.WeakKeyDictionary()
+    # 服务配置未指定 max_concurrency 时的默认上限
+    DEFAULT_MAX_CONCURRENCY = 4
+
+    def __init__(self, config, service_name, model, max_retries, retry_base_delay, use_cache=True):
         self.config = config
         self.service_name = service_name
         self.model = model
         self.max_retries = max_retries
         self.retry_base_delay = retry_base_delay
+        # 提供商实例由工厂注册表共享，连接在请求间复用
         self.ai_provider = AIProviderFactory.get_provider(self.service_name, self.config)
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # 响应缓存，配置中关闭或本次请求不使用缓存时为None
+        self.response_cache = ResponseCache.from_config(self.config) if use_cache else None
         self.logger = logging.getLogger(self.__class__.__name__)
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.client:
-            await self.client.aclose()
         self.logger.info(f"{self.__class__.__name__} resources cleaned up.")
         
     def set_ai_provider(self, provider, model):
@@ -29,16 +40,79 @@ class BaseGenerator:
         self.model = model
         self.logger.info(f"AI提供商已更改为: {provider.__class__.__name__}, 模型: {model}")
 
-    async def call_ai_service(self, prompt: str) -> str:
-        """异步调用AI服务生成内容，包含重试逻辑"""
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前AI服务的并发信号量，上限取自服务配置中的 max_concurrency"""
+        service_config = next(
+            (s for s in self.config.get('services', []) if s.get('name') == self.service_name), {}
+        )
+        limit = service_config.get('max_concurrency', self.DEFAULT_MAX_CONCURRENCY)
+        loop_semaphores = BaseGenerator._semaphores.setdefault(asyncio.get_running_loop(), {})
+        entry = loop_semaphores.get(self.service_name)
+        if entry is None or entry[0] != limit:
+            entry = (limit, asyncio.Semaphore(limit))
+            loop_semaphores[self.service_name] = entry
+        return entry[1]
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """计算重试等待时间，被限流(429)时优先使用服务端建议的 Retry-After"""
+        delay = self.retry_base_delay * (2 **attempt) + random.uniform(0, 1)
+        if getattr(error, 'status_code', None) == 429:
+            headers = getattr(error, 'headers', None) or {}
+            try:
+                retry_after = float(headers.get('Retry-After') or headers.get('retry-after'))
+            except (TypeError, ValueError):
+                retry_after = 0
+            # 限流时至少按两倍的退避时间等待
+            delay = max(delay * 2, retry_after)
+        return delay
+
+    def _get_cached(self, prompt: str):
+        if self.response_cache is None:
+            return None
+        try:
+            cached = self.response_cache.get(self.service_name, self.model, prompt)
+        except Exception as e:
+            self.logger.warning(f"Failed to read response cache: {str(e)}")
+            return None
+        if cached is not None:
+            self.logger.info(f"Response cache hit for {self.service_name}/{self.model}")
+        return cached
+
+    def _put_cached(self, prompt: str, result: str) -> None:
+        if self.response_cache is None or not result:
+            return
+        try:
+            self.response_cache.put(self.service_name, self.model, prompt, result)
+        except Exception as e:
+            self.logger.warning(f"Failed to write response cache: {str(e)}")
+
+    async def call_ai_service(self, prompt: str, postprocess=None):
+        """异步调用AI服务生成内容，包含重试逻辑和按服务的并发限制
+
+        Args:
+            prompt: 提示词
+            postprocess: 对原始输出的后处理（解析、校验），抛出异常表示输出不可用。
+                后处理成功后才写入缓存，返回后处理的结果
+        """
+        cached = self._get_cached(prompt)
+        if cached is not None:
+            return postprocess(cached) if postprocess else cached
+
+        raw = await self._generate(prompt)
+        result = postprocess(raw) if postprocess else raw
+        self._put_cached(prompt, raw)
+        return result
+
+    async def _generate(self, prompt: str) -> str:
         messages = [{"role": "user", "content": prompt}]
 
         for i in range(self.max_retries):
             try:
-                return self.ai_provider.generate_content(messages, self.model)
+                async with self._get_semaphore():
+                    return await self.ai_provider.agenerate_content(messages, self.model)
             except Exception as e:
                 if i < self.max_retries - 1:
-                    delay = self.retry_base_delay * (2 **i) + random.uniform(0, 1)
+                    delay = self._retry_delay(i, e)
                     self.logger.warning(f"AI request failed, retrying in {delay:.1f} seconds: {str(e)}")
                     await asyncio.sleep(delay)
                 else:
@@ -46,3 +120,66 @@ class BaseGenerator:
                     raise
 
         raise Exception("AI service call failed, all retries failed")
+
+    async def stream_ai_service(self, prompt: str, postprocess=None):
+        """流式调用AI服务，逐块产出原始文本。仅在尚未产出任何内容时重试
+
+        postprocess 用于检查完整输出，成功后才写入缓存，产出的文本块不受影响
+        """
+        cached = self._get_cached(prompt)
+        if cached is not None:
+            yield cached
+            return
+
+        messages = [{"role": "user", "content": prompt}]
+
+        for i in range(self.max_retries):
+            started = False
+            chunks = []
+            queue = asyncio.Queue()
+            producer = asyncio.create_task(self._pump_stream(messages, queue))
+            try:
+                while True:
+                    chunk = await queue.get()
+                    if chunk is _STREAM_END:
+                        break
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    started = True
+                    chunks.append(chunk)
+                    yield chunk
+                self._cache_stream(prompt, "".join(chunks), postprocess)
+                return
+            except Exception as e:
+                if not started and i < self.max_retries - 1:
+                    delay = self._retry_delay(i, e)
+                    self.logger.warning(f"AI stream request failed, retrying in {delay:.1f} seconds: {str(e)}")
+                    await asyncio.sleep(delay)
+                else:
+                    self.logger.error(f"AI stream request failed: {str(e)}")
+                    raise
+            finally:
+                # 调用方提前停止读取时不再继续读取上游
+                producer.cancel()
+
+    def _cache_stream(self, prompt: str, output: str, postprocess=None) -> None:
+        if self.response_cache is None:
+            return
+        if postprocess:
+            try:
+                postprocess(output)
+            except Exception as e:
+                self.logger.warning(f"Stream output failed post-processing, not cached: {str(e)}")
+                return
+        self._put_cached(prompt, output)
+
+    async def _pump_stream(self, messages, queue: asyncio.Queue) -> None:
+        """在并发槽位内读取上游流并放入队列，上游生成结束即释放槽位，不等待调用方读完"""
+        try:
+            async with self._get_semaphore():
+                async for chunk in self.ai_provider.astream_content(messages, self.model):
+                    queue.put_nowait(chunk)
+        except Exception as e:
+            queue.put_nowait(e)
+        else:
+            queue.put_nowait(_STREAM_END)
@@ -11,3 +11,14 @@ class ContentGenerator(BaseGenerator):
             theme=theme
         )
         return await self.call_ai_service(prompt)
+
+    async def stream_note_content(self, title: str, style: str, audience: str, theme: str):
+        """流式生成笔记文案，逐块产出文本"""
+        prompt = PROMPTS["content"].format(
+            title=title,
+            style=style,
+            audience=audience,
+            theme=theme
+        )
+        async for chunk in self.stream_ai_service(prompt):
+            yield chunk
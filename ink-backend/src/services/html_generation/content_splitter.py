@@ -15,8 +15,12 @@ class ContentSplitter(BaseGenerator):
         不要包含任何额外解释、文字说明或markdown格式（如```json）。
         内容：{content}"""
 
-        response = await self.call_ai_service(prompt)
+        return await self.call_ai_service(
+            prompt, postprocess=lambda response: self._parse_sections(response, num_sections)
+        )
 
+    def _parse_sections(self, response: str, num_sections: int) -> list:
+        """解析并校验AI返回的分割结果，不符合要求时抛出异常"""
         # 清理可能的markdown标记
         if response.startswith("```json"):
             response = response[7:]
@@ -7,4 +7,12 @@ class CSSGenerator(BaseGenerator):
         prompt = PROMPTS["css_style"].format(
             style=style
         )
-        return (await self.call_ai_service(prompt)).strip()
+        return await self.call_ai_service(prompt, postprocess=str.strip)
+
+    async def stream_css_style(self, style: str):
+        """流式生成CSS样式，逐块产出原始文本"""
+        prompt = PROMPTS["css_style"].format(
+            style=style
+        )
+        async for chunk in self.stream_ai_service(prompt):
+            yield chunk
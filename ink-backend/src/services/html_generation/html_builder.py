@@ -1,4 +1,5 @@
 import asyncio
+from typing import Optional
 from .base_generator import BaseGenerator
 from .constants import PROMPTS
 import re
@@ -12,12 +13,7 @@ class HTMLBuilder(BaseGenerator):
             style=style,
             css_style=css_style
         )
-        html = await self.call_ai_service(prompt)
-        # 只去除开头和结尾的 markdown 代码块标记
-        html = re.sub(r'^```html\s*', '', html, flags=re.IGNORECASE)
-        html = re.sub(r'^```\s*', '', html, flags=re.IGNORECASE)
-        html = re.sub(r'```\s*$', '', html, flags=re.IGNORECASE)
-        return html.strip()
+        return await self.call_ai_service(prompt, postprocess=self._strip_code_fence)
 
     async def generate_question_html(self, title: str, question: str, style: str, css_style: str = "") -> str:
         """生成问题类型的HTML代码"""
@@ -27,13 +23,52 @@ class HTMLBuilder(BaseGenerator):
             style=style,
             css_style=css_style
         )
-        html = await self.call_ai_service(prompt)
-        # 去除开头和结尾的 markdown 代码块标记
+        return await self.call_ai_service(prompt, postprocess=self._strip_code_fence)
+
+    @staticmethod
+    def _strip_code_fence(html: str) -> str:
+        """只去除开头和结尾的 markdown 代码块标记"""
         html = re.sub(r'^```html\s*', '', html, flags=re.IGNORECASE)
         html = re.sub(r'^```\s*', '', html, flags=re.IGNORECASE)
         html = re.sub(r'```\s*$', '', html, flags=re.IGNORECASE)
         return html.strip()
 
+    async def generate_sections_html(
+        self,
+        title: str,
+        sections: list,
+        style: str,
+        css_style: str = "",
+        is_question: bool = False,
+        max_concurrency: Optional[int] = None
+    ) -> list:
+        """并行生成多个分段的HTML，按输入顺序返回结果
+
+        并发受AI服务的 max_concurrency 限制，max_concurrency 参数可在此基础上进一步收紧。
+        生成失败的分段在结果中对应位置为异常对象。
+        """
+        limiter = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def render(description: str) -> str:
+            if is_question:
+                return await self.generate_question_html(
+                    title=title, question=description, style=style, css_style=css_style
+                )
+            return await self.generate_image_html(
+                title=title, description=description, style=style, css_style=css_style
+            )
+
+        async def generate(description: str) -> str:
+            if limiter is None:
+                return await render(description)
+            # 取得名额后再创建协程，等待期间被取消时不会留下未执行的协程
+            async with limiter:
+                return await render(description)
+
+        return await asyncio.gather(
+            *[generate(description) for description in sections], return_exceptions=True
+        )
+
     async def generate_section_html(self, content, section_num):
         """生成单个内容区块的HTML"""
         return f'<section class="content-section section-{section_num}">{content}</section>'
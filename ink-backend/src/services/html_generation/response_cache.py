@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI响应缓存
+相同服务、模型和prompt的请求直接返回已生成的结果，
+条目持久化在SQLite中，按存活时间和最近访问顺序淘汰
+"""
+
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 项目根目录，缓存路径相对于此解析
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+
+class ResponseCache:
+    """AI响应缓存，以 (服务, 模型, 规范化prompt) 为键，持久化在SQLite中
+
+    条目超过 ttl 秒后失效，条目数超过 max_entries 时淘汰最久未访问的条目。
+    """
+
+    # 按数据库路径共享的实例
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str, ttl: float = 86400, max_entries: int = 1000):
+        """
+        Args:
+            path: SQLite数据库路径，相对路径基于项目根目录
+            ttl: 条目有效期（秒）
+            max_entries: 最多保留的条目数
+        """
+        db_path = Path(path)
+        if not db_path.is_absolute():
+            db_path = PROJECT_ROOT / db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                service TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["ResponseCache"]:
+        """根据配置中的 response_cache 段获取共享实例，未配置或未启用时返回None"""
+        cache_config = config.get('response_cache') or {}
+        if not cache_config.get('enabled', False):
+            return None
+
+        path = cache_config.get('path', 'data/cache/ai_responses.sqlite3')
+        with cls._shared_lock:
+            cache = cls._shared.get(path)
+            if cache is None:
+                cache = cls(
+                    path,
+                    ttl=cache_config.get('ttl_seconds', 86400),
+                    max_entries=cache_config.get('max_entries', 1000)
+                )
+                cls._shared[path] = cache
+            return cache
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """规范化prompt：去除首尾空白并合并连续空白"""
+        return re.sub(r'\s+', ' ', prompt).strip()
+
+    @classmethod
+    def make_key(cls, service: str, model: str, prompt: str) -> str:
+        raw = "\0".join([service, model, cls.normalize_prompt(prompt)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, service: str, model: str, prompt: str) -> Optional[str]:
+        """查找缓存的响应，未命中或已过期时返回None"""
+        key = self.make_key(service, model, prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, service: str, model: str, prompt: str, response: str) -> None:
+        """写入响应，并淘汰超出上限的最久未访问条目"""
+        key = self.make_key(service, model, prompt)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, service, model, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, service, model, response, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
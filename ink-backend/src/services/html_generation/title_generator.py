@@ -15,7 +15,21 @@ class TitleGenerator(BaseGenerator):
         logger.info(f"生成标题的Prompt: {prompt}") # 记录生成的 prompt
         ai_output = await self.call_ai_service(prompt) # 获取 AI 服务的原始输出
         logger.info(f"AI服务生成标题的原始输出: {ai_output}") # 记录 AI 服务的原始输出
-        
+        return self.postprocess_title(ai_output)
+
+    async def stream_note_title(self, theme: str, style: str, audience: str):
+        """流式生成小红书风格标题，逐块产出原始文本，完整结果需经 postprocess_title 处理"""
+        prompt = PROMPTS["title"].format(
+            theme=theme,
+            style=style,
+            audience=audience
+        )
+        async for chunk in self.stream_ai_service(prompt):
+            yield chunk
+
+    @staticmethod
+    def postprocess_title(ai_output) -> str:
+        """清理 AI 服务返回的标题文本"""
         # 检查 ai_output 是否为字符串类型，如果不是，尝试转换为字符串
         if not isinstance(ai_output, str):
             try:
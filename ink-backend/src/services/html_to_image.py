@@ -6,6 +6,7 @@
 import argparse
 import asyncio
 from src.services.screenshot_generator import ScreenshotGenerator
+from src.services.browser_pool import WAIT_MODES
 
 def main():
     parser = argparse.ArgumentParser(description='将HTML文件转为图片')
@@ -14,7 +15,8 @@ def main():
     parser.add_argument('-w', '--width', type=int, default=375, help='视口宽度')
     parser.add_argument('--height', type=int, default=667, help='视口高度')
     parser.add_argument('--full-page', action='store_true', help='截取整页')
-    parser.add_argument('--wait-time', type=float, default=1.0, help='等待时间（秒）')
+    parser.add_argument('--wait-time', type=float, default=1.0, help='等待时间，非fixed模式下为最长等待时间（秒）')
+    parser.add_argument('--wait-mode', choices=WAIT_MODES, default='ready', help='截图前的等待模式')
     args = parser.parse_args()
 
     generator = ScreenshotGenerator()
@@ -26,7 +28,8 @@ def main():
             height=args.height,
             headless=True,
             full_page=args.full_page,
-            wait_time=args.wait_time
+            wait_time=args.wait_time,
+            wait_mode=args.wait_mode
         )
         if result:
             print(f"图片已保存: {args.output or args.html_path.replace('.html', '.png')}")
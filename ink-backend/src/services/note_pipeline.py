@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+笔记生成流水线
+在服务端一次完成 标题 → 文案 → 分段 → 分段HTML → 图片 的完整流程，
+互不依赖的阶段并行执行，并以事件形式实时汇报进度
+"""
+
+import os
+import uuid
+import asyncio
+import logging
+from typing import Optional, AsyncIterator
+
+from src.services.html_creator import HTMLCreator
+from src.services.browser_pool import BrowserPool
+from src.services.render_cache import RenderCache
+from .html_generation.title_generator import TitleGenerator
+from .html_generation.css_generator import CSSGenerator
+from .html_generation.content_generator import ContentGenerator
+from .html_generation.content_splitter import ContentSplitter
+from .html_generation.html_builder import HTMLBuilder
+
+logger = logging.getLogger(__name__)
+
+
+class NotePipeline:
+    """笔记生成流水线
+
+    依赖关系：
+        CSS 只依赖风格，与 标题 → 文案 → 分段 并行生成；
+        各分段的HTML并行生成，每段HTML完成后立即渲染为图片。
+    """
+
+    def __init__(
+        self,
+        html_output_dir: str,
+        image_output_dir: str,
+        browser_pool: Optional[BrowserPool] = None,
+        render_cache: Optional[RenderCache] = None,
+        service: Optional[str] = None,
+        model: Optional[str] = None,
+        use_cache: bool = True
+    ):
+        """
+        Args:
+            html_output_dir: 分段HTML保存目录
+            image_output_dir: 图片保存目录
+            browser_pool: 渲染图片使用的浏览器池，为None时不渲染图片
+            render_cache: 渲染缓存，可选
+            service: AI服务提供商，默认使用配置中的默认值
+            model: AI模型名称，默认使用配置中的默认值
+            use_cache: 是否使用AI响应缓存
+        """
+        self.creator = HTMLCreator()
+        self.service_name = service or self.creator.service_name
+        self.model = model or self.creator.model
+        self.html_output_dir = html_output_dir
+        self.image_output_dir = image_output_dir
+        self.browser_pool = browser_pool
+        self.render_cache = render_cache
+        self.use_cache = use_cache
+
+    def _generator(self, generator_class):
+        return generator_class(
+            config=self.creator.config,
+            service_name=self.service_name,
+            model=self.model,
+            max_retries=self.creator.max_retries,
+            retry_base_delay=self.creator.retry_base_delay,
+            use_cache=self.use_cache
+        )
+
+    async def run(
+        self,
+        theme: str,
+        style: str,
+        audience: str,
+        num_sections: int = 1,
+        render_images: bool = True,
+        width: int = 375,
+        height: int = 667,
+        full_page: bool = False
+    ) -> AsyncIterator[dict]:
+        """执行流水线，逐个产出进度事件
+
+        事件格式为 {"type": ..., "content": ...}，分段相关事件带有 index 字段。
+        最后一个事件为 done（content 为完整结果）或 error。
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def emit(event_type: str, content, **extra) -> None:
+            await queue.put({"type": event_type, "content": content, **extra})
+
+        async def produce() -> None:
+            try:
+                result = await self._run(
+                    emit, theme, style, audience, num_sections,
+                    render_images, width, height, full_page
+                )
+                await emit("done", result)
+            except Exception as e:
+                logger.error(f"笔记生成流水线失败: {str(e)}", exc_info=True)
+                await emit("error", str(e))
+            finally:
+                await queue.put(None)
+
+        task = asyncio.create_task(produce())
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            # 客户端断开时取消尚未完成的阶段
+            if not task.done():
+                task.cancel()
+
+    async def _run(
+        self, emit, theme, style, audience, num_sections,
+        render_images, width, height, full_page
+    ) -> dict:
+        async def generate_css() -> str:
+            async with self._generator(CSSGenerator) as css_generator:
+                css_style = await css_generator.generate_css_style(style=style)
+            await emit("css", css_style)
+            return css_style
+
+        css_task = asyncio.create_task(generate_css())
+        try:
+            async with self._generator(TitleGenerator) as title_generator:
+                title = await title_generator.generate_note_title(
+                    theme=theme, style=style, audience=audience
+                )
+            await emit("title", title)
+
+            async with self._generator(ContentGenerator) as content_generator:
+                content = await content_generator.generate_note_content(
+                    title=title, style=style, audience=audience, theme=theme
+                )
+            await emit("content", content)
+
+            async with self._generator(ContentSplitter) as content_splitter:
+                sections = await content_splitter.split_content_into_sections(
+                    content=content, num_sections=num_sections
+                )
+            await emit("sections", sections)
+
+            css_style = await css_task
+        finally:
+            if not css_task.done():
+                css_task.cancel()
+
+        section_results = await asyncio.gather(*[
+            self._build_section(
+                emit, index, title, description, style, css_style,
+                render_images, width, height, full_page
+            )
+            for index, description in enumerate(sections)
+        ])
+
+        return {
+            "title": title,
+            "css_style": css_style,
+            "content": content,
+            "sections": section_results
+        }
+
+    async def _build_section(
+        self, emit, index, title, description, style, css_style,
+        render_images, width, height, full_page
+    ) -> dict:
+        """生成单个分段的HTML并立即渲染为图片"""
+        result = {"index": index, "description": description, "success": False}
+        try:
+            async with self._generator(HTMLBuilder) as html_builder:
+                section_html = await html_builder.generate_image_html(
+                    title=title, description=description, style=style, css_style=css_style
+                )
+
+            section_id = uuid.uuid4().hex
+            html_filename = f'section_{section_id}.html'
+            html_path = os.path.join(self.html_output_dir, html_filename)
+            with open(html_path, 'w', encoding='utf-8') as f:
+                f.write(section_html)
+            result.update({
+                "section_id": section_id,
+                "html": section_html,
+                "file_path": html_path,
+                "html_url": f"/static/html_outputs/{html_filename}"
+            })
+            await emit("section_html", result["html_url"], index=index, section_id=section_id)
+
+            if render_images and self.browser_pool is not None:
+                image = await self._render(section_html, width, height, full_page)
+                image_filename = f'section_{section_id}.png'
+                image_path = os.path.join(self.image_output_dir, image_filename)
+                with open(image_path, 'wb') as f:
+                    f.write(image)
+                result.update({
+                    "output_path": image_path,
+                    "image_url": f"/api/images/{image_filename}"
+                })
+                await emit("section_image", result["image_url"], index=index, section_id=section_id)
+
+            result["success"] = True
+        except Exception as e:
+            logger.error(f"生成第{index + 1}段失败: {str(e)}", exc_info=True)
+            result["msg"] = str(e)
+            await emit("section_error", str(e), index=index)
+        return result
+
+    async def _render(self, html: str, width: int, height: int, full_page: bool) -> bytes:
+        cache_key = None
+        if self.render_cache is not None:
+            cache_key = RenderCache.make_key(
+                html, width=width, height=height, full_page=full_page,
+                wait_mode="ready", image_format="png", quality=None
+            )
+            cached = self.render_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        image = await self.browser_pool.render_html(
+            html, width=width, height=height, full_page=full_page
+        )
+        if cache_key is not None:
+            self.render_cache.put(cache_key, image, "png")
+        return image
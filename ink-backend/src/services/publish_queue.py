@@ -0,0 +1,379 @@
+"""
+小红书发布任务队列
+
+任务持久化在SQLite中，服务重启后未完成的任务会继续执行。
+多个工作协程并行消费队列，同一账号的任务串行执行（每个账号一个浏览器会话），
+发布过程出错的任务按指数退避重试。执行中被中断、结果未知的任务标记为 interrupted，
+不会自动重新发布，避免重复发布同一篇笔记。
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.exceptions import PublishError
+
+logger = logging.getLogger(__name__)
+
+# 项目根目录，数据库路径相对于此解析
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+JOB_STATUSES = ("pending", "running", "completed", "failed", "interrupted")
+
+
+class PublishJobStore:
+    """发布任务的SQLite存储"""
+
+    def __init__(self, path: str):
+        db_path = Path(path)
+        if not db_path.is_absolute():
+            db_path = PROJECT_ROOT / db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = db_path
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS publish_jobs (
+                id TEXT PRIMARY KEY,
+                account TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                next_run_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                result TEXT,
+                error TEXT
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_publish_jobs_status ON publish_jobs (status, next_run_at)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "PublishJobStore":
+        return cls(os.getenv("PUBLISH_QUEUE_DB", "data/queue/publish_jobs.sqlite3"))
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, account: str, payload: Dict[str, Any], max_attempts: int = 3) -> Dict[str, Any]:
+        """添加任务，返回任务信息"""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO publish_jobs (id, account, payload, status, attempts, max_attempts, "
+                "next_run_at, created_at, updated_at) VALUES (?, ?, ?, 'pending', 0, ?, ?, ?, ?)",
+                (job_id, account, json.dumps(payload, ensure_ascii=False), max_attempts, now, now, now)
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM publish_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, status: Optional[str] = None, account: Optional[str] = None,
+             limit: int = 100) -> List[Dict[str, Any]]:
+        """按创建时间倒序列出任务"""
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if account:
+            conditions.append("account = ?")
+            params.append(account)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM publish_jobs {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def claim_next(self, busy_accounts: set) -> Optional[Dict[str, Any]]:
+        """取出最早到期、且账号当前空闲的待执行任务并标记为执行中"""
+        now = time.time()
+        placeholders = ",".join("?" * len(busy_accounts))
+        exclude = f"AND account NOT IN ({placeholders})" if busy_accounts else ""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT id FROM publish_jobs WHERE status = 'pending' AND next_run_at <= ? {exclude} "
+                "ORDER BY next_run_at, created_at LIMIT 1",
+                (now, *busy_accounts)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE publish_jobs SET status = 'running', attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ?",
+                (now, row["id"])
+            )
+            self._conn.commit()
+        return self.get(row["id"])
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE publish_jobs SET status = 'completed', result = ?, error = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (json.dumps(result, ensure_ascii=False), time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def fail(self, job_id: str, error: str, retry_at: Optional[float] = None) -> None:
+        """记录失败，指定 retry_at 时重新排队，否则标记为最终失败"""
+        status = "pending" if retry_at is not None else "failed"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE publish_jobs SET status = ?, error = ?, next_run_at = COALESCE(?, next_run_at), "
+                "updated_at = ? WHERE id = ?",
+                (status, error, retry_at, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def interrupt(self, job_id: str, error: str) -> None:
+        """将执行中的任务标记为中断，发布结果未知，不再自动执行"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE publish_jobs SET status = 'interrupted', error = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running'",
+                (error, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def interrupt_running(self) -> int:
+        """将上次运行退出时仍在执行的任务标记为中断
+
+        浏览器可能已经完成发布，重新排队会导致重复发布，需确认后重新提交。
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE publish_jobs SET status = 'interrupted', error = ?, updated_at = ? "
+                "WHERE status = 'running'",
+                ("服务退出时任务仍在执行，发布结果未知，请确认后重新提交", time.time())
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def next_run_at(self) -> Optional[float]:
+        """最早的待执行任务的计划执行时间"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_run_at) FROM publish_jobs WHERE status = 'pending'"
+            ).fetchone()
+        return row[0]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM publish_jobs GROUP BY status"
+            ).fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
+
+
+class PublishQueue:
+    """发布任务队列
+
+    publisher_factory(account) 为每个账号创建一次发布器，发布器需提供
+    async publish(**payload) -> dict 和 async close()。
+    publish 抛出异常或返回 retryable 为真的结果时任务按退避重试，
+    其他 success 为假的结果（如内容校验失败）直接标记为失败。
+    点击发布按钮后出错（submitted 的 PublishError，或结果中 outcome_unknown 为真）时
+    发布结果未知，任务标记为中断，不会重试。
+    """
+
+    # 没有到期任务时的最长等待时间（秒）
+    POLL_INTERVAL = 5.0
+
+    def __init__(self, store: PublishJobStore, publisher_factory: Callable[[str], Any],
+                 workers: int = 2, max_attempts: int = 3, retry_base_delay: float = 60,
+                 shutdown_timeout: float = 300):
+        """
+        Args:
+            store: 任务存储
+            publisher_factory: 根据账号名创建发布器的函数
+            workers: 并行执行任务的工作协程数
+            max_attempts: 任务默认最多执行次数
+            retry_base_delay: 重试的基础等待时间（秒），按 2^(次数-1) 递增
+            shutdown_timeout: 关闭时等待执行中任务完成的最长时间（秒）
+        """
+        self.store = store
+        self.publisher_factory = publisher_factory
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.shutdown_timeout = shutdown_timeout
+
+        self._publishers: Dict[str, Any] = {}
+        self._busy_accounts: set = set()
+        self._worker_tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closing = False
+
+    @classmethod
+    def from_env(cls, publisher_factory: Callable[[str], Any]) -> "PublishQueue":
+        return cls(
+            PublishJobStore.from_env(),
+            publisher_factory,
+            workers=int(os.getenv("PUBLISH_QUEUE_WORKERS", "2")),
+            max_attempts=int(os.getenv("PUBLISH_QUEUE_MAX_ATTEMPTS", "3")),
+            retry_base_delay=float(os.getenv("PUBLISH_QUEUE_RETRY_DELAY", "60")),
+            shutdown_timeout=float(os.getenv("PUBLISH_QUEUE_SHUTDOWN_TIMEOUT", "300"))
+        )
+
+    def get_publisher(self, account: str):
+        """获取账号的发布器，同一账号始终复用同一个浏览器会话"""
+        publisher = self._publishers.get(account)
+        if publisher is None:
+            publisher = self.publisher_factory(account)
+            self._publishers[account] = publisher
+        return publisher
+
+    def start(self) -> None:
+        if self._worker_tasks:
+            return
+        interrupted = self.store.interrupt_running()
+        if interrupted:
+            logger.warning(f"{interrupted}个发布任务在上次退出时仍在执行，已标记为中断")
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(index)) for index in range(self.workers)
+        ]
+        logger.info(f"发布队列已启动，工作协程数: {self.workers}")
+
+    async def close(self) -> None:
+        """停止领取新任务，等待执行中的发布完成并记录结果
+
+        超过 shutdown_timeout 仍未完成的任务标记为中断，不会在下次启动时重新发布。
+        """
+        self._closing = True
+        self._notify()
+        if self._worker_tasks:
+            _, unfinished = await asyncio.wait(self._worker_tasks, timeout=self.shutdown_timeout)
+            if unfinished:
+                logger.warning(f"等待发布任务完成超时，中断{len(unfinished)}个工作协程")
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        for publisher in self._publishers.values():
+            try:
+                await publisher.close()
+            except Exception as e:
+                logger.warning(f"关闭发布器失败: {e}")
+        self._publishers.clear()
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def enqueue(self, account: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> Dict[str, Any]:
+        job = self.store.enqueue(account, payload, max_attempts or self.max_attempts)
+        logger.info(f"发布任务已入队: {job['id']} ({account}) - {payload.get('title')}")
+        self._notify()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def list_jobs(self, status: Optional[str] = None, account: Optional[str] = None,
+                  limit: int = 100) -> List[Dict[str, Any]]:
+        return self.store.list(status=status, account=account, limit=limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "busy_accounts": sorted(self._busy_accounts),
+            "jobs": self.store.counts()
+        }
+
+    def _retry_delay(self, attempts: int) -> float:
+        return self.retry_base_delay * (2 ** (attempts - 1)) * random.uniform(1, 1.2)
+
+    async def _wait_for_work(self) -> None:
+        next_run_at = self.store.next_run_at()
+        timeout = self.POLL_INTERVAL
+        if next_run_at is not None:
+            timeout = min(timeout, max(next_run_at - time.time(), 0.01))
+        self._wakeup.clear()
+        # 不用 wait_for：Python 3.11 中取消恰好与超时同时发生时，wait_for 会吞掉取消，
+        # 导致 close() 等待工作协程时永远挂起
+        waiter = asyncio.ensure_future(self._wakeup.wait())
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        finally:
+            waiter.cancel()
+
+    async def _worker(self, index: int) -> None:
+        while not self._closing:
+            try:
+                job = self.store.claim_next(self._busy_accounts)
+            except Exception as e:
+                logger.error(f"读取发布任务失败: {e}", exc_info=True)
+                job = None
+            if job is None:
+                await self._wait_for_work()
+                continue
+
+            account = job["account"]
+            self._busy_accounts.add(account)
+            try:
+                await self._run_job(job)
+            finally:
+                self._busy_accounts.discard(account)
+                # 账号空闲后，其他工作协程可以领取该账号的任务
+                self._notify()
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        job_id, attempts = job["id"], job["attempts"]
+        logger.info(f"开始执行发布任务 {job_id} ({job['account']})，第{attempts}次")
+        retryable = True
+        outcome_unknown = False
+        try:
+            result = await self.get_publisher(job["account"]).publish(**job["payload"])
+            error = None if result.get("success") else result.get("message", "发布失败")
+            retryable = bool(result.get("retryable"))
+            outcome_unknown = bool(result.get("outcome_unknown"))
+        except asyncio.CancelledError:
+            # 浏览器可能仍在发布，结果未知，不能重新排队
+            self.store.interrupt(job_id, "服务关闭时发布仍在进行，发布结果未知，请确认后重新提交")
+            logger.warning(f"发布任务 {job_id} 被中断，发布结果未知")
+            raise
+        except Exception as e:
+            result, error = None, f"发布过程出错: {str(e)}"
+            outcome_unknown = isinstance(e, PublishError) and e.submitted
+
+        if error is None:
+            self.store.complete(job_id, result)
+            logger.info(f"发布任务 {job_id} 完成")
+        elif outcome_unknown:
+            self.store.interrupt(job_id, f"点击发布后出错，发布结果未知，请确认后重新提交: {error}")
+            logger.warning(f"发布任务 {job_id} 点击发布后出错，已标记为中断: {error}")
+        elif retryable and attempts < job["max_attempts"]:
+            delay = self._retry_delay(attempts)
+            self.store.fail(job_id, error, retry_at=time.time() + delay)
+            logger.warning(f"发布任务 {job_id} 失败，{delay:.0f}秒后重试: {error}")
+        else:
+            self.store.fail(job_id, error)
+            logger.error(f"发布任务 {job_id} 最终失败: {error}")
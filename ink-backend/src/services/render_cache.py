@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+渲染结果缓存
+以 HTML 内容和渲染参数的哈希为键，将生成的图片保存在磁盘上，
+按最近访问顺序和存活时间淘汰，未改动的卡片重复预览时直接返回
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """基于内容哈希的磁盘图片缓存（LRU）"""
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age: float = 7 * 24 * 3600
+    ):
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节）
+            max_age: 条目自最后一次访问起的最长保留时间（秒）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        # key -> (path, size, last_access)，按最后访问时间从旧到新排列
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+
+    @classmethod
+    def from_env(cls, cache_dir: Union[str, Path]) -> "RenderCache":
+        """根据环境变量创建缓存"""
+        return cls(
+            cache_dir,
+            max_bytes=int(float(os.getenv("RENDER_CACHE_MAX_MB", "512")) * 1024 * 1024),
+            max_age=float(os.getenv("RENDER_CACHE_MAX_AGE_HOURS", "168")) * 3600
+        )
+
+    @staticmethod
+    def make_key(html: Union[str, bytes], **params) -> str:
+        """根据HTML内容和渲染参数计算缓存键"""
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+        digest = hashlib.sha256(html)
+        digest.update(json.dumps(params, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _load_index(self) -> None:
+        """启动时扫描缓存目录重建索引"""
+        files = []
+        for path in self.cache_dir.iterdir():
+            if not path.is_file() or path.name.startswith("."):
+                continue
+            stat = path.stat()
+            files.append((stat.st_mtime, path, stat.st_size))
+
+        for accessed, path, size in sorted(files, key=lambda item: item[0]):
+            self._entries[path.stem] = (path, size, accessed)
+            self._total_bytes += size
+
+        if files:
+            logger.info(f"加载渲染缓存: {len(files)}个条目, {self._total_bytes}字节")
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        path, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"删除缓存文件失败: {path}: {e}")
+
+    def _evict(self) -> None:
+        """淘汰过期条目，并在超出大小上限时淘汰最久未访问的条目"""
+        now = time.time()
+        while self._entries:
+            key, (_, _, accessed) = next(iter(self._entries.items()))
+            if self._total_bytes <= self.max_bytes and now - accessed <= self.max_age:
+                break
+            self._remove(key)
+            self.evictions += 1
+
+    def get_path(self, key: str) -> Optional[Path]:
+        """查找缓存，命中时返回缓存文件路径并刷新访问时间"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        path, size, accessed = entry
+        now = time.time()
+        if now - accessed > self.max_age or not path.exists():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        self._entries[key] = (path, size, now)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def get(self, key: str) -> Optional[bytes]:
+        """查找缓存，命中时返回图片内容"""
+        path = self.get_path(key)
+        return path.read_bytes() if path is not None else None
+
+    def _add(self, key: str, path: Path) -> Path:
+        if key in self._entries:
+            _, old_size, _ = self._entries.pop(key)
+            self._total_bytes -= old_size
+        size = path.stat().st_size
+        self._entries[key] = (path, size, time.time())
+        self._total_bytes += size
+        self._evict()
+        return path
+
+    def put(self, key: str, data: bytes, ext: str = "png") -> Path:
+        """写入图片内容"""
+        path = self.cache_dir / f"{key}.{ext}"
+        tmp_path = self.cache_dir / f".{key}.{ext}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return self._add(key, path)
+
+    def put_file(self, key: str, src_path: Union[str, Path], ext: str = "png") -> Path:
+        """复制已生成的图片文件到缓存"""
+        path = self.cache_dir / f"{key}.{ext}"
+        tmp_path = self.cache_dir / f".{key}.{ext}.tmp"
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, path)
+        return self._add(key, path)
+
+    def stats(self) -> dict:
+        """缓存命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
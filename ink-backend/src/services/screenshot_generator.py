@@ -15,6 +15,7 @@ from playwright.async_api import async_playwright
 import logging
 from typing import Optional
 import traceback
+from src.services.browser_pool import BrowserPool, WAIT_MODES, wait_for_page_ready, batch_output_paths
 
 # 设置日志
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -24,8 +25,36 @@ logger = logging.getLogger(__name__)
 class ScreenshotGenerator:
     """独立的截图生成器"""
     
-    def __init__(self):
-        pass
+    def __init__(self, pool: Optional[BrowserPool] = None):
+        """
+        Args:
+            pool: 共享的浏览器池，为None时批量截图会临时启动一个
+        """
+        self.pool = pool
+    
+    def _resolve_paths(self, html_file: str, output_path: Optional[str] = None) -> tuple:
+        """规范化HTML和输出路径，并确保输出目录存在"""
+        # 规范化路径，去除可能的空格
+        html_file = html_file.strip() if isinstance(html_file, str) else html_file
+        
+        # 如果未指定输出路径，使用HTML文件名+.png
+        if output_path is None:
+            output_path = html_file.replace('.html', '.png')
+        
+        # 确保路径是绝对路径
+        if not os.path.isabs(html_file):
+            html_file = os.path.abspath(html_file)
+            logger.debug(f"转换为绝对路径: {html_file}")
+        
+        if not os.path.isabs(output_path):
+            output_path = os.path.abspath(output_path)
+            logger.debug(f"转换为绝对路径: {output_path}")
+        
+        # 确保输出路径存在
+        output_dir = os.path.dirname(output_path)
+        os.makedirs(output_dir, exist_ok=True)
+        logger.debug(f"确保输出目录存在: {output_dir}")
+        return html_file, output_path
     
     async def take_screenshot(
         self, 
@@ -35,7 +64,8 @@ class ScreenshotGenerator:
         height: Optional[int] = None,
         headless: bool = True,
         full_page: bool = False,
-        wait_time: float = 1.0
+        wait_time: float = 1.0,
+        wait_mode: str = "ready"
     ) -> bool:
         """生成截图
         
@@ -46,31 +76,13 @@ class ScreenshotGenerator:
             height: 视口高度
             headless: 是否无头模式
             full_page: 是否截取整页
-            wait_time: 等待时间（秒）
+            wait_time: fixed 模式为等待时间，其他模式为最长等待时间（秒）
+            wait_mode: 截图前的等待模式（ready/networkidle/fixed）
             
         Returns:
             bool: 是否成功生成截图
         """
-        # 规范化路径，去除可能的空格
-        html_file = html_file.strip() if isinstance(html_file, str) else html_file
-        
-        # 如果未指定输出路径，使用HTML文件名+.png
-        if output_path is None:
-            output_path = html_file.replace('.html', '.png')
-        
-        # 确保路径是绝对路径
-        if not os.path.isabs(html_file):
-            html_file = os.path.abspath(html_file)
-            logger.debug(f"转换为绝对路径: {html_file}")
-        
-        if not os.path.isabs(output_path):
-            output_path = os.path.abspath(output_path)
-            logger.debug(f"转换为绝对路径: {output_path}")
-        
-        # 确保输出路径存在
-        output_dir = os.path.dirname(output_path)
-        os.makedirs(output_dir, exist_ok=True)
-        logger.debug(f"确保输出目录存在: {output_dir}")
+        html_file, output_path = self._resolve_paths(html_file, output_path)
         
         # 检查HTML文件是否存在
         if not os.path.exists(html_file):
@@ -86,17 +98,17 @@ class ScreenshotGenerator:
         try:
             # 使用异步 API 生成截图
             logger.debug("调用异步截图方法")
-            return await self._take_screenshot_async(file_url, output_path, width, height, headless, full_page, wait_time)
+            return await self._take_screenshot_async(file_url, output_path, width, height, headless, full_page, wait_time, wait_mode)
         except Exception as e:
             logger.error(f"截图生成失败:")
             logger.error(f"错误详情:\n{str(e)}")
             logger.error(f"堆栈跟踪:\n{traceback.format_exc()}")
             return False
     
-    async def _take_screenshot_async(self, file_url, output_path, width, height, headless, full_page, wait_time):
+    async def _take_screenshot_async(self, file_url, output_path, width, height, headless, full_page, wait_time, wait_mode="ready"):
         """使用异步 API 生成截图"""
         logger.debug(f"异步截图开始: {file_url} -> {output_path}")
-        logger.debug(f"参数: width={width}, height={height}, headless={headless}, full_page={full_page}, wait_time={wait_time}")
+        logger.debug(f"参数: width={width}, height={height}, headless={headless}, full_page={full_page}, wait_time={wait_time}, wait_mode={wait_mode}")
         
         try:
             logger.debug("初始化 async_playwright")
@@ -110,8 +122,8 @@ class ScreenshotGenerator:
                     logger.debug(f"导航到 URL: {file_url}")
                     await page.goto(file_url)
                     
-                    logger.debug(f"等待 {wait_time} 秒")
-                    await page.wait_for_timeout(int(wait_time * 1000))  # 毫秒
+                    logger.debug(f"等待页面就绪: mode={wait_mode}, 最长 {wait_time} 秒")
+                    await wait_for_page_ready(page, wait_time, wait_mode)
                     
                     logger.debug(f"截图保存到: {output_path}")
                     await page.screenshot(path=output_path, full_page=full_page)
@@ -138,9 +150,11 @@ class ScreenshotGenerator:
         height: int = 667,
         headless: bool = True,
         full_page: bool = False,
-        wait_time: float = 1.0
+        wait_time: float = 1.0,
+        concurrency: int = 4,
+        wait_mode: str = "ready"
     ) -> dict:
-        """批量生成截图
+        """批量生成截图，在同一浏览器的多个页面中并行渲染
         
         Args:
             html_files: HTML文件路径列表
@@ -149,45 +163,69 @@ class ScreenshotGenerator:
             height: 视口高度
             headless: 是否无头模式
             full_page: 是否截取整页
-            wait_time: 等待时间（秒）
+            wait_time: fixed 模式为等待时间，其他模式为最长等待时间（秒）
+            concurrency: 未提供共享浏览器池时，临时浏览器的并行页面数
+            wait_mode: 截图前的等待模式（ready/networkidle/fixed）
             
         Returns:
-            dict: 结果统计
+            dict: 结果统计，results 为按输入顺序排列的逐项结果
         """
         results = {
             "success": [],
             "failed": [],
-            "total": len(html_files)
+            "total": len(html_files),
+            "results": []
         }
+        if not html_files:
+            return results
         
         logger.info(f"开始批量生成截图，共{len(html_files)}个文件")
         
-        for i, html_file in enumerate(html_files, 1):
-            logger.info(f"处理第{i}/{len(html_files)}个文件: {html_file}")
+        pool = self.pool
+        owns_pool = pool is None
+        if owns_pool:
+            pool = BrowserPool(
+                browsers=1,
+                contexts_per_browser=min(concurrency, len(html_files)),
+                headless=headless
+            )
+        
+        # 同名文件追加序号，避免并行渲染时互相覆盖
+        output_paths = batch_output_paths(html_files, output_dir)
+        
+        async def render_one(html_file: str, output_path: str) -> dict:
+            html_path, output_path = self._resolve_paths(html_file, output_path)
             
-            # 确定输出路径
-            output_path = None
-            if output_dir:
-                html_path = Path(html_file)
-                output_path = Path(output_dir) / f"{html_path.stem}.png"
-                # 确保输出目录存在
-                output_path.parent.mkdir(parents=True, exist_ok=True)
+            if not os.path.exists(html_path):
+                logger.error(f"HTML文件不存在: {html_path}")
+                return {"html_file": html_file, "output_path": output_path, "success": False}
             
-            # 生成截图
-            success = await self.take_screenshot(
-                html_file=html_file,
-                output_path=str(output_path) if output_path else None,
+            success = await pool.screenshot(
+                html_path,
+                output_path,
                 width=width,
                 height=height,
-                headless=headless,
                 full_page=full_page,
-                wait_time=wait_time
+                wait_time=wait_time,
+                wait_mode=wait_mode
             )
-            
-            if success:
-                results["success"].append(html_file)
+            return {"html_file": html_file, "output_path": output_path, "success": success}
+        
+        try:
+            items = await asyncio.gather(*[
+                render_one(html_file, output_path)
+                for html_file, output_path in zip(html_files, output_paths)
+            ])
+        finally:
+            if owns_pool:
+                await pool.close()
+        
+        for item in items:
+            results["results"].append(item)
+            if item["success"]:
+                results["success"].append(item["html_file"])
             else:
-                results["failed"].append(html_file)
+                results["failed"].append(item["html_file"])
         
         logger.info(f"批量截图完成: 成功{len(results['success'])}个，失败{len(results['failed'])}个")
         return results
@@ -205,7 +243,8 @@ def main():
     parser.add_argument('--headless', action='store_true', default=True, help='无头模式 (默认: True)')
     parser.add_argument('--no-headless', action='store_false', dest='headless', help='禁用无头模式')
     parser.add_argument('--full-page', action='store_true', help='截取整页')
-    parser.add_argument('--wait-time', type=float, default=1.0, help='等待时间（秒）')
+    parser.add_argument('--wait-time', type=float, default=1.0, help='等待时间，非fixed模式下为最长等待时间（秒）')
+    parser.add_argument('--wait-mode', choices=WAIT_MODES, default='ready', help='截图前的等待模式 (默认: ready)')
     
     # 批量处理参数
     parser.add_argument('--batch', help='批量处理模式，传入包含HTML文件路径的JSON文件')
@@ -235,7 +274,8 @@ def main():
                     height=args.height,
                     headless=args.headless,
                     full_page=args.full_page,
-                    wait_time=args.wait_time
+                    wait_time=args.wait_time,
+                    wait_mode=args.wait_mode
                 )
                 
                 # 输出结果
@@ -257,7 +297,8 @@ def main():
                 height=args.height,
                 headless=args.headless,
                 full_page=args.full_page,
-                wait_time=args.wait_time
+                wait_time=args.wait_time,
+                wait_mode=args.wait_mode
             )
             
             # 输出结果
@@ -7,17 +7,43 @@
 
 import os
 import sys
+import time
 import argparse
 import json
 from pathlib import Path
 from playwright.sync_api import sync_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 import logging
 from typing import Optional
+from src.services.browser_pool import WAIT_MODES, PAGE_READY_SCRIPT
 
 # 设置日志
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _wait_for_page_ready(page, wait_time: float, wait_mode: str) -> None:
+    """同步版本的页面就绪等待，语义与 browser_pool.wait_for_page_ready 一致"""
+    if wait_mode not in WAIT_MODES:
+        raise ValueError(f"不支持的等待模式: {wait_mode}，可选: {', '.join(WAIT_MODES)}")
+    
+    timeout_ms = int(wait_time * 1000)
+    if wait_mode == "fixed":
+        page.wait_for_timeout(timeout_ms)  # 毫秒
+        return
+    if timeout_ms <= 0:
+        return
+    
+    started = time.monotonic()
+    if wait_mode == "networkidle":
+        try:
+            page.wait_for_load_state("networkidle", timeout=timeout_ms)
+        except PlaywrightTimeoutError:
+            logger.debug(f"等待网络空闲超时 ({wait_time}s)")
+    
+    remaining_ms = timeout_ms - int((time.monotonic() - started) * 1000)
+    if remaining_ms > 0 and not page.evaluate(PAGE_READY_SCRIPT, remaining_ms):
+        logger.debug(f"等待字体和图片加载超时 ({wait_time}s)")
+
 def take_screenshot(
     html_file: str,
     output_path: Optional[str] = None,
@@ -25,7 +51,8 @@ def take_screenshot(
     height: int = 600,
     headless: bool = True,
     full_page: bool = False,
-    wait_time: float = 1.0
+    wait_time: float = 1.0,
+    wait_mode: str = "ready"
 ) -> bool:
     """生成截图
     
@@ -36,7 +63,8 @@ def take_screenshot(
         height: 视口高度
         headless: 是否无头模式
         full_page: 是否截取整页
-        wait_time: 等待时间（秒）
+        wait_time: fixed 模式为等待时间，其他模式为最长等待时间（秒）
+        wait_mode: 截图前的等待模式（ready/networkidle/fixed）
         
     Returns:
         bool: 是否成功生成截图
@@ -85,8 +113,8 @@ def take_screenshot(
                 logger.debug(f"导航到 URL: {file_url}")
                 page.goto(file_url)
                 
-                logger.debug(f"等待 {wait_time} 秒")
-                page.wait_for_timeout(int(wait_time * 1000))  # 毫秒
+                logger.debug(f"等待页面就绪: mode={wait_mode}, 最长 {wait_time} 秒")
+                _wait_for_page_ready(page, wait_time, wait_mode)
                 
                 logger.debug(f"截图保存到: {output_path}")
                 page.screenshot(path=output_path, full_page=full_page)
@@ -116,7 +144,8 @@ def main():
     parser.add_argument('--headless', action='store_true', default=True, help='无头模式 (默认: True)')
     parser.add_argument('--no-headless', action='store_false', dest='headless', help='禁用无头模式')
     parser.add_argument('--full-page', action='store_true', help='截取整页')
-    parser.add_argument('--wait-time', type=float, default=1.0, help='等待时间（秒）')
+    parser.add_argument('--wait-time', type=float, default=1.0, help='等待时间，非fixed模式下为最长等待时间（秒）')
+    parser.add_argument('--wait-mode', choices=WAIT_MODES, default='ready', help='截图前的等待模式 (默认: ready)')
     
     # 解析参数
     args = parser.parse_args()
@@ -129,7 +158,8 @@ def main():
         height=args.height,
         headless=args.headless,
         full_page=args.full_page,
-        wait_time=args.wait_time
+        wait_time=args.wait_time,
+        wait_mode=args.wait_mode
     )
     
     # 输出结果
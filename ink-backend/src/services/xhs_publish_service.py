@@ -0,0 +1,114 @@
+"""
+小红书进程内发布服务
+
+在后台专用线程中复用同一个 XHSClient，从浏览器会话池租用已登录的会话发布笔记，
+避免每次发布都启动新的 Python 进程和 Chrome，且不阻塞事件循环。
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.config import XHSConfig
+from src.core.exceptions import PublishError
+from src.core.driver_pool import driver_pool
+from src.xiaohongshu.client import XHSClient
+from src.xiaohongshu.models import XHSNote
+from src.services.xhs_publisher import MediaResolver
+
+logger = logging.getLogger(__name__)
+
+
+class XHSPublishService(MediaResolver):
+    """进程内小红书发布服务
+
+    Selenium 驱动不是线程安全的，所有浏览器操作都在同一个后台线程中串行执行。
+    """
+
+    def __init__(self, client_factory: Optional[Callable[[], XHSClient]] = None,
+                 cookies_file: Optional[str] = None):
+        """
+        Args:
+            client_factory: 创建客户端的函数，默认创建使用全局会话池的 XHSClient
+            cookies_file: 默认客户端使用的cookies文件，为None时使用配置中的默认文件
+        """
+        super().__init__()
+        self.cookies_file = cookies_file
+        self._client_factory = client_factory or self._create_client
+        self._client: Optional[XHSClient] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xhs-publish")
+
+    def _create_client(self) -> XHSClient:
+        config = XHSConfig()
+        if self.cookies_file:
+            config.cookies_file = self.cookies_file
+        return XHSClient(config, driver_pool=driver_pool)
+
+    def _get_client(self) -> XHSClient:
+        if self._client is None:
+            logger.info("初始化进程内小红书客户端")
+            self._client = self._client_factory()
+        return self._client
+
+    async def _publish_async(self, title, content, topics, location, images, videos) -> Dict[str, Any]:
+        note = XHSNote.smart_create(
+            title=title,
+            content=content,
+            topics=topics,
+            location=location or "",
+            images=self.resolve_images(images) or None,
+            videos=videos
+        )
+        result = await self._get_client().publish_note(note)
+        return result.to_dict()
+
+    def _publish_sync(self, *args) -> Dict[str, Any]:
+        """在发布线程中运行，每次发布使用独立的事件循环"""
+        try:
+            result = asyncio.run(self._publish_async(*args))
+        except PublishError as e:
+            logger.exception("发布小红书笔记时发生严重错误")
+            if e.submitted:
+                # 发布按钮已点击，笔记可能已经发布，不能重试
+                return {"success": False, "message": f"发布结果未知: {str(e)}", "outcome_unknown": True}
+            return {"success": False, "message": f"发布过程出错: {str(e)}", "retryable": True}
+        except Exception as e:
+            logger.exception("发布小红书笔记时发生严重错误")
+            # 浏览器或网络异常，发布队列可以稍后重试
+            return {"success": False, "message": f"发布过程出错: {str(e)}", "retryable": True}
+
+        if result["success"]:
+            logger.info(f"笔记 '{result.get('note_title')}' 发布成功。")
+        else:
+            logger.error(f"笔记发布失败: {result['message']}")
+        return result
+
+    async def publish(self,
+                      title: str,
+                      content: str,
+                      topics: Optional[List[str]] = None,
+                      location: Optional[str] = None,
+                      images: Optional[List[str]] = None,
+                      videos: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        发布小红书笔记
+
+        Returns:
+            发布结果字典，包含 success 和 message
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._publish_sync, title, content, topics, location, images, videos
+        )
+
+    def _close_sync(self) -> None:
+        if self._client is not None:
+            self._client.close_session()
+            self._client = None
+
+    async def close(self) -> None:
+        """关闭浏览器会话和发布线程"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close_sync)
+        self._executor.shutdown(wait=False)
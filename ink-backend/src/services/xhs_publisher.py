@@ -10,21 +10,29 @@ from typing import Dict, List, Optional, Any
 
 logger = logging.getLogger(__name__)
 
-class XHSPublisher:
-    """小红书自动发布服务 (项目合并后版本)"""
+class MediaResolver:
+    """将发布请求中的图片地址解析为本地文件路径，供各发布方式共用"""
 
     def __init__(self):
-        """初始化小红书发布服务"""
         # 项目合并后，路径变得简单
         self.project_root = Path(__file__).resolve().parent.parent.parent
         self.temp_images_dir = self.project_root / "temp_images"
         self.temp_images_dir.mkdir(exist_ok=True)
-        
-        # 定位 xhs_toolkit.py
-        self.xhs_toolkit_script = self.project_root / "xhs_toolkit.py"
-        if not self.xhs_toolkit_script.exists():
-            raise FileNotFoundError(f"无法找到发布脚本: {self.xhs_toolkit_script}")
-        logger.info(f"发布脚本路径: {self.xhs_toolkit_script}")
+
+    def resolve_images(self, images: Optional[List[str]]) -> List[str]:
+        """获取图片的本地路径，本地找不到时下载"""
+        image_paths = []
+        if images:
+            for img_url in images:
+                local_path = self._get_local_file_path(img_url)
+                if local_path:
+                    image_paths.append(local_path)
+                else:
+                    logger.info(f"无法找到本地路径，尝试下载: {img_url}")
+                    downloaded_path = self._download_image(img_url)
+                    if downloaded_path:
+                        image_paths.append(downloaded_path)
+        return image_paths
 
     def _get_local_file_path(self, url: str) -> Optional[str]:
         """从URL获取本地文件路径"""
@@ -42,43 +50,6 @@ class XHSPublisher:
                     return str(local_path)
         return None
 
-    def _create_publish_config_and_get_args(self,
-                                        title: str,
-                                        content: str,
-                                        topics: Optional[List[str]] = None,
-                                        location: Optional[str] = None,
-                                        images: Optional[List[str]] = None,
-                                        videos: Optional[List[str]] = None) -> List[str]:
-        """准备发布参数，必要时下载图片"""
-        image_paths = []
-        if images:
-            for img_url in images:
-                local_path = self._get_local_file_path(img_url)
-                if local_path:
-                    image_paths.append(local_path)
-                else:
-                    logger.info(f"无法找到本地路径，尝试下载: {img_url}")
-                    downloaded_path = self._download_image(img_url)
-                    if downloaded_path:
-                        image_paths.append(downloaded_path)
-
-        cmd_args = [
-            "publish",
-            title,
-            content,
-        ]
-        
-        if topics:
-            cmd_args.extend(["--topics", ",".join(topics)])
-        if location:
-            cmd_args.extend(["--location", location])
-        if image_paths:
-            cmd_args.extend(["--images", ",".join(image_paths)])
-        if videos:
-            cmd_args.extend(["--videos", ",".join(videos)])
-            
-        return cmd_args
-
     def _download_image(self, url: str) -> Optional[str]:
         """下载单个网络图片到本地临时文件"""
         try:
@@ -109,6 +80,46 @@ class XHSPublisher:
             logger.error(f"下载图片时出错: {url}, 错误: {e}")
             return None
 
+class XHSPublisher(MediaResolver):
+    """小红书自动发布服务 (项目合并后版本)"""
+
+    def __init__(self):
+        """初始化小红书发布服务"""
+        super().__init__()
+
+        # 定位 xhs_toolkit.py
+        self.xhs_toolkit_script = self.project_root / "xhs_toolkit.py"
+        if not self.xhs_toolkit_script.exists():
+            raise FileNotFoundError(f"无法找到发布脚本: {self.xhs_toolkit_script}")
+        logger.info(f"发布脚本路径: {self.xhs_toolkit_script}")
+
+    def _create_publish_config_and_get_args(self,
+                                        title: str,
+                                        content: str,
+                                        topics: Optional[List[str]] = None,
+                                        location: Optional[str] = None,
+                                        images: Optional[List[str]] = None,
+                                        videos: Optional[List[str]] = None) -> List[str]:
+        """准备发布参数，必要时下载图片"""
+        image_paths = self.resolve_images(images)
+
+        cmd_args = [
+            "publish",
+            title,
+            content,
+        ]
+        
+        if topics:
+            cmd_args.extend(["--topics", ",".join(topics)])
+        if location:
+            cmd_args.extend(["--location", location])
+        if image_paths:
+            cmd_args.extend(["--images", ",".join(image_paths)])
+        if videos:
+            cmd_args.extend(["--videos", ",".join(videos)])
+            
+        return cmd_args
+
     def publish_note(self,
                      title: str,
                      content: str,
@@ -17,6 +17,7 @@ from typing import Dict, List, Optional
 from src.core.config import XHSConfig
 from src.core.browser import ChromeDriverManager
 from src.auth.cookie_manager import CookieManager
+from src.data.storage_manager import get_storage_manager
 # 数据收集函数会在需要时动态导入
 from src.utils.logger import get_logger
 from src.utils.text_utils import safe_print
@@ -215,7 +216,7 @@ class ManualTools:
         导出数据到指定格式
         
         Args:
-            format: 导出格式 (excel/json)
+            format: 导出格式 (excel/json/parquet)
             output_dir: 输出目录
             
         Returns:
@@ -224,10 +225,21 @@ class ManualTools:
         safe_print(f"📤 导出数据为{format}格式")
         
         try:
-            # 确定数据目录
-            data_dir = Path(self.config.data_path) / "creator_db"
-            if not data_dir.exists():
-                safe_print("❌ 未找到数据文件，请先收集数据")
+            if format not in ("excel", "json", "parquet"):
+                safe_print(f"❌ 不支持的格式: {format}")
+                safe_print("💡 支持的格式: excel, json, parquet")
+                return False
+            
+            # 读取各类数据
+            storage = get_storage_manager()
+            frames = {}
+            for name, data_type in (("Dashboard", "dashboard"), ("Content", "content_analysis"), ("Fans", "fans")):
+                df = storage.read_dataframe(data_type)
+                if not df.empty:
+                    frames[name] = df
+            
+            if not frames:
+                safe_print("❌ 没有找到可导出的数据，请先收集数据")
                 return False
             
             # 确定输出目录
@@ -241,63 +253,33 @@ class ManualTools:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
             if format == "excel":
-                # 创建Excel文件
+                # 创建Excel文件，表头使用中文
                 excel_file = output_path / f"xhs_data_{timestamp}.xlsx"
+                chinese_mapping = storage.get_csv_storage().field_chinese_mapping
                 with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
-                    # 导出各类数据
-                    data_files = {
-                        "Dashboard": data_dir / "dashboard_data.csv",
-                        "Content": data_dir / "content_analysis_data.csv",
-                        "Fans": data_dir / "fans_data.csv"
-                    }
-                    
-                    exported_sheets = []
-                    for sheet_name, csv_file in data_files.items():
-                        if csv_file.exists():
-                            df = pd.read_csv(csv_file)
-                            df.to_excel(writer, sheet_name=sheet_name, index=False)
-                            exported_sheets.append(sheet_name)
-                            safe_print(f"  ✅ 导出{sheet_name}数据")
-                    
-                    if exported_sheets:
-                        safe_print(f"\n✅ 数据已导出到: {excel_file}")
-                        return True
-                    else:
-                        safe_print("❌ 没有找到可导出的数据")
-                        return False
-            
-            elif format == "json":
-                # 导出为JSON格式
-                json_dir = output_path / f"xhs_data_{timestamp}"
-                json_dir.mkdir(exist_ok=True)
-                
-                data_files = {
-                    "dashboard": data_dir / "dashboard_data.csv",
-                    "content": data_dir / "content_analysis_data.csv",
-                    "fans": data_dir / "fans_data.csv"
-                }
-                
-                exported_files = []
-                for name, csv_file in data_files.items():
-                    if csv_file.exists():
-                        df = pd.read_csv(csv_file)
-                        json_file = json_dir / f"{name}.json"
-                        df.to_json(json_file, orient='records', force_ascii=False, indent=2)
-                        exported_files.append(name)
-                        safe_print(f"  ✅ 导出{name}数据")
-                
-                if exported_files:
-                    safe_print(f"\n✅ 数据已导出到: {json_dir}")
-                    return True
+                    for sheet_name, df in frames.items():
+                        df.rename(columns=chinese_mapping).to_excel(writer, sheet_name=sheet_name, index=False)
+                        safe_print(f"  ✅ 导出{sheet_name}数据")
+                safe_print(f"\n✅ 数据已导出到: {excel_file}")
+                return True
+            
+            # JSON / Parquet 每类数据一个文件
+            export_dir = output_path / f"xhs_data_{timestamp}"
+            export_dir.mkdir(exist_ok=True)
+            for name, df in frames.items():
+                if format == "json":
+                    df.to_json(export_dir / f"{name.lower()}.json", orient='records',
+                               force_ascii=False, indent=2, date_format='iso')
                 else:
-                    safe_print("❌ 没有找到可导出的数据")
-                    return False
+                    df.to_parquet(export_dir / f"{name.lower()}.parquet", index=False)
+                safe_print(f"  ✅ 导出{name}数据")
             
-            else:
-                safe_print(f"❌ 不支持的格式: {format}")
-                safe_print("💡 支持的格式: excel, json")
-                return False
+            safe_print(f"\n✅ 数据已导出到: {export_dir}")
+            return True
                 
+        except ImportError as e:
+            safe_print(f"❌ 导出{format}格式缺少依赖（excel需要openpyxl，parquet需要pyarrow）: {e}")
+            return False
         except Exception as e:
             safe_print(f"❌ 导出数据失败: {e}")
             logger.exception("导出数据异常")
@@ -312,59 +294,62 @@ class ManualTools:
         """
         safe_print("📈 分析数据趋势")
         
+        def to_int(series):
+            return pd.to_numeric(series, errors='coerce').fillna(0).astype(int)
+        
         try:
-            # 读取数据
-            data_dir = Path(self.config.data_path) / "creator_db"
+            # 只读取分析用到的列
+            storage = get_storage_manager()
             
             # Dashboard数据分析
-            dashboard_file = data_dir / "dashboard_data.csv"
-            if dashboard_file.exists():
+            df = storage.read_dataframe(
+                "dashboard", columns=["created_at", "dimension", "views", "likes", "interactions"]
+            )
+            if not df.empty:
                 safe_print("\n📊 Dashboard数据分析:")
-                df = pd.read_csv(dashboard_file)
-                if not df.empty:
-                    latest = df.iloc[-1]
-                    safe_print(f"  最新数据时间: {latest['采集时间']}")
-                    safe_print(f"  时间维度: {latest['时间维度']}")
-                    safe_print(f"  总浏览量: {latest['浏览']}")
-                    safe_print(f"  总点赞量: {latest['点赞']}")
-                    safe_print(f"  互动率: {latest['互动']}")
-                    
-                    # 计算趋势
-                    if len(df) > 1:
-                        prev = df.iloc[-2]
-                        view_change = int(latest['浏览']) - int(prev['浏览'])
-                        like_change = int(latest['点赞']) - int(prev['点赞'])
-                        safe_print(f"  浏览量变化: {'+' if view_change >= 0 else ''}{view_change}")
-                        safe_print(f"  点赞量变化: {'+' if like_change >= 0 else ''}{like_change}")
+                views, likes = to_int(df['views']), to_int(df['likes'])
+                latest = df.iloc[-1]
+                safe_print(f"  最新数据时间: {latest['created_at']}")
+                safe_print(f"  时间维度: {latest['dimension']}")
+                safe_print(f"  总浏览量: {views.iloc[-1]}")
+                safe_print(f"  总点赞量: {likes.iloc[-1]}")
+                safe_print(f"  互动数: {latest['interactions']}")
+                
+                # 计算趋势
+                if len(df) > 1:
+                    view_change = views.iloc[-1] - views.iloc[-2]
+                    like_change = likes.iloc[-1] - likes.iloc[-2]
+                    safe_print(f"  浏览量变化: {'+' if view_change >= 0 else ''}{view_change}")
+                    safe_print(f"  点赞量变化: {'+' if like_change >= 0 else ''}{like_change}")
             
             # 粉丝数据分析
-            fans_file = data_dir / "fans_data.csv"
-            if fans_file.exists():
+            df = storage.read_dataframe("fans", columns=["total_fans", "new_fans", "lost_fans"])
+            if not df.empty:
                 safe_print("\n👥 粉丝数据分析:")
-                df = pd.read_csv(fans_file)
-                if not df.empty:
-                    latest = df.iloc[-1]
-                    safe_print(f"  总粉丝数: {latest['总粉丝数']}")
-                    safe_print(f"  新增粉丝: {latest['新增粉丝']}")
-                    safe_print(f"  流失粉丝: {latest['流失粉丝']}")
-                    safe_print(f"  净增长: {int(latest['新增粉丝']) - int(latest['流失粉丝'])}")
-            
-            # 内容数据分析
-            content_file = data_dir / "content_analysis_data.csv"
-            if content_file.exists():
+                latest = df.iloc[-1]
+                new_fans, lost_fans = to_int(df['new_fans']).iloc[-1], to_int(df['lost_fans']).iloc[-1]
+                safe_print(f"  总粉丝数: {latest['total_fans']}")
+                safe_print(f"  新增粉丝: {new_fans}")
+                safe_print(f"  流失粉丝: {lost_fans}")
+                safe_print(f"  净增长: {new_fans - lost_fans}")
+            
+            # 内容数据分析，每次采集保存全部笔记，只统计最近一次采集的数据
+            df = storage.read_dataframe("content_analysis", columns=["created_at", "title", "views", "likes"])
+            if not df.empty:
+                latest_date = str(df['created_at'].iloc[-1])[:10]
+                df = df[df['created_at'].astype(str).str[:10] == latest_date]
+                views, likes = to_int(df['views']), to_int(df['likes'])
                 safe_print("\n📝 内容数据分析:")
-                df = pd.read_csv(content_file)
-                if not df.empty:
-                    safe_print(f"  总笔记数: {len(df)}")
-                    safe_print(f"  平均浏览量: {df['浏览'].astype(int).mean():.0f}")
-                    safe_print(f"  平均点赞量: {df['点赞'].astype(int).mean():.0f}")
-                    
-                    # 找出表现最好的笔记
-                    best_note = df.loc[df['浏览'].astype(int).idxmax()]
-                    safe_print(f"\n  🏆 表现最佳笔记:")
-                    safe_print(f"    标题: {best_note['标题']}")
-                    safe_print(f"    浏览: {best_note['浏览']}")
-                    safe_print(f"    点赞: {best_note['点赞']}")
+                safe_print(f"  总笔记数: {len(df)}")
+                safe_print(f"  平均浏览量: {views.mean():.0f}")
+                safe_print(f"  平均点赞量: {likes.mean():.0f}")
+                
+                # 找出表现最好的笔记
+                best = views.idxmax()
+                safe_print(f"\n  🏆 表现最佳笔记:")
+                safe_print(f"    标题: {df.at[best, 'title']}")
+                safe_print(f"    浏览: {views[best]}")
+                safe_print(f"    点赞: {likes[best]}")
             
             return True
             
@@ -16,6 +16,7 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from ..core.config import XHSConfig
 from ..core.browser import ChromeDriverManager
+from ..core.driver_pool import DriverPool
 from ..core.exceptions import PublishError, NetworkError, handle_exception
 from ..auth.cookie_manager import CookieManager
 from ..utils.text_utils import clean_text_for_browser, truncate_text
@@ -29,18 +30,20 @@ logger = get_logger(__name__)
 class XHSClient:
     """小红书客户端类"""
     
-    def __init__(self, config: XHSConfig):
+    def __init__(self, config: XHSConfig, driver_pool: Optional[DriverPool] = None):
         """
         初始化小红书客户端
         
         Args:
             config: 配置管理器实例
+            driver_pool: 浏览器会话池，指定时发布从池中租用已登录的会话，否则每次发布启动新的浏览器
         """
         self.config = config
         self.browser_manager = ChromeDriverManager(config)
         self.cookie_manager = CookieManager(config)
         self.session = requests.Session()
         self.content_filler = None  # 延迟初始化，需要browser_manager运行时才能创建
+        self.driver_pool = driver_pool
         self._setup_session()
     
     def _setup_session(self) -> None:
@@ -74,21 +77,17 @@ class XHSClient:
         """
         logger.info(f"📝 开始发布小红书笔记: {note.title}")
         
+        success = False
         try:
-            # 创建浏览器驱动
-            driver = self.browser_manager.create_driver()
-            
-            # 导航到创作者中心
-            self.browser_manager.navigate_to_creator_center()
-            
-            # 加载cookies
-            cookies = self.cookie_manager.load_cookies()
-            cookie_result = self.browser_manager.load_cookies(cookies)
-            
-            logger.info(f"🍪 Cookies加载结果: {cookie_result}")
+            if self.driver_pool is not None:
+                self._lease_session()
+            else:
+                self._start_session()
             
             # 访问发布页面
-            return await self._publish_note_process(note)
+            result = await self._publish_note_process(note)
+            success = True
+            return result
             
         except Exception as e:
             if isinstance(e, PublishError):
@@ -96,8 +95,42 @@ class XHSClient:
             else:
                 raise PublishError(f"发布笔记过程出错: {str(e)}", publish_step="初始化") from e
         finally:
-            # 确保浏览器被关闭
-            self.browser_manager.close_driver()
+            # 会话归还会话池，发布失败时丢弃，失败后的页面状态不可复用；未使用会话池时关闭浏览器
+            if self.driver_pool is not None:
+                self._return_session(discard=not success)
+            else:
+                self.close_session()
+    
+    def _start_session(self) -> None:
+        """启动浏览器并登录创作者中心"""
+        # 创建浏览器驱动
+        self.browser_manager.create_driver()
+        
+        # 导航到创作者中心
+        self.browser_manager.navigate_to_creator_center()
+        
+        # 加载cookies
+        cookies = self.cookie_manager.load_cookies()
+        cookie_result = self.browser_manager.load_cookies(cookies)
+        
+        logger.info(f"🍪 Cookies加载结果: {cookie_result}")
+    
+    def _lease_session(self) -> None:
+        """从会话池租用已登录的浏览器会话"""
+        self.browser_manager.driver = self.driver_pool.acquire(self.config)
+        self.browser_manager.is_initialized = True
+    
+    def _return_session(self, discard: bool = False) -> None:
+        """将浏览器会话归还会话池"""
+        driver = self.browser_manager.driver
+        self.browser_manager.driver = None
+        self.browser_manager.is_initialized = False
+        if driver is not None:
+            self.driver_pool.release(driver, discard=discard)
+    
+    def close_session(self) -> None:
+        """关闭浏览器会话"""
+        self.browser_manager.close_driver()
     
     async def _publish_note_process(self, note: XHSNote) -> XHSPublishResult:
         """执行发布笔记的具体流程"""
@@ -437,6 +470,8 @@ class XHSClient:
     async def _submit_note(self, note: XHSNote) -> XHSPublishResult:
         """提交发布笔记"""
         driver = self.browser_manager.driver
+        # 开始点击发布按钮后出错时，笔记可能已经发布
+        clicking = False
         
         try:
             logger.info("🚀 点击发布按钮...")
@@ -467,6 +502,7 @@ class XHSClient:
             if not submit_btn:
                 raise PublishError("无法找到发布按钮", publish_step="查找发布按钮")
             
+            clicking = True
             submit_btn.click()
             logger.info("✅ 发布按钮已点击")
             await asyncio.sleep(3)
@@ -481,8 +517,11 @@ class XHSClient:
                 final_url=current_url
             )
             
+        except PublishError:
+            raise
         except Exception as e:
-            raise PublishError(f"点击发布按钮失败: {str(e)}", publish_step="提交发布") from e
+            step = PublishError.SUBMIT_STEP if clicking else "查找发布按钮"
+            raise PublishError(f"点击发布按钮失败: {str(e)}", publish_step=step) from e
 
     @handle_exception
     async def upload_files_only(self, note: XHSNote) -> dict:
@@ -7,18 +7,22 @@
 3. 观众分析数据：性别分布、年龄分布、城市分布、兴趣分布
 """
 
+import os
+import re
 import time
+import asyncio
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 
 from .utils import (
-    clean_number, wait_for_element, extract_text_safely, 
-    find_element_by_selectors, wait_for_page_load, safe_click, scroll_to_element
+    clean_number, extract_text_safely, 
+    find_element_by_selectors, safe_click, scroll_to_element,
+    wait_until_async
 )
 from src.utils.logger import get_logger
 from src.data.storage_manager import get_storage_manager
@@ -43,6 +47,52 @@ CONTENT_ANALYSIS_SELECTORS = {
     'percentage_elements': '//*[contains(text(), "%")]'
 }
 
+CONTENT_ANALYSIS_URL = "https://creator.xiaohongshu.com/statistics/data-analysis"
+
+# 笔记详情页地址模板，tabs 模式下直接打开详情页
+NOTE_DETAIL_URL = os.getenv(
+    "CONTENT_ANALYSIS_DETAIL_URL",
+    "https://creator.xiaohongshu.com/statistics/note-detail?noteId={note_id}"
+)
+
+# 从笔记行HTML中识别笔记ID
+NOTE_ID_PATTERNS = [
+    re.compile(r'noteId=([0-9a-zA-Z]+)'),
+    re.compile(r'data-note-id="([0-9a-zA-Z]+)"'),
+    re.compile(r'/(?:explore|discovery/item)/([0-9a-f]{24})'),
+]
+
+# 详情数据采集模式：
+#   click - 在列表页逐篇点击详情按钮，采集后返回列表（默认）
+#   tabs  - 在多个标签页中并行打开详情页，无法确定详情页地址的笔记仍按 click 采集；
+#           依赖 CONTENT_ANALYSIS_DETAIL_URL 详情页地址，需显式开启
+DETAIL_MODES = ("click", "tabs")
+
+# 等待时间配置（秒），通过 CONTENT_ANALYSIS_TIMING 环境变量选择，默认 normal
+#   *_timeout    - 显式等待的最长时间，条件满足后立即继续
+#   settle_delay - 滚动、点击前的短暂停顿，避免操作过快
+#   poll_interval - 检查等待条件的间隔
+TIMING_PROFILES = {
+    "fast": {
+        "page_timeout": 20, "table_timeout": 10, "detail_timeout": 6,
+        "section_timeout": 2, "return_timeout": 6, "settle_delay": 0, "poll_interval": 0.1
+    },
+    "normal": {
+        "page_timeout": 30, "table_timeout": 20, "detail_timeout": 10,
+        "section_timeout": 3, "return_timeout": 10, "settle_delay": 0.3, "poll_interval": 0.2
+    },
+    "safe": {
+        "page_timeout": 30, "table_timeout": 30, "detail_timeout": 15,
+        "section_timeout": 5, "return_timeout": 15, "settle_delay": 1, "poll_interval": 0.5
+    },
+}
+
+# 表头行关键词，用于过滤表头
+HEADER_KEYWORDS = ['笔记基础信息', '观看', '点赞', '评论', '收藏', '涨粉', '分享', '操作']
+
+# 观众来源对应的上下文关键词
+SOURCE_KEYWORDS = ['推荐', '首页', '搜索', '关注', '个人主页', '其他']
+
 # 表格列索引映射（基于Playwright测试结果）
 COLUMN_MAPPING = {
     0: 'title',           # 笔记标题
@@ -59,8 +109,28 @@ COLUMN_MAPPING = {
 }
 
 
+def get_timing_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    获取等待时间配置
+    
+    Args:
+        name: 配置名称（fast/normal/safe），默认读取 CONTENT_ANALYSIS_TIMING 环境变量
+        
+    Returns:
+        等待时间配置字典，包含 name 字段
+    """
+    name = (name or os.getenv("CONTENT_ANALYSIS_TIMING", "normal")).lower()
+    if name not in TIMING_PROFILES:
+        logger.warning(f"⚠️ 未知的等待配置 {name}，使用 normal")
+        name = "normal"
+    return {"name": name, **TIMING_PROFILES[name]}
+
+
 async def collect_content_analysis_data(driver: WebDriver, date: Optional[str] = None, 
-                                 limit: int = 50, save_data: bool = True) -> Dict[str, Any]:
+                                 limit: int = 50, save_data: bool = True,
+                                 timing: Optional[str] = None,
+                                 detail_mode: Optional[str] = None,
+                                 detail_concurrency: Optional[int] = None) -> Dict[str, Any]:
     """
     采集内容分析数据
     
@@ -69,25 +139,32 @@ async def collect_content_analysis_data(driver: WebDriver, date: Optional[str] =
         date: 采集日期，默认当天
         limit: 最大采集笔记数量
         save_data: 是否保存数据到存储
+        timing: 等待时间配置名称，见 TIMING_PROFILES
+        detail_mode: 详情数据采集模式，见 DETAIL_MODES，默认读取 CONTENT_ANALYSIS_DETAIL_MODE 环境变量
+        detail_concurrency: tabs 模式下同时打开的详情页数量
         
     Returns:
         包含内容分析数据的字典
     """
     logger.info("📊 开始采集内容分析数据...")
+    profile = get_timing_profile(timing)
+    detail_mode = (detail_mode or os.getenv("CONTENT_ANALYSIS_DETAIL_MODE", "click")).lower()
+    if detail_mode not in DETAIL_MODES:
+        logger.warning(f"⚠️ 未知的详情采集模式 {detail_mode}，使用 click")
+        detail_mode = "click"
+    if detail_concurrency is None:
+        detail_concurrency = int(os.getenv("CONTENT_ANALYSIS_DETAIL_CONCURRENCY", "4"))
+    started = time.monotonic()
     
     # 导航到内容分析页面
-    content_url = "https://creator.xiaohongshu.com/statistics/data-analysis"
     try:
-        driver.get(content_url)
-        logger.info(f"📍 访问内容分析页面: {content_url}")
+        driver.get(CONTENT_ANALYSIS_URL)
+        logger.info(f"📍 访问内容分析页面: {CONTENT_ANALYSIS_URL}")
         
         # 等待页面加载
-        if not wait_for_page_load(driver, timeout=30):
+        if not await wait_until_async(driver, _page_loaded, profile["page_timeout"], profile["poll_interval"]):
             logger.warning("⚠️ 页面加载超时，继续尝试采集")
         
-        # 增加等待时间，确保数据完全加载
-        time.sleep(10)  # 从5秒增加到10秒
-        
     except Exception as e:
         logger.error(f"❌ 访问内容分析页面失败: {e}")
         return {"success": False, "error": str(e)}
@@ -102,17 +179,15 @@ async def collect_content_analysis_data(driver: WebDriver, date: Optional[str] =
     }
     
     try:
-        # 等待表格加载 - 使用更长的等待时间
-        table_element = None
-        table_selectors = CONTENT_ANALYSIS_SELECTORS['note_table']
-        
-        for selector in table_selectors:
-            table_element = wait_for_element(driver, selector, timeout=20)  # 从15秒增加到20秒
-            if table_element:
-                logger.info(f"✅ 找到数据表格，使用选择器: {selector}")
-                break
-        
-        if not table_element:
+        # 等待表格和数据行渲染完成
+        table_element = await wait_until_async(
+            driver, _find_loaded_table, profile["table_timeout"], profile["poll_interval"]
+        )
+        page_ready = time.monotonic()
+        
+        if table_element:
+            logger.info(f"✅ 数据表格已加载，耗时 {page_ready - started:.1f} 秒")
+        else:
             logger.warning("⚠️ 未找到数据表格，尝试直接查找笔记行")
             # 尝试直接查找笔记行
             note_rows = driver.find_elements(By.CSS_SELECTOR, '.el-table__row')
@@ -126,16 +201,29 @@ async def collect_content_analysis_data(driver: WebDriver, date: Optional[str] =
         
         # 采集笔记列表数据
         notes_data = _collect_notes_list_data(driver, limit)
+        list_done = time.monotonic()
         
         # 为每篇笔记采集详细数据
-        enhanced_notes_data = _enhance_notes_with_detail_data(driver, notes_data)
+        enhanced_notes_data = await _enhance_notes_with_detail_data(
+            driver, notes_data, profile, detail_mode, detail_concurrency
+        )
+        detail_done = time.monotonic()
         
         content_data["notes"] = enhanced_notes_data
         
         # 生成汇总信息
         content_data["summary"] = _generate_summary(enhanced_notes_data)
         
-        logger.info(f"✅ 内容分析数据采集完成，共采集 {len(enhanced_notes_data)} 篇笔记")
+        content_data["timing"] = {
+            "profile": profile["name"],
+            "detail_mode": detail_mode,
+            "page_seconds": round(page_ready - started, 2),
+            "list_seconds": round(list_done - page_ready, 2),
+            "detail_seconds": round(detail_done - list_done, 2),
+            "total_seconds": round(detail_done - started, 2)
+        }
+        logger.info(f"✅ 内容分析数据采集完成，共采集 {len(enhanced_notes_data)} 篇笔记，"
+                    f"耗时 {content_data['timing']['total_seconds']} 秒")
         
         # 保存数据到存储
         if save_data and enhanced_notes_data:
@@ -156,39 +244,57 @@ async def collect_content_analysis_data(driver: WebDriver, date: Optional[str] =
     return content_data
 
 
+def _page_loaded(driver: WebDriver) -> bool:
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def _find_loaded_table(driver: WebDriver):
+    """查找已渲染出数据行的笔记表格，未找到返回None（用作等待条件）"""
+    for selector in CONTENT_ANALYSIS_SELECTORS['note_table']:
+        try:
+            for table in driver.find_elements(By.CSS_SELECTOR, selector):
+                # 除表头外至少有一行数据
+                if table.find_elements(By.CSS_SELECTOR, '.el-table__row') or \
+                        len(table.find_elements(By.CSS_SELECTOR, 'tr')) > 1:
+                    return table
+        except StaleElementReferenceException:
+            continue
+    return None
+
+
+def _find_note_rows(driver: WebDriver) -> List[Any]:
+    """查找笔记数据行，已过滤表头和空行"""
+    note_rows = []
+    for selector in CONTENT_ANALYSIS_SELECTORS['note_rows']:
+        note_rows = driver.find_elements(By.CSS_SELECTOR, selector)
+        if note_rows:
+            logger.debug(f"🔍 使用选择器 {selector} 找到 {len(note_rows)} 行笔记数据")
+            break
+    
+    # 过滤掉表头行 - 跳过包含"笔记基础信息"、"观看"、"点赞"等表头关键词的行
+    filtered_rows = []
+    for row in note_rows:
+        try:
+            row_text = row.text.strip()
+            # 检查是否为表头行
+            is_header = any(keyword in row_text for keyword in HEADER_KEYWORDS)
+            if not is_header and row_text:  # 不是表头且有内容
+                filtered_rows.append(row)
+        except:
+            continue
+    return filtered_rows
+
+
 def _collect_notes_list_data(driver: WebDriver, limit: int) -> List[Dict[str, Any]]:
     """采集笔记列表数据（基于Playwright测试结果）"""
     notes_data = []
     
     try:
-        # 使用更新的选择器查找所有笔记行
-        note_rows = []
-        row_selectors = CONTENT_ANALYSIS_SELECTORS['note_rows']
-        
-        for selector in row_selectors:
-            note_rows = driver.find_elements(By.CSS_SELECTOR, selector)
-            if note_rows:
-                logger.info(f"🔍 使用选择器 {selector} 找到 {len(note_rows)} 行笔记数据")
-                break
-        
-        if not note_rows:
+        filtered_rows = _find_note_rows(driver)
+        if not filtered_rows:
             logger.warning("⚠️ 未找到任何笔记行")
             return notes_data
         
-        # 过滤掉表头行 - 跳过包含"笔记基础信息"、"观看"、"点赞"等表头关键词的行
-        header_keywords = ['笔记基础信息', '观看', '点赞', '评论', '收藏', '涨粉', '分享', '操作']
-        filtered_rows = []
-        
-        for row in note_rows:
-            try:
-                row_text = row.text.strip()
-                # 检查是否为表头行
-                is_header = any(keyword in row_text for keyword in header_keywords)
-                if not is_header and row_text:  # 不是表头且有内容
-                    filtered_rows.append(row)
-            except:
-                continue
-        
         logger.info(f"📋 过滤后剩余 {len(filtered_rows)} 行有效数据")
         
         for i, row in enumerate(filtered_rows[:limit]):
@@ -230,6 +336,11 @@ def _extract_note_data_from_row(row, row_index: int) -> Optional[Dict[str, Any]]
             "extract_time": datetime.now().isoformat()
         }
         
+        note_id = _extract_note_id(row)
+        if note_id:
+            note_data['note_id'] = note_id
+            note_data['detail_url'] = NOTE_DETAIL_URL.format(note_id=note_id)
+        
         # 按列索引提取数据
         for col_index, cell in enumerate(cells):
             try:
@@ -299,38 +410,95 @@ def _extract_note_data_from_row(row, row_index: int) -> Optional[Dict[str, Any]]
         return None
 
 
-def _enhance_notes_with_detail_data(driver: WebDriver, notes_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """为每篇笔记采集详细数据"""
-    enhanced_notes = []
+def _extract_note_id(row) -> Optional[str]:
+    """从笔记行的链接或数据属性中识别笔记ID"""
+    try:
+        html = row.get_attribute('outerHTML') or ""
+    except Exception:
+        return None
+    for pattern in NOTE_ID_PATTERNS:
+        match = pattern.search(html)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _find_detail_button(driver: WebDriver, note: Dict[str, Any]):
+    """获取笔记的详情按钮，返回列表页后原元素失效时按行号重新定位"""
+    detail_button = note['detail_button_element']
+    try:
+        detail_button.is_enabled()
+        return detail_button
+    except StaleElementReferenceException:
+        rows = _find_note_rows(driver)
+        row_index = note.get('row_index', -1)
+        if 0 <= row_index < len(rows):
+            buttons = rows[row_index].find_elements(By.CSS_SELECTOR, CONTENT_ANALYSIS_SELECTORS['detail_button'])
+            if buttons:
+                note['detail_button_element'] = buttons[0]
+                return buttons[0]
+        raise
+
+
+def _detail_panel_ready(driver: WebDriver) -> bool:
+    """详情页的观众来源数据已渲染（用作等待条件）"""
+    try:
+        for elem in driver.find_elements(By.XPATH, "//*[contains(text(), '%')]"):
+            text = elem.text.strip()
+            if text.replace('%', '').replace('.', '').isdigit():
+                context = elem.find_element(By.XPATH, "..").text
+                if any(keyword in context for keyword in SOURCE_KEYWORDS):
+                    return True
+    except (StaleElementReferenceException, NoSuchElementException):
+        pass
+    return False
+
+
+async def _enhance_notes_with_detail_data(driver: WebDriver, notes_data: List[Dict[str, Any]],
+                                          profile: Dict[str, Any], mode: str = "click",
+                                          concurrency: int = 4) -> List[Dict[str, Any]]:
+    """为每篇笔记采集详细数据，结果按原顺序返回"""
+    details: Dict[int, Dict[str, Any]] = {}
+    if mode == "tabs":
+        tab_notes = [(i, note) for i, note in enumerate(notes_data) if note.get('detail_url')]
+        if tab_notes:
+            details = await _collect_details_in_tabs(driver, tab_notes, profile, concurrency)
+        logger.info(f"🗂️ 标签页并行采集 {len(details)}/{len(notes_data)} 篇笔记详情，其余逐篇点击采集")
     
+    enhanced_notes = []
     for i, note in enumerate(notes_data):
+        if i in details:
+            enhanced_notes.append({**note, **details[i]})
+            continue
         try:
             logger.info(f"📊 采集笔记 {i+1}/{len(notes_data)} 的详细数据: {note.get('title', 'Unknown')}")
             
             # 点击详情数据按钮
             if note.get('has_detail_button') and note.get('detail_button_element'):
-                detail_button = note['detail_button_element']
+                detail_button = _find_detail_button(driver, note)
                 
                 # 滚动到按钮可见
                 driver.execute_script("arguments[0].scrollIntoView(true);", detail_button)
-                time.sleep(1)
+                await asyncio.sleep(profile["settle_delay"])
                 
                 # 点击详情按钮
                 detail_button.click()
                 logger.info(f"✅ 成功点击详情数据按钮")
                 
-                # 等待详情页面加载
-                time.sleep(3)
+                # 等待详情数据渲染
+                if not await wait_until_async(driver, _detail_panel_ready,
+                                              profile["detail_timeout"], profile["poll_interval"]):
+                    logger.warning("⚠️ 等待详情数据超时，继续采集已加载的内容")
                 
                 # 采集详情页面数据
-                detail_data = _collect_detail_page_data(driver)
+                detail_data = await _collect_detail_page_data(driver, profile)
                 
                 # 合并数据
                 enhanced_note = {**note, **detail_data}
                 enhanced_notes.append(enhanced_note)
                 
                 # 返回列表页面
-                _return_to_list_page(driver)
+                await _return_to_list_page(driver, profile)
                 
             else:
                 logger.warning(f"⚠️ 笔记 {note.get('title')} 没有详情按钮")
@@ -342,14 +510,74 @@ def _enhance_notes_with_detail_data(driver: WebDriver, notes_data: List[Dict[str
             
             # 尝试返回列表页面
             try:
-                _return_to_list_page(driver)
+                await _return_to_list_page(driver, profile)
             except:
                 pass
     
     return enhanced_notes
 
 
-def _collect_detail_page_data(driver: WebDriver) -> Dict[str, Any]:
+async def _collect_details_in_tabs(driver: WebDriver, indexed_notes: List[tuple],
+                                  profile: Dict[str, Any], concurrency: int) -> Dict[int, Dict[str, Any]]:
+    """
+    在多个标签页中并行加载笔记详情页并采集数据
+    
+    每批同时打开 concurrency 个标签页，页面在后台并行加载，再依次切换采集。
+    第一批全部失败时（如详情页地址不可用）停止，剩余笔记交给点击模式。
+    
+    Args:
+        driver: WebDriver实例，当前窗口为列表页
+        indexed_notes: (笔记序号, 笔记数据) 列表，笔记数据需包含 detail_url
+        profile: 等待时间配置
+        concurrency: 同时打开的标签页数量
+        
+    Returns:
+        笔记序号到详情数据的映射，只包含采集成功的笔记
+    """
+    concurrency = max(1, concurrency)
+    list_handle = driver.current_window_handle
+    details: Dict[int, Dict[str, Any]] = {}
+    
+    for start in range(0, len(indexed_notes), concurrency):
+        batch = indexed_notes[start:start + concurrency]
+        
+        # 先打开整批标签页，导航不等待页面加载完成
+        tabs = []
+        for index, note in batch:
+            try:
+                driver.switch_to.new_window('tab')
+                driver.execute_script("window.location.href = arguments[0];", note['detail_url'])
+                tabs.append((index, note, driver.current_window_handle))
+            except Exception as e:
+                logger.warning(f"⚠️ 打开详情页标签失败 ({note.get('title')}): {e}")
+        
+        batch_success = 0
+        for index, note, handle in tabs:
+            try:
+                driver.switch_to.window(handle)
+                if await wait_until_async(driver, _detail_panel_ready,
+                                          profile["detail_timeout"], profile["poll_interval"]):
+                    details[index] = await _collect_detail_page_data(driver, profile)
+                    batch_success += 1
+                else:
+                    logger.warning(f"⚠️ 详情页数据未加载: {note.get('title')}")
+            except Exception as e:
+                logger.warning(f"⚠️ 标签页采集详情失败 ({note.get('title')}): {e}")
+            finally:
+                try:
+                    driver.close()
+                except Exception:
+                    pass
+        driver.switch_to.window(list_handle)
+        
+        if start == 0 and batch_success == 0:
+            logger.warning("⚠️ 首批详情页均未加载成功，改为逐篇点击采集")
+            break
+    
+    return details
+
+
+async def _collect_detail_page_data(driver: WebDriver, profile: Dict[str, Any]) -> Dict[str, Any]:
     """采集详情页面数据"""
     detail_data = {
         # 观众来源数据
@@ -373,15 +601,12 @@ def _collect_detail_page_data(driver: WebDriver) -> Dict[str, Any]:
     }
     
     try:
-        # 等待页面加载
-        time.sleep(3)
-        
         # 采集观众来源数据
         source_data = _collect_audience_source_data(driver)
         detail_data.update(source_data)
         
         # 采集观众分析数据
-        analysis_data = _collect_audience_analysis_data(driver)
+        analysis_data = await _collect_audience_analysis_data(driver, profile)
         detail_data.update(analysis_data)
         
         logger.info("✅ 详情页面数据采集完成")
@@ -434,7 +659,16 @@ def _collect_audience_source_data(driver: WebDriver) -> Dict[str, Any]:
     return source_data
 
 
-def _collect_audience_analysis_data(driver: WebDriver) -> Dict[str, Any]:
+def _gender_data_ready(driver: WebDriver) -> bool:
+    """观众性别分布已渲染（用作等待条件）"""
+    try:
+        return any("%" in elem.text for elem in driver.find_elements(
+            By.XPATH, "//*[contains(text(), '男性') or contains(text(), '女性')]"))
+    except StaleElementReferenceException:
+        return False
+
+
+async def _collect_audience_analysis_data(driver: WebDriver, profile: Dict[str, Any]) -> Dict[str, Any]:
     """采集观众分析数据"""
     analysis_data = {
         "gender_male": "0%",
@@ -454,7 +688,7 @@ def _collect_audience_analysis_data(driver: WebDriver) -> Dict[str, Any]:
     try:
         # 滚动页面查找观众分析区域
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
+        await wait_until_async(driver, _gender_data_ready, profile["section_timeout"], profile["poll_interval"])
         
         # 查找性别分布
         gender_elements = driver.find_elements(By.XPATH, "//*[contains(text(), '男性') or contains(text(), '女性')]")
@@ -520,22 +754,26 @@ def _collect_audience_analysis_data(driver: WebDriver) -> Dict[str, Any]:
     return analysis_data
 
 
-def _return_to_list_page(driver: WebDriver) -> None:
+def _list_page_ready(driver: WebDriver):
+    """已回到列表页且表格数据已渲染（用作等待条件）"""
+    return "data-analysis" in driver.current_url and _find_loaded_table(driver)
+
+
+async def _return_to_list_page(driver: WebDriver, profile: Dict[str, Any]) -> None:
     """返回到列表页面"""
     try:
         # 尝试多种返回方法
         # 方法1：浏览器后退
         driver.back()
-        time.sleep(3)
         
         # 检查是否成功返回
-        if "data-analysis" in driver.current_url:
+        if await wait_until_async(driver, _list_page_ready, profile["return_timeout"], profile["poll_interval"]):
             logger.info("✅ 成功返回列表页面")
             return
         
         # 方法2：直接导航到列表页面
-        driver.get("https://creator.xiaohongshu.com/statistics/data-analysis")
-        time.sleep(3)
+        driver.get(CONTENT_ANALYSIS_URL)
+        await wait_until_async(driver, _list_page_ready, profile["page_timeout"], profile["poll_interval"])
         logger.info("✅ 重新导航到列表页面")
         
     except Exception as e:
@@ -557,6 +795,7 @@ def _format_notes_for_storage(notes_data: List[Dict[str, Any]]) -> List[Dict[str
             
             formatted_note = {
                 "timestamp": note.get("extract_time", datetime.now().isoformat()),
+                "note_id": note.get("note_id", ""),
                 "title": note.get("title", ""),
                 "note_type": "图文",  # 默认类型，后续可以根据内容判断
                 "publish_time": note.get("publish_time", ""),
@@ -6,7 +6,8 @@
 
 import time
 import re
-from typing import Optional, List, Any
+import asyncio
+from typing import Optional, List, Any, Callable
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -108,6 +109,27 @@ def wait_for_elements(driver: WebDriver, selector: str, timeout: int = 10,
         return []
 
 
+async def wait_until_async(driver: WebDriver, condition: Callable[[WebDriver], Any],
+                           timeout: float = 10, poll_frequency: float = 0.5) -> Any:
+    """
+    在线程中执行显式等待，条件满足后立即返回，不阻塞事件循环
+    
+    Args:
+        driver: WebDriver实例
+        condition: 等待条件，接收driver，返回真值表示满足
+        timeout: 超时时间（秒）
+        poll_frequency: 检查条件的间隔（秒）
+        
+    Returns:
+        条件的返回值，超时返回None
+    """
+    wait = WebDriverWait(driver, timeout, poll_frequency=poll_frequency)
+    try:
+        return await asyncio.to_thread(wait.until, condition)
+    except TimeoutException:
+        return None
+
+
 def extract_text_safely(element: WebElement) -> str:
     """
     安全地提取元素文本
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.ai_providers import AIProviderFactory, OllamaProvider
+
+
+def _config(base_url="http://localhost:11434/v1"):
+    return {
+        "services": [
+            {"name": "ollama", "type": "ollama", "base_url": base_url, "models": ["m1", "m2"]}
+        ]
+    }
+
+
+def test_provider_instances_are_reused():
+    AIProviderFactory.clear_registry()
+    first = AIProviderFactory.get_provider("ollama", _config())
+    second = AIProviderFactory.get_provider("ollama", _config())
+    assert isinstance(first, OllamaProvider)
+    assert first is second
+
+
+def test_changed_service_config_creates_new_provider():
+    AIProviderFactory.clear_registry()
+    first = AIProviderFactory.get_provider("ollama", _config())
+    second = AIProviderFactory.get_provider("ollama", _config("http://other:11434/v1"))
+    assert first is not second
+
+
+def test_ollama_clients_cached_per_model(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    provider = OllamaProvider(_config()["services"][0])
+    assert provider._get_client("m1") is provider._get_client("m1")
+    assert provider._get_client("m1") is not provider._get_client("m2")
+
+
+def test_load_config_returns_independent_copies():
+    config = AIProviderFactory.load_config()
+    config["services"].clear()
+    assert AIProviderFactory.load_config()["services"]
+
+
+def test_openai_compatible_provider_uses_ainvoke():
+    import asyncio
+    from unittest.mock import AsyncMock, MagicMock
+    from src.services.ai_providers import DeepSeekProvider
+
+    provider = DeepSeekProvider({
+        "name": "deepseek", "type": "deepseek", "base_url": "https://api.deepseek.com",
+        "models": ["deepseek-chat"], "api_key": "test"
+    })
+    provider.client = MagicMock()
+    provider.client.ainvoke = AsyncMock(return_value=MagicMock(content="你好"))
+
+    messages = [{"role": "user", "content": "hi"}]
+    assert asyncio.run(provider.agenerate_content(messages, "deepseek-chat")) == "你好"
+    provider.client.ainvoke.assert_awaited_once_with(messages, model="deepseek-chat")
+    provider.client.invoke.assert_not_called()
@@ -187,3 +187,54 @@ def test_analyze_hotspots():
     data = response.json()
     assert "report" in data
     assert isinstance(data["report"], str)
+
+class _FakeStreamingProvider:
+    async def astream_content(self, messages, model):
+        for chunk in ['"爆款', '标题 ✨"']:
+            yield chunk
+
+@patch('src.services.ai_providers.AIProviderFactory.get_provider', return_value=_FakeStreamingProvider())
+def test_stream_html_title(mock_get_provider):
+    """测试 /api/generate-html/title/stream 端点 (SSE)"""
+    response = client.post(
+        '/api/generate-html/title/stream',
+        json={'theme': '美食', 'style': '探店', 'audience': '吃货', 'use_cache': False}
+    )
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/event-stream')
+
+    events = [
+        json.loads(line[len('data:'):].strip())
+        for line in response.iter_lines() if line.startswith('data:')
+    ]
+    assert [e['content'] for e in events if e['type'] == 'chunk'] == ['"爆款', '标题 ✨"']
+    assert events[-1] == {'type': 'done', 'content': '爆款标题 ✨'}
+
+def test_html_to_image_batch_unique_output_names(tmp_path):
+    """测试 /api/html-to-image/batch 端点：不同目录下的同名HTML文件输出到不同图片"""
+    html_paths = []
+    for folder in ['a', 'b']:
+        html_file = tmp_path / folder / 'note.html'
+        html_file.parent.mkdir()
+        html_file.write_text(f'<p>{folder}</p>', encoding='utf-8')
+        html_paths.append(str(html_file))
+
+    async def fake_screenshot(html_path, output_path, **kwargs):
+        Path(output_path).write_text(html_path, encoding='utf-8')
+        return True
+
+    output_dir = tmp_path / 'images'
+    with patch('src.app.main.browser_pool.screenshot', side_effect=fake_screenshot):
+        response = client.post('/api/html-to-image/batch', json={
+            'html_paths': html_paths,
+            'output_dir': str(output_dir),
+            'use_cache': False
+        })
+    assert response.status_code == 200
+    data = response.json()
+    assert data['success'] and data['success_count'] == 2
+
+    output_paths = [Path(result['output_path']) for result in data['results']]
+    assert [p.name for p in output_paths] == ['note.png', 'note_2.png']
+    for html_path, output_path in zip(html_paths, output_paths):
+        assert output_path.read_text(encoding='utf-8') == html_path
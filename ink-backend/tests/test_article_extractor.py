@@ -0,0 +1,74 @@
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services import article_extractor
+from src.services.article_extractor import ArticleExtractor
+
+ARTICLE_HTML = """
+<html><head><title>热点新闻</title></head>
+<body><div><p>这是一段足够长的新闻正文内容，用于测试正文提取是否正常工作。</p>
+<p>第二段正文同样包含较多文字，帮助 readability 识别主要内容区域。</p></div></body></html>
+"""
+
+
+def test_extract_many_uses_etag_cache(monkeypatch):
+    parsed = []
+    conditional = []
+    parse_article = article_extractor.parse_article
+
+    def fake_parse(html):
+        parsed.append(html)
+        return parse_article(html)
+
+    monkeypatch.setattr(article_extractor, "parse_article", fake_parse)
+
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            conditional.append(request.url.path)
+            return httpx.Response(304)
+        return httpx.Response(200, text=ARTICLE_HTML, headers={"ETag": '"v1"'})
+
+    async def run():
+        extractor = ArticleExtractor(executor=ThreadPoolExecutor(2))
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            urls = ["https://news.example.com/1", "https://news.example.com/2", "ftp://invalid"]
+            first = await extractor.extract_many(client, urls)
+            second = await extractor.extract_many(client, urls)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert [r["url"] for r in first] == ["https://news.example.com/1", "https://news.example.com/2", "ftp://invalid"]
+    assert "热点新闻" in first[0]["content"] and "正文内容" in first[0]["content"]
+    assert first[2]["content"] == "无效或空的URL。"
+    assert second == first
+    assert len(parsed) == 2
+    assert sorted(conditional) == ["/1", "/2"]
+
+
+def test_request_error_returns_message():
+    def handler(request):
+        raise httpx.ConnectTimeout("timed out")
+
+    async def run():
+        extractor = ArticleExtractor(executor=ThreadPoolExecutor(1))
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await extractor.extract(client, "https://news.example.com/1")
+
+    assert asyncio.run(run()) == "获取内容失败：网络请求错误或超时。"
+
+
+def test_frozen_bundle_parses_in_threads(monkeypatch):
+    monkeypatch.setattr(sys, "frozen", True, raising=False)
+    extractor = ArticleExtractor()
+    try:
+        assert isinstance(extractor._get_executor(), ThreadPoolExecutor)
+    finally:
+        extractor.close()
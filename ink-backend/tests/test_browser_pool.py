@@ -0,0 +1,66 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.browser_pool import BrowserPool, wait_for_page_ready
+
+
+def test_fixed_mode_waits_full_time():
+    page = AsyncMock()
+    asyncio.run(wait_for_page_ready(page, 1.5, "fixed"))
+    page.wait_for_timeout.assert_awaited_once_with(1500)
+    page.evaluate.assert_not_awaited()
+
+
+def test_ready_mode_uses_wait_time_as_upper_bound():
+    page = AsyncMock()
+    page.evaluate.return_value = True
+    asyncio.run(wait_for_page_ready(page, 2.0, "ready"))
+    page.wait_for_timeout.assert_not_awaited()
+    page.wait_for_load_state.assert_not_awaited()
+    timeout_ms = page.evaluate.await_args.args[1]
+    assert 0 < timeout_ms <= 2000
+
+
+def test_networkidle_mode_waits_for_network_first():
+    page = AsyncMock()
+    page.evaluate.return_value = True
+    asyncio.run(wait_for_page_ready(page, 2.0, "networkidle"))
+    page.wait_for_load_state.assert_awaited_once_with("networkidle", timeout=2000)
+    page.evaluate.assert_awaited_once()
+
+
+def test_invalid_wait_mode():
+    with pytest.raises(ValueError):
+        asyncio.run(wait_for_page_ready(AsyncMock(), 1.0, "sleep"))
+
+
+def test_pool_size_and_stats_before_start():
+    pool = BrowserPool(browsers=2, contexts_per_browser=3)
+    assert pool.size == 6
+    stats = pool.stats()
+    assert stats["started"] is False
+    assert stats["idle"] == 0
+
+
+def test_render_html_rejects_unknown_format():
+    pool = BrowserPool()
+    with pytest.raises(ValueError):
+        asyncio.run(pool.render_html("<p>hi</p>", image_format="gif"))
+    assert pool.started is False
+
+
+def test_capture_encodes_webp_in_page():
+    page = AsyncMock()
+    page.screenshot.return_value = b"png-bytes"
+    page.evaluate.return_value = "d2VicA=="
+    image = asyncio.run(BrowserPool()._capture(page, False, "webp", 80))
+    assert image == b"webp"
+    page.screenshot.assert_awaited_once_with(full_page=False, type="png")
+    assert page.evaluate.await_args.args[1][1] == 80
@@ -0,0 +1,126 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.xiaohongshu.data_collector.content_analysis import (
+    _enhance_notes_with_detail_data, get_timing_profile
+)
+
+
+class _FakeElement:
+    def __init__(self, text="", parent=None, on_click=None):
+        self.text = text
+        self._parent = parent
+        self._on_click = on_click
+        self.clicks = 0
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.clicks += 1
+        if self._on_click:
+            self._on_click()
+
+    def find_element(self, by, value):
+        return self._parent
+
+
+class _FakeDriver:
+    """点击后一段时间才渲染详情数据，后退后立即回到列表页"""
+
+    def __init__(self, render_delay):
+        self.render_delay = render_delay
+        self.clicked_at = None
+        self.current_url = "https://creator.xiaohongshu.com/statistics/data-analysis"
+
+    def execute_script(self, script, *args):
+        return None
+
+    def find_elements(self, by, value):
+        detail_ready = self.clicked_at is not None and time.monotonic() - self.clicked_at >= self.render_delay
+        if detail_ready and "%" in value:
+            return [_FakeElement("62%", parent=_FakeElement("首页推荐 62%"))]
+        if value in ('.note-data-table', 'tr'):
+            return [_FakeElement("row")] * 2
+        return []
+
+    def click_detail(self):
+        self.clicked_at = time.monotonic()
+
+    def back(self):
+        self.clicked_at = None
+
+
+def test_detail_waits_return_as_soon_as_data_renders():
+    driver = _FakeDriver(render_delay=0.2)
+    buttons = [_FakeElement("详情数据", on_click=driver.click_detail) for _ in range(3)]
+    notes = [{"title": f"笔记{i}", "row_index": i, "has_detail_button": True,
+              "detail_button_element": button} for i, button in enumerate(buttons)]
+    profile = {**get_timing_profile("fast"), "section_timeout": 0.05}
+
+    started = time.monotonic()
+    enhanced = asyncio.run(_enhance_notes_with_detail_data(driver, notes, profile))
+    elapsed = time.monotonic() - started
+
+    assert [button.clicks for button in buttons] == [1, 1, 1]
+    assert all(note["source_recommend"] == "62%" for note in enhanced)
+    # 原先每篇笔记固定等待至少 7 秒
+    assert elapsed < 3
+
+
+class _TabsDriver:
+    """每个标签页导航后经过 render_delay 才渲染详情数据"""
+
+    def __init__(self, render_delay):
+        self.render_delay = render_delay
+        self.tabs = {"list": None}
+        self.current_window_handle = "list"
+        self.current_url = "https://creator.xiaohongshu.com/statistics/data-analysis"
+        self.switch_to = self
+        self.max_open = 1
+
+    def new_window(self, kind):
+        handle = f"tab{len(self.tabs)}"
+        self.tabs[handle] = None
+        self.current_window_handle = handle
+        self.max_open = max(self.max_open, len(self.tabs))
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def close(self):
+        del self.tabs[self.current_window_handle]
+
+    def execute_script(self, script, *args):
+        if "location.href" in script:
+            self.tabs[self.current_window_handle] = time.monotonic()
+
+    def find_elements(self, by, value):
+        opened_at = self.tabs.get(self.current_window_handle)
+        if opened_at is not None and time.monotonic() - opened_at >= self.render_delay and "%" in value:
+            return [_FakeElement("30%", parent=_FakeElement("搜索 30%"))]
+        return []
+
+
+def test_tabs_mode_loads_details_in_parallel():
+    driver = _TabsDriver(render_delay=0.3)
+    notes = [{"title": f"笔记{i}", "row_index": i, "detail_url": f"https://example.com/detail?noteId={i}"}
+             for i in range(4)]
+    notes.append({"title": "无链接", "row_index": 4, "has_detail_button": False})
+    profile = {**get_timing_profile("fast"), "section_timeout": 0.01}
+
+    started = time.monotonic()
+    enhanced = asyncio.run(_enhance_notes_with_detail_data(driver, notes, profile, "tabs", concurrency=2))
+    elapsed = time.monotonic() - started
+
+    assert [note["title"] for note in enhanced] == [note["title"] for note in notes]
+    assert all(note["source_search"] == "30%" for note in enhanced[:4])
+    assert "source_search" not in enhanced[4]
+    assert driver.max_open == 3 and list(driver.tabs) == ["list"]
+    # 两批并行加载，远少于逐篇等待的 4 * 0.3 秒
+    assert elapsed < 1.1
@@ -0,0 +1,138 @@
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.driver_pool import DriverPool
+from src.core.exceptions import BrowserError
+
+
+class _FakeDriver:
+    def __init__(self, account):
+        self.account = account
+        self.alive = True
+        self.quit_count = 0
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return "https://creator.xiaohongshu.com/"
+
+    def quit(self):
+        self.quit_count += 1
+
+
+def _make_pool(tmp_path, **kwargs):
+    created = []
+
+    def factory(config):
+        created.append(_FakeDriver(Path(config.cookies_file).stem))
+        return created[-1]
+
+    return DriverPool(session_factory=factory, **kwargs), created
+
+
+def _config(tmp_path, account):
+    cookies_file = tmp_path / f"{account}.json"
+    if not cookies_file.exists():
+        cookies_file.write_text("[]")
+    return SimpleNamespace(cookies_file=str(cookies_file))
+
+
+def test_lease_reuses_warm_session_per_account(tmp_path):
+    pool, created = _make_pool(tmp_path, max_sessions=2)
+    alice, bob = _config(tmp_path, "alice"), _config(tmp_path, "bob")
+
+    with pool.lease(alice) as first:
+        pass
+    with pool.lease(alice) as second:
+        assert second is first
+    with pool.lease(bob) as other:
+        assert other is not first
+    assert len(created) == 2
+
+    # 浏览器失去响应后重建
+    first.alive = False
+    with pool.lease(alice) as third:
+        assert third is not first
+    assert first.quit_count == 1
+
+    # 出错时丢弃会话
+    with pytest.raises(RuntimeError):
+        with pool.lease(bob):
+            raise RuntimeError("页面异常")
+    assert other.quit_count == 1
+    assert [s["account"] for s in pool.stats()["sessions"]] == ["alice"]
+
+
+def test_max_age_and_cookie_change_recycle(tmp_path):
+    pool, created = _make_pool(tmp_path, max_sessions=1, max_age=0)
+    alice = _config(tmp_path, "alice")
+    with pool.lease(alice):
+        pass
+    with pool.lease(alice):
+        pass
+    assert len(created) == 2 and created[0].quit_count == 1
+
+    pool.max_age = 3600
+    with pool.lease(alice) as driver:
+        pass
+    Path(alice.cookies_file).write_text('[{"name": "a1"}]')
+    with pool.lease(alice) as refreshed:
+        assert refreshed is not driver
+
+
+def test_bounded_sessions_evict_idle_and_wait_for_release(tmp_path):
+    pool, created = _make_pool(tmp_path, max_sessions=1, acquire_timeout=0.1)
+    alice, bob = _config(tmp_path, "alice"), _config(tmp_path, "bob")
+
+    with pool.lease(alice) as driver:
+        pass
+    # 达到上限时关闭最久未用的空闲会话
+    with pool.lease(bob):
+        assert driver.quit_count == 1
+        with pytest.raises(BrowserError):
+            pool.acquire(alice)
+
+    pool.acquire_timeout = 5
+    held = pool.acquire(alice)
+    releaser = threading.Timer(0.1, pool.release, args=(held,))
+    releaser.start()
+    assert pool.acquire(alice) is held
+    releaser.join()
+
+
+def test_idle_sessions_reaped_without_new_leases(tmp_path):
+    pool, created = _make_pool(tmp_path, idle_timeout=0.05)
+    with pool.lease(_config(tmp_path, "alice")) as driver:
+        pass
+
+    for _ in range(50):
+        if driver.quit_count:
+            break
+        time.sleep(0.02)
+    assert driver.quit_count == 1
+    assert pool.stats()["sessions"] == []
+
+
+def test_close_quits_leased_sessions_on_release(tmp_path):
+    pool, created = _make_pool(tmp_path)
+    alice = _config(tmp_path, "alice")
+    with pool.lease(alice) as idle:
+        pass
+    leased = pool.acquire(_config(tmp_path, "bob"))
+
+    pool.close()
+    assert idle.quit_count == 1 and leased.quit_count == 0
+    pool.release(leased)
+    assert leased.quit_count == 1
+    assert pool.stats()["sessions"] == []
+    with pytest.raises(BrowserError):
+        pool.acquire(alice)
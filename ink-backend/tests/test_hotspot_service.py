@@ -0,0 +1,191 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.hotspot_service import HotspotService
+
+
+class _FakeUpstream:
+    """模拟百度、微博热搜接口，记录请求次数和同时进行中的请求数"""
+
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.score = 100
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        if request.url.host == "top.baidu.com":
+            content = [{"word": "百度热点", "url": "https://baidu.com/1", "hotScore": str(self.score)}]
+            return httpx.Response(200, json={"data": {"cards": [{"content": content}]}})
+        return httpx.Response(200, json={"data": {"realtime": [{"word": "微博热点", "raw_hot": self.score + 1}]}})
+
+
+def _service(upstream, cache_ttl=300):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    return HotspotService(client=client, cache_ttl=cache_ttl)
+
+
+def test_sources_fetched_concurrently_and_cached():
+    upstream = _FakeUpstream()
+
+    async def run():
+        service = _service(upstream)
+        first = await service.get_hotspots()
+        second = await service.get_hotspots()
+        await service.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert upstream.peak == 2
+    assert upstream.calls == 2
+    assert [h["source"] for h in first] == ["weibo", "baidu"]
+    assert second == first
+
+
+def test_stale_cache_returned_while_refreshing():
+    upstream = _FakeUpstream()
+
+    async def run():
+        service = _service(upstream, cache_ttl=0)
+        await service.get_hotspots()
+        upstream.score = 500
+        stale = await service.get_hotspots()
+        await service._refresh_task
+        fresh = await service.get_hotspots()
+        await service.close()
+        return stale, fresh
+
+    stale, fresh = asyncio.run(run())
+
+    assert stale[0]["hot_score"] == 101
+    assert fresh[0]["hot_score"] == 501
+
+
+def test_deadline_uses_snapshot_of_slow_source():
+    upstream = _FakeUpstream()
+
+    async def run():
+        service = _service(upstream)
+        await service.fetch_all_hotspots()
+
+        async def slow_weibo(request):
+            if request.url.host == "weibo.com":
+                await asyncio.sleep(1)
+            return await upstream(request)
+
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(slow_weibo))
+        upstream.score = 500
+        hotspots = await service.fetch_all_hotspots(deadline=0.2)
+        await service.close()
+        return hotspots
+
+    hotspots = asyncio.run(run())
+
+    assert {h["source"]: h["hot_score"] for h in hotspots} == {"baidu": "500", "weibo": 101}
+
+
+def test_circuit_breaker_opens_after_failures():
+    calls = []
+
+    def failing(request):
+        calls.append(request.url.host)
+        return httpx.Response(503)
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(failing))
+        service = HotspotService(client=client)
+        for source in service.sources:
+            source.breaker.failure_threshold = 2
+        for _ in range(4):
+            assert await service.fetch_all_hotspots() == []
+        status = service.source_status()
+        await service.close()
+        return status
+
+    status = asyncio.run(run())
+
+    assert len(calls) == 4
+    assert all(s["state"] == "open" for s in status)
+
+
+def test_half_open_breaker_lets_only_one_probe_through():
+    calls = []
+
+    async def slow_failing(request):
+        calls.append(request.url.host)
+        await asyncio.sleep(0.05)
+        return httpx.Response(503)
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(slow_failing))
+        service = HotspotService(client=client)
+        source = service.sources[0]
+        source.breaker.failure_threshold = 1
+        source.breaker.reset_timeout = 0
+        await source.collect(client)
+        assert source.breaker.state == "half_open"
+        calls.clear()
+        # 半开状态下并发的请求只有一个会真正发出
+        await asyncio.gather(*[source.collect(client) for _ in range(3)])
+        assert len(calls) == 1
+        assert not source.breaker.probe_in_flight
+        # 试探失败后重新熔断，冷却期（此处为0）过后可再次试探
+        await source.collect(client)
+        assert len(calls) == 2
+        await service.close()
+
+    asyncio.run(run())
+
+
+class _RecordingProvider:
+    def __init__(self):
+        self.prompts = []
+
+    async def agenerate_content(self, messages, model):
+        self.prompts.append(messages[0]["content"])
+        if len(self.prompts) == 1:
+            return "# 报告\n\n## 重点事件分析\n\n### 1. 话题0\n分析\n\n## 综合趋势与业务建议\n建议"
+        return "### 新话题\n新的分析"
+
+
+def _hotspots(titles):
+    return [{"source": "weibo", "title": title, "hot_score": 100 - i} for i, title in enumerate(titles)]
+
+
+def test_incremental_analysis_only_sends_changed_topics():
+    provider = _RecordingProvider()
+    titles = [f"话题{i}" for i in range(10)]
+
+    async def run():
+        service = HotspotService()
+        results = [await service.analyze_hotspots_incremental(_hotspots(titles), "deepseek", "deepseek-chat")]
+        results.append(await service.analyze_hotspots_incremental(_hotspots(titles), "deepseek", "deepseek-chat"))
+        changed = ["新话题"] + titles[:9]
+        changed[1], changed[7] = changed[7], changed[1]
+        results.append(await service.analyze_hotspots_incremental(_hotspots(changed), "deepseek", "deepseek-chat"))
+        await service.close()
+        return results
+
+    with patch('src.services.ai_providers.AIProviderFactory.get_provider', return_value=provider):
+        full, unchanged, incremental = asyncio.run(run())
+
+    assert [r["mode"] for r in (full, unchanged, incremental)] == ["full", "unchanged", "incremental"]
+    assert len(provider.prompts) == 2
+    assert [t["title"] for t in incremental["new_topics"]] == ["新话题"]
+    assert [t["title"] for t in incremental["reranked_topics"]] == ["话题6", "话题0"]
+    assert "话题3" not in provider.prompts[1]
+    report = incremental["report"]
+    assert report.index("### 1. 话题0") < report.index("## 热点更新") < report.index("## 综合趋势与业务建议")
@@ -0,0 +1,117 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.html_generation.base_generator import BaseGenerator
+from src.services.html_generation.html_builder import HTMLBuilder
+
+
+class _SlowProvider:
+    """记录同时进行中的请求数的 AI 提供商"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def agenerate_content(self, messages, model):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return messages[0]["content"]
+
+
+def _config(max_concurrency):
+    return {"services": [{"name": "fake", "type": "fake", "models": ["m"], "max_concurrency": max_concurrency}]}
+
+
+def test_sections_html_respects_service_concurrency_and_order():
+    provider = _SlowProvider()
+    with patch('src.services.ai_providers.AIProviderFactory.get_provider', return_value=provider):
+        builder = HTMLBuilder(_config(2), "fake", "m", max_retries=1, retry_base_delay=0)
+    sections = [f"第{i}段内容描述" for i in range(6)]
+
+    results = asyncio.run(builder.generate_sections_html("标题", sections, "清新"))
+
+    assert provider.peak == 2
+    assert len(results) == 6
+    assert all(f"第{i}段" in html for i, html in enumerate(results))
+
+
+def test_rate_limited_retry_honours_retry_after():
+    with patch('src.services.ai_providers.AIProviderFactory.get_provider'):
+        generator = BaseGenerator(_config(1), "fake", "m", max_retries=3, retry_base_delay=0)
+    error = HTTPException(status_code=429, detail="rate limited", headers={"Retry-After": "7"})
+    assert generator._retry_delay(0, error) == 7
+    assert generator._retry_delay(0, ValueError("boom")) < 1
+
+
+def test_semaphores_are_created_per_event_loop():
+    with patch('src.services.ai_providers.AIProviderFactory.get_provider'):
+        generator = BaseGenerator(_config(1), "fake", "m", max_retries=1, retry_base_delay=0)
+
+    async def get_semaphore():
+        return generator._get_semaphore()
+
+    first = asyncio.run(get_semaphore())
+    second = asyncio.run(get_semaphore())
+    assert first is not second
+
+
+class _StreamingProvider:
+    async def astream_content(self, messages, model):
+        for chunk in ["a", "b", "c"]:
+            await asyncio.sleep(0)
+            yield chunk
+
+
+def test_stream_releases_slot_when_upstream_finishes():
+    with patch('src.services.ai_providers.AIProviderFactory.get_provider', return_value=_StreamingProvider()):
+        generator = BaseGenerator(_config(1), "fake", "m", max_retries=1, retry_base_delay=0, use_cache=False)
+
+    async def run():
+        stream = generator.stream_ai_service("prompt")
+        first = await stream.__anext__()
+        # 调用方尚未读完，上游生成结束后槽位即已释放
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert not generator._get_semaphore().locked()
+        rest = [chunk async for chunk in stream]
+        return [first] + rest
+
+    assert asyncio.run(run()) == ["a", "b", "c"]
+
+
+
+def test_queued_sections_do_not_create_coroutines_before_acquiring():
+    provider = _SlowProvider()
+    with patch('src.services.ai_providers.AIProviderFactory.get_provider', return_value=provider):
+        builder = HTMLBuilder(_config(4), "fake", "m", max_retries=1, retry_base_delay=0, use_cache=False)
+
+    created = []
+
+    def fake_generate_image_html(**kwargs):
+        created.append(kwargs["description"])
+        return asyncio.sleep(10)
+
+    builder.generate_image_html = fake_generate_image_html
+
+    async def run():
+        task = asyncio.create_task(
+            builder.generate_sections_html("标题", ["一", "二", "三"], "清新", max_concurrency=1)
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    # 排队中的段落被取消时不应已创建协程
+    assert created == ["一"]
@@ -0,0 +1,60 @@
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.note_pipeline import NotePipeline
+
+
+class _FakeProvider:
+    """根据 prompt 返回固定内容的 AI 提供商"""
+
+    async def agenerate_content(self, messages, model):
+        prompt = messages[0]["content"]
+        if "爆款标题" in prompt:
+            return "测试标题"
+        if "CSS样式表" in prompt:
+            return "body { color: #333; }"
+        if "完整的笔记文案" in prompt:
+            return "第一段。第二段。"
+        if "分割成" in prompt:
+            return '["第一段", "第二段"]'
+        return "<div>section</div>"
+
+
+class _FakeBrowserPool:
+    async def render_html(self, html, **kwargs):
+        return b"png"
+
+
+def _collect(pipeline, **kwargs):
+    async def run():
+        return [event async for event in pipeline.run(**kwargs)]
+    return asyncio.run(run())
+
+
+@patch('src.services.ai_providers.AIProviderFactory.get_provider', return_value=_FakeProvider())
+def test_pipeline_runs_all_stages(mock_get_provider, tmp_path):
+    pipeline = NotePipeline(
+        html_output_dir=str(tmp_path),
+        image_output_dir=str(tmp_path),
+        browser_pool=_FakeBrowserPool(),
+        # 不写入 config.json 中配置的真实响应缓存
+        use_cache=False
+    )
+    events = _collect(pipeline, theme="旅行", style="清新", audience="学生", num_sections=2)
+
+    types = [event["type"] for event in events]
+    assert {"title", "css", "content", "sections"} <= set(types)
+    assert types.count("section_html") == 2
+    assert types.count("section_image") == 2
+    assert types[-1] == "done"
+
+    result = events[-1]["content"]
+    assert result["title"] == "测试标题"
+    assert [s["index"] for s in result["sections"]] == [0, 1]
+    assert all(s["success"] for s in result["sections"])
+    assert all(Path(s["output_path"]).read_bytes() == b"png" for s in result["sections"])
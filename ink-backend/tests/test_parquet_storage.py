@@ -0,0 +1,85 @@
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from src.data.storage.parquet_storage import ParquetStorage, SCHEMAS
+
+
+def _fans(total):
+    return [{"timestamp": "t", "dimension": "7days", "total_fans": str(total), "new_fans": "1", "lost_fans": 0}]
+
+
+def test_typed_columns_and_date_pushdown(tmp_path):
+    storage = ParquetStorage({"data_dir": str(tmp_path)})
+    old_dir = storage.parquet_dir / "fans" / "date=2024-01-01"
+    old_dir.mkdir()
+    old = {"created_at": datetime(2024, 1, 1, 8), "total_fans": 10, "new_fans": 0, "lost_fans": 0}
+    pq.write_table(pa.Table.from_pylist([old], schema=SCHEMAS["fans"]), old_dir / "data.parquet")
+
+    storage.save_fans_data(_fans(100))
+    storage.save_fans_data(_fans(120))
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    table = storage.read_table("fans", columns=["total_fans"], start_date=today)
+    assert table.column_names == ["total_fans"]
+    assert table.schema.field("total_fans").type == pa.int64()
+    assert table.column("total_fans").to_pylist() == [120]
+
+    assert storage.read_table("fans", columns=["total_fans"], end_date="2024-12-31").num_rows == 1
+    assert storage.read_dataframe("fans")["total_fans"].tolist() == [10, 120]
+
+    latest = asyncio.run(storage.get_latest_data("fans", limit=2))
+    assert [row["total_fans"] for row in latest] == [120, 10]
+    assert isinstance(latest[0]["created_at"], str)
+    assert storage.get_storage_info()["datasets"]["fans"]["partitions"] == 2
+
+
+def test_percentages_stored_as_numbers(tmp_path):
+    storage = ParquetStorage({"data_dir": str(tmp_path)})
+    storage.save_content_analysis_data([{"title": "笔记", "views": "1,234", "gender_male": "62.5%"}])
+
+    row = storage.read_table("content_analysis", columns=["title", "views", "gender_male", "source_search"]).to_pylist()[0]
+    assert row == {"title": "笔记", "views": 1234, "gender_male": 62.5, "source_search": 0.0}
+    assert storage.read_table("content_analysis", start_date="2999-01-01").num_rows == 0
+
+
+def test_backfill_only_adds_missing_dates(tmp_path):
+    storage = ParquetStorage({"data_dir": str(tmp_path)})
+    storage.save_fans_data(_fans(120))
+    today = datetime.now().strftime("%Y-%m-%d")
+    rows = [
+        {"created_at": "2024-01-01T08:00:00", "dimension": "7days", "total_fans": "10"},
+        {"created_at": "2024-01-02T08:00:00", "dimension": "7days", "total_fans": "20"},
+        {"created_at": f"{today}T08:00:00", "dimension": "7days", "total_fans": "99"},
+    ]
+
+    assert storage.backfill("fans", rows) == 2
+    assert storage.backfilled_types() == ["fans"]
+    assert storage.read_dataframe("fans")["total_fans"].tolist() == [10, 20, 120]
+
+
+def test_enabling_parquet_keeps_csv_history(tmp_path, monkeypatch):
+    from src.data.storage_manager import StorageManager
+
+    monkeypatch.setenv("STORAGE_WRITE_BEHIND", "false")
+    monkeypatch.setenv("ENABLE_DATABASE", "false")
+    monkeypatch.setenv("ENABLE_PARQUET_STORAGE", "false")
+    csv_only = StorageManager()
+    csv_only.initialize(data_path=str(tmp_path))
+    csv_only.save_fans_data(_fans(100))
+    csv_only.close()
+
+    monkeypatch.setenv("ENABLE_PARQUET_STORAGE", "true")
+    manager = StorageManager()
+    manager.initialize(data_path=str(tmp_path))
+    assert manager.read_dataframe("fans", columns=["total_fans"])["total_fans"].tolist() == [100]
+    manager.close()
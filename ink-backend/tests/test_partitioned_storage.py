@@ -0,0 +1,74 @@
+import asyncio
+import csv
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data.storage.csv_storage import CSVStorage
+from src.data.storage.partitioned_storage import PartitionedCSVStorage
+
+
+def _fans(total):
+    return [{"timestamp": "t", "dimension": "7days", "total_fans": total, "new_fans": 1, "lost_fans": 0}]
+
+
+def test_save_replaces_only_today_partition(tmp_path):
+    storage = PartitionedCSVStorage({"data_dir": str(tmp_path)})
+    old = storage.csv_dir / "fans_data" / "2024-01-01.csv"
+    storage._write_partition(old, storage.fans_fields,
+                             [{"created_at": "2024-01-01T08:00:00", "total_fans": 10}],
+                             storage.fans_chinese_headers)
+    old_mtime = old.stat().st_mtime_ns
+
+    storage.save_fans_data(_fans(100))
+    storage.save_fans_data(_fans(120))
+
+    today = storage.csv_dir / "fans_data" / f"{storage._get_today_date()}.csv"
+    with open(today, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == storage.fans_chinese_headers
+    assert len(rows) == 2 and rows[1][4] == "120"
+    assert old.stat().st_mtime_ns == old_mtime
+
+    latest = asyncio.run(storage.get_latest_data("fans", limit=2))
+    assert [row["total_fans"] for row in latest] == ["120", "10"]
+    assert [row["total_fans"] for row in storage.read_range("fans", end_date="2024-12-31")] == ["10"]
+    assert storage.get_storage_info()["files"]["fans_data.csv"]["partitions"] == 2
+
+
+def test_migrates_legacy_single_file(tmp_path):
+    legacy = CSVStorage({"data_dir": str(tmp_path)})
+    with open(legacy.fans_file, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for created_at, total in [("2024-01-01T08:00:00", 1), ("2024-01-02T08:00:00", 2),
+                                  ("2024-01-02T09:00:00", 3)]:
+            writer.writerow([created_at, created_at, "t", "7days", total, 0, 0])
+
+    storage = PartitionedCSVStorage({"data_dir": str(tmp_path)})
+
+    partitions = sorted(p.name for p in (storage.csv_dir / "fans_data").iterdir())
+    assert partitions == ["2024-01-01.csv", "2024-01-02.csv"]
+    assert not legacy.fans_file.exists()
+    assert legacy.fans_file.with_name("fans_data.csv.migrated").exists()
+    latest = asyncio.run(storage.get_latest_data("fans", limit=2))
+    assert [row["total_fans"] for row in latest] == ["3", "2"]
+
+
+def test_csv_latest_data_reads_from_tail(tmp_path):
+    storage = CSVStorage({"data_dir": str(tmp_path)})
+    with open(storage.content_analysis_file, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for i in range(2000):
+            created_at = f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}"
+            row = [created_at, created_at, "t", f"笔记标题{i},含逗号"] + [""] * (len(storage.content_analysis_fields) - 4)
+            writer.writerow(row)
+
+    latest = asyncio.run(storage.get_latest_data("content_analysis", limit=3))
+    assert [row["title"] for row in latest] == ["笔记标题1999,含逗号", "笔记标题1998,含逗号", "笔记标题1997,含逗号"]
+
+    # 块边界落在多字节字符中间时也能正确拼接
+    lines = list(CSVStorage._iter_lines_reversed(storage.content_analysis_file, block_size=7))
+    with open(storage.content_analysis_file, encoding="utf-8") as f:
+        assert lines == [line.rstrip("\r\n") for line in reversed(f.readlines())]
@@ -0,0 +1,167 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.exceptions import PublishError
+from src.services.publish_queue import PublishJobStore, PublishQueue
+
+
+class _FakePublisher:
+    """记录各账号同时进行中的发布数"""
+
+    def __init__(self, account, state):
+        self.account = account
+        self.state = state
+
+    async def publish(self, title, **kwargs):
+        active = self.state["active"]
+        active[self.account] = active.get(self.account, 0) + 1
+        self.state["peak_per_account"] = max(self.state["peak_per_account"], active[self.account])
+        self.state["peak_total"] = max(self.state["peak_total"], sum(active.values()))
+        await asyncio.sleep(0.02)
+        active[self.account] -= 1
+        if title.startswith("重试") and self.state["failures"].get(title, 0) < 1:
+            self.state["failures"][title] = self.state["failures"].get(title, 0) + 1
+            return {"success": False, "message": "网络错误", "retryable": True}
+        if title.startswith("校验"):
+            return {"success": False, "message": "标题过长"}
+        if title.startswith("失败"):
+            raise RuntimeError("浏览器崩溃")
+        return {"success": True, "message": "发布成功", "note_title": title}
+
+    async def close(self):
+        self.state["closed"].append(self.account)
+
+
+def test_queue_serializes_accounts_and_retries(tmp_path):
+    state = {"active": {}, "peak_per_account": 0, "peak_total": 0, "failures": {}, "closed": []}
+    store = PublishJobStore(str(tmp_path / "jobs.sqlite3"))
+
+    async def run():
+        queue = PublishQueue(store, lambda account: _FakePublisher(account, state),
+                             workers=3, max_attempts=2, retry_base_delay=0.01)
+        queue.start()
+        jobs = [queue.enqueue(account, {"title": f"笔记{i}", "content": "内容"})
+                for i in range(3) for account in ("a", "b")]
+        jobs.append(queue.enqueue("a", {"title": "重试1", "content": "内容"}))
+        jobs.append(queue.enqueue("a", {"title": "校验1", "content": "内容"}))
+        jobs.append(queue.enqueue("b", {"title": "失败1", "content": "内容"}))
+        for _ in range(200):
+            if store.counts()["pending"] == 0 and store.counts()["running"] == 0:
+                break
+            await asyncio.sleep(0.02)
+        await queue.close()
+        return [store.get(job["id"]) for job in jobs]
+
+    jobs = asyncio.run(run())
+
+    assert state["peak_per_account"] == 1
+    assert state["peak_total"] == 2
+    assert sorted(state["closed"]) == ["a", "b"]
+    retried, invalid, failed = jobs[-3:]
+    assert all(job["status"] == "completed" for job in jobs[:-2])
+    assert retried["attempts"] == 2 and retried["result"]["note_title"] == "重试1"
+    # 校验失败不重试
+    assert invalid["status"] == "failed" and invalid["attempts"] == 1
+    assert failed["status"] == "failed" and failed["attempts"] == 2
+    assert "浏览器崩溃" in failed["error"]
+
+
+def test_running_jobs_interrupted_after_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = PublishJobStore(path)
+    job = store.enqueue("a", {"title": "笔记", "content": "内容"})
+    assert store.claim_next(set())["status"] == "running"
+    assert store.claim_next(set()) is None
+
+    # 上次退出时发布结果未知，不重新排队
+    restarted = PublishJobStore(path)
+    assert restarted.interrupt_running() == 1
+    assert restarted.get(job["id"])["status"] == "interrupted"
+    assert restarted.claim_next(set()) is None
+
+
+class _SlowPublisher:
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def publish(self, title, **kwargs):
+        await asyncio.sleep(self.delay)
+        return {"success": True, "message": "发布成功", "note_title": title}
+
+    async def close(self):
+        pass
+
+
+def _close_while_publishing(store, delay, shutdown_timeout):
+    async def run():
+        queue = PublishQueue(store, lambda account: _SlowPublisher(delay), workers=1,
+                             shutdown_timeout=shutdown_timeout)
+        queue.start()
+        job = queue.enqueue("a", {"title": "笔记", "content": "内容"})
+        while store.get(job["id"])["status"] != "running":
+            await asyncio.sleep(0.01)
+        await queue.close()
+        return store.get(job["id"])
+
+    return asyncio.run(run())
+
+
+def test_close_waits_for_running_publish(tmp_path):
+    store = PublishJobStore(str(tmp_path / "jobs.sqlite3"))
+    job = _close_while_publishing(store, delay=0.1, shutdown_timeout=5)
+    assert job["status"] == "completed"
+
+
+def test_close_timeout_marks_running_publish_interrupted(tmp_path):
+    store = PublishJobStore(str(tmp_path / "jobs.sqlite3"))
+    job = _close_while_publishing(store, delay=5, shutdown_timeout=0.05)
+    assert job["status"] == "interrupted"
+    assert store.interrupt_running() == 0 and store.claim_next(set()) is None
+
+
+class _SubmitFailingPublisher:
+    """点击发布按钮后出错的发布器"""
+
+    def __init__(self, state):
+        self.state = state
+
+    async def publish(self, title, **kwargs):
+        self.state["calls"] += 1
+        if title.startswith("查找"):
+            raise PublishError("无法找到发布按钮", publish_step="查找发布按钮")
+        raise PublishError("点击发布按钮失败: 页面无响应", publish_step=PublishError.SUBMIT_STEP)
+
+    async def close(self):
+        pass
+
+
+def test_error_after_submit_click_interrupts_job(tmp_path):
+    store = PublishJobStore(str(tmp_path / "jobs.sqlite3"))
+    state = {"calls": 0}
+
+    async def run():
+        queue = PublishQueue(store, lambda account: _SubmitFailingPublisher(state),
+                             workers=1, max_attempts=3, retry_base_delay=0.01)
+        queue.start()
+        submitted = queue.enqueue("a", {"title": "笔记", "content": "内容"})
+        before_click = queue.enqueue("b", {"title": "查找", "content": "内容"})
+        for _ in range(200):
+            if store.get(before_click["id"])["status"] == "failed" and \
+                    store.get(submitted["id"])["status"] != "running":
+                break
+            await asyncio.sleep(0.02)
+        await queue.close()
+        return store.get(submitted["id"]), store.get(before_click["id"])
+
+    submitted, before_click = asyncio.run(run())
+
+    # 点击发布后出错：结果未知，不重新排队
+    assert submitted["status"] == "interrupted" and submitted["attempts"] == 1
+    assert "发布结果未知" in submitted["error"]
+    # 点击前出错仍按退避重试
+    assert before_click["attempts"] == 3
+    assert state["calls"] == 4
@@ -0,0 +1,53 @@
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.render_cache import RenderCache
+
+
+def test_key_depends_on_html_and_params():
+    key = RenderCache.make_key("<p>a</p>", width=375, height=667)
+    assert key == RenderCache.make_key(b"<p>a</p>", height=667, width=375)
+    assert key != RenderCache.make_key("<p>b</p>", width=375, height=667)
+    assert key != RenderCache.make_key("<p>a</p>", width=750, height=667)
+
+
+def test_hit_and_miss_counters(tmp_path):
+    cache = RenderCache(tmp_path)
+    assert cache.get("k") is None
+    cache.put("k", b"image", "png")
+    assert cache.get("k") == b"image"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_size_eviction_drops_least_recently_used(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get_path("a")
+    cache.put("c", b"12345")
+    assert cache.get_path("b") is None
+    assert cache.get_path("a") is not None
+    assert cache.get_path("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert not (tmp_path / "b.png").exists()
+
+
+def test_age_eviction(tmp_path):
+    cache = RenderCache(tmp_path, max_age=60)
+    path = cache.put("old", b"data")
+    stale = time.time() - 120
+    cache._entries["old"] = (path, 4, stale)
+    assert cache.get_path("old") is None
+    assert not path.exists()
+
+
+def test_index_reloaded_from_disk(tmp_path):
+    RenderCache(tmp_path).put("persisted", b"data", "webp")
+    cache = RenderCache(tmp_path)
+    assert cache.get("persisted") == b"data"
+    assert cache.stats()["bytes"] == 4
@@ -0,0 +1,90 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.html_generation.base_generator import BaseGenerator
+from src.services.html_generation.content_splitter import ContentSplitter
+from src.services.html_generation.title_generator import TitleGenerator
+from src.services.html_generation.response_cache import ResponseCache
+
+
+class _CountingProvider:
+    def __init__(self):
+        self.calls = 0
+
+    async def agenerate_content(self, messages, model):
+        self.calls += 1
+        return f"响应{self.calls}"
+
+
+def test_normalized_prompt_hits_and_persists(tmp_path):
+    db_path = tmp_path / "responses.sqlite3"
+    cache = ResponseCache(str(db_path))
+    cache.put("deepseek", "deepseek-chat", "写一个 标题\n", "标题A")
+
+    assert cache.get("deepseek", "deepseek-chat", "  写一个   标题") == "标题A"
+    assert cache.get("deepseek", "deepseek-reasoner", "写一个 标题") is None
+    assert ResponseCache(str(db_path)).get("deepseek", "deepseek-chat", "写一个 标题") == "标题A"
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), ttl=60, max_entries=2)
+    cache.put("s", "m", "a", "1")
+    cache.put("s", "m", "b", "2")
+    time.sleep(0.01)
+    assert cache.get("s", "m", "a") == "1"
+    cache.put("s", "m", "c", "3")
+
+    assert cache.get("s", "m", "b") is None
+    assert cache.get("s", "m", "a") == "1"
+
+    cache.ttl = 0
+    time.sleep(0.01)
+    assert cache.get("s", "m", "c") is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_generator_uses_cache_unless_disabled(tmp_path):
+    config = {
+        "services": [{"name": "fake", "type": "fake", "models": ["m"]}],
+        "response_cache": {"enabled": True, "path": str(tmp_path / "responses.sqlite3")},
+    }
+    provider = _CountingProvider()
+    with patch('src.services.ai_providers.AIProviderFactory.get_provider', return_value=provider):
+        cached = BaseGenerator(config, "fake", "m", max_retries=1, retry_base_delay=0)
+        uncached = BaseGenerator(config, "fake", "m", max_retries=1, retry_base_delay=0, use_cache=False)
+
+    assert asyncio.run(cached.call_ai_service("同一个prompt")) == "响应1"
+    assert asyncio.run(cached.call_ai_service("同一个prompt")) == "响应1"
+    assert asyncio.run(uncached.call_ai_service("同一个prompt")) == "响应2"
+    assert provider.calls == 2
+
+
+def test_output_rejected_by_postprocess_is_not_cached(tmp_path):
+    config = {
+        "services": [{"name": "fake", "type": "fake", "models": ["m"]}],
+        "response_cache": {"enabled": True, "path": str(tmp_path / "responses.sqlite3")},
+    }
+    provider = _CountingProvider()
+    with patch('src.services.ai_providers.AIProviderFactory.get_provider', return_value=provider):
+        splitter = ContentSplitter(config, "fake", "m", max_retries=1, retry_base_delay=0)
+        title_generator = TitleGenerator(config, "fake", "m", max_retries=1, retry_base_delay=0)
+        fresh_title_generator = TitleGenerator(config, "fake", "m", max_retries=1, retry_base_delay=0,
+                                               use_cache=False)
+
+    # “响应1”不是JSON数组，分割失败，不写入缓存
+    with pytest.raises(Exception):
+        asyncio.run(splitter.split_content_into_sections("内容", 1))
+    assert splitter.response_cache.stats()["entries"] == 0
+
+    # 标题可以缓存，请求 use_cache=False 时生成新的标题
+    first = asyncio.run(title_generator.generate_note_title("旅行", "清新", "学生"))
+    assert asyncio.run(title_generator.generate_note_title("旅行", "清新", "学生")) == first
+    assert asyncio.run(fresh_title_generator.generate_note_title("旅行", "清新", "学生")) != first
@@ -0,0 +1,101 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data.write_buffer import WriteBehindBuffer
+from src.data.storage_manager import StorageManager
+
+
+def test_submit_returns_immediately_and_coalesces_snapshots():
+    release = threading.Event()
+    written = []
+
+    def writer(data_type, data):
+        release.wait(5)
+        written.append((data_type, [row["v"] for row in data]))
+
+    buffer = WriteBehindBuffer(writer, flush_interval=0)
+    started = time.monotonic()
+    buffer.submit("fans", [{"v": 1}])
+    # 等待第一批开始写入，之后提交的数据进入下一批
+    while buffer.stats()["in_flight"] == 0:
+        time.sleep(0.01)
+    buffer.submit("fans", [{"v": 2}])
+    buffer.submit("fans", [{"v": 3}])
+    buffer.submit("dashboard", [{"v": 4}, {"v": 5}])
+    assert time.monotonic() - started < 1
+
+    stats = buffer.stats()
+    assert stats["depth"] == 3 and stats["pending_records"] == 3 and stats["coalesced"] == 1
+    assert not buffer.flush(timeout=0.05)
+
+    release.set()
+    assert buffer.flush(timeout=5)
+    assert written == [("fans", [1]), ("fans", [3]), ("dashboard", [4, 5])]
+    assert buffer.stats()["written"] == 3 and buffer.depth() == 0
+    assert buffer.close(timeout=5)
+
+
+def test_failed_write_is_kept_and_retried_on_flush():
+    written = []
+    disk = {"full": True}
+
+    def writer(data_type, data):
+        if disk["full"]:
+            raise IOError("磁盘已满")
+        written.append((data_type, [row["v"] for row in data]))
+
+    buffer = WriteBehindBuffer(writer, flush_interval=0)
+    buffer.submit("fans", [{"v": 1}])
+    assert not buffer.flush(timeout=5)
+    stats = buffer.stats()
+    assert stats["failed"] >= 1 and "磁盘已满" in stats["last_error"]
+    assert stats["failed_pending"] == {"fans": 1}
+
+    # 下次 flush 时重试失败的快照
+    disk["full"] = False
+    assert buffer.flush(timeout=5)
+    assert written == [("fans", [1])]
+    assert buffer.stats()["failed_pending"] == {}
+    assert buffer.close(timeout=5)
+
+
+def test_newer_snapshot_replaces_failed_one():
+    written = []
+    disk = {"full": True}
+
+    def writer(data_type, data):
+        if disk["full"]:
+            raise IOError("磁盘已满")
+        written.append((data_type, [row["v"] for row in data]))
+
+    buffer = WriteBehindBuffer(writer, flush_interval=0)
+    buffer.submit("fans", [{"v": 1}])
+    assert not buffer.flush(timeout=5)
+    disk["full"] = False
+    buffer.submit("fans", [{"v": 2}])
+    assert buffer.flush(timeout=5)
+    assert written == [("fans", [2])]
+    assert buffer.close(timeout=5)
+
+
+def test_storage_manager_reads_its_own_buffered_writes(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_WRITE_BEHIND", "true")
+    monkeypatch.setenv("STORAGE_FLUSH_INTERVAL", "30")
+    monkeypatch.setenv("ENABLE_PARQUET_STORAGE", "false")
+    monkeypatch.setenv("ENABLE_DATABASE", "false")
+    manager = StorageManager()
+    manager.initialize(data_path=str(tmp_path))
+
+    manager.save_fans_data([{"timestamp": "t", "dimension": "7days", "total_fans": 42, "new_fans": 1, "lost_fans": 0}])
+    assert manager.get_write_queue_stats()["depth"] == 1
+
+    # 读取前先写入缓冲的数据，不用等到 flush_interval
+    df = manager.read_dataframe("fans", columns=["total_fans"])
+    assert df["total_fans"].tolist() == ["42"]
+    assert manager.get_write_queue_stats()["written"] == 1
+    manager.close()
@@ -0,0 +1,63 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.exceptions import PublishError
+from src.services.xhs_publish_service import XHSPublishService
+from src.xiaohongshu.models import XHSPublishResult
+
+
+class _FakeClient:
+    def __init__(self):
+        self.notes = []
+        self.threads = set()
+        self.closed = False
+
+    async def publish_note(self, note):
+        self.notes.append(note)
+        self.threads.add(threading.current_thread().name)
+        if note.title == "失败":
+            raise RuntimeError("页面异常")
+        if note.title == "已点击":
+            raise PublishError("点击发布按钮失败", publish_step=PublishError.SUBMIT_STEP)
+        return XHSPublishResult(success=True, message="发布成功", note_title=note.title)
+
+    def close_session(self):
+        self.closed = True
+
+
+def test_publish_reuses_client_in_background_thread(tmp_path):
+    image = tmp_path / "cover.png"
+    image.write_bytes(b"png")
+    created = []
+
+    def factory():
+        created.append(_FakeClient())
+        return created[-1]
+
+    async def run():
+        service = XHSPublishService(client_factory=factory)
+        results = [
+            await service.publish("标题一", "内容", topics=["旅行"], images=[str(image)]),
+            await service.publish("失败", "内容", images=[str(image)]),
+            await service.publish("已点击", "内容", images=[str(image)]),
+        ]
+        await service.close()
+        return results
+
+    ok, failed, submitted = asyncio.run(run())
+
+    assert ok["success"] and ok["note_title"] == "标题一"
+    assert not failed["success"] and "页面异常" in failed["message"] and failed["retryable"]
+    # 点击发布后出错不能重试
+    assert submitted["outcome_unknown"] and not submitted.get("retryable")
+    assert len(created) == 1
+    client = created[0]
+    assert [n.title for n in client.notes] == ["标题一", "失败", "已点击"]
+    assert client.notes[0].images == [str(image)]
+    assert all(name.startswith("xhs-publish") for name in client.threads)
+    assert client.closed